@@ -3,11 +3,29 @@ from discord.ext import commands
 import os
 import asyncio
 import database
+import components
+import database_async
+import db_writebehind
 import traceback
 
+# Messages kept in the client's cache. Nothing the bot does relies on it: joins
+# and paging are component interactions and embeds are edited by id
+MESSAGE_CACHE_SIZE = int(os.getenv('MESSAGE_CACHE_SIZE', 100))
+
 class MyBot(commands.Bot):
     def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_messages', MESSAGE_CACHE_SIZE or None)
         super().__init__(*args, **kwargs)
+        # Buttons and selects on messages from before a restart route to the cogs again
+        components.setup(self)
+
+    async def close(self):
+        await super().close()
+        # Persist queued team joins/leaves while the executor is still up
+        await db_writebehind.close_all()
+        # Let queued queries finish, then release pooled database connections
+        database_async.shutdown()
+        database.close_pools()
 
     async def on_ready(self):
         print(f'Logged in as {self.user} ({self.user.id if self.user else ""})')
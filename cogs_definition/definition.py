@@ -2,51 +2,85 @@ print("definition.py is being imported")
 
 import discord
 from discord.ext import commands
+import components
 import database
+import database_async
 
 ALLOWED_MOD_SERVER_ID = 1387399782724669470  # Only mods from this server can delete any definition
 
-def ensure_table():
+def add_definition(title, author, author_id, definition, reference):
+    """Insert a definition and return its serial number within the title."""
     with database.get_db() as conn:
         c = conn.cursor()
-        if database.USE_MYSQL:
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS definitions (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    title VARCHAR(255) NOT NULL,
-                    author VARCHAR(255) NOT NULL,
-                    author_id VARCHAR(32) NOT NULL,
-                    definition TEXT NOT NULL,
-                    reference VARCHAR(255) DEFAULT NULL
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            ''')
-            try:
-                c.execute('ALTER TABLE definitions ADD COLUMN reference VARCHAR(255) DEFAULT NULL')
-            except Exception:
-                pass
-        else:
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS definitions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    author TEXT NOT NULL,
-                    author_id TEXT NOT NULL,
-                    definition TEXT NOT NULL,
-                    reference TEXT DEFAULT NULL
-                )
-            ''')
-            try:
-                c.execute('ALTER TABLE definitions ADD COLUMN reference TEXT DEFAULT NULL')
-            except Exception:
-                pass
+        c.execute("SELECT COUNT(*) FROM definitions WHERE title = ?", (title,))
+        serial = c.fetchone()[0] + 1
+        c.execute(
+            "INSERT INTO definitions (title, author, author_id, definition, reference) VALUES (?, ?, ?, ?, ?)",
+            (title, author, author_id, definition, reference)
+        )
         conn.commit()
+        return serial
+
+def get_definitions(title):
+    with database.get_db() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM definitions WHERE title = ? ORDER BY id ASC", (title,))
+        return c.fetchall()
 
-ensure_table()
+def get_definition_title(definition_id):
+    with database.get_db() as conn:
+        c = conn.cursor()
+        c.execute("SELECT title FROM definitions WHERE id = ?", (definition_id,))
+        row = c.fetchone()
+        return row[0] if row else None
+
+def definition_embed(title, definitions, idx):
+    entry = definitions[idx]
+    embed = discord.Embed(title="Definition", color=discord.Color.green())
+    embed.add_field(name=f"**{title}**", value=f"**Author:** {entry[2]}\n**Reference:** {entry[5] or 'None'}\n\n{entry[4]}", inline=False)
+    embed.set_footer(text=f"Definition {idx+1}/{len(definitions)} | Use ◀️ ▶️ to navigate")
+    return embed
+
+def definition_pages(requester_id, definitions, idx):
+    """◀️/▶️ buttons for paging through a title's definitions; each points at its target by id."""
+    previous_id = definitions[(idx - 1) % len(definitions)][0]
+    next_id = definitions[(idx + 1) % len(definitions)][0]
+    return components.view(
+        components.button('def_page', requester_id, previous_id, 'prev', emoji="◀️"),
+        components.button('def_page', requester_id, next_id, 'next', emoji="▶️"),
+    )
+
+def delete_definition(definition_id):
+    with database.get_db() as conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM definitions WHERE id = ?", (definition_id,))
+        conn.commit()
 
 class DefinitionCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        components.route('def_page', self.on_page_button)
+
+    async def cog_unload(self):
+        components.unroute('def_page')
+
+    async def on_page_button(self, interaction, requester_id, definition_id, direction):
+        """Show the definition a ◀️/▶️ button points at; only the user who asked can page"""
+        if interaction.user.id != int(requester_id):
+            await interaction.response.send_message("Only the person who asked can page through these definitions.", ephemeral=True)
+            return
+        title = await database_async.run(get_definition_title, int(definition_id))
+        definitions = await database_async.run(get_definitions, title) if title is not None else []
+        ids = [entry[0] for entry in definitions]
+        if int(definition_id) not in ids:
+            await interaction.response.send_message("That definition has been deleted.", ephemeral=True)
+            return
+        idx = ids.index(int(definition_id))
+        view = definition_pages(requester_id, definitions, idx) if len(definitions) > 1 else components.view()
+        await interaction.response.edit_message(embed=definition_embed(title, definitions, idx), view=view)
+
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot:
@@ -78,96 +112,41 @@ class DefinitionCog(commands.Cog):
                     return
                 if not author:
                     author = ref_msg.author.display_name
-                with database.get_db() as conn:
-                    c = conn.cursor()
-                    if database.USE_MYSQL:
-                        c.execute("SELECT COUNT(*) FROM definitions WHERE title = %s", (title,))
-                    else:
-                        c.execute("SELECT COUNT(*) FROM definitions WHERE title = ?", (title,))
-                    serial = c.fetchone()[0] + 1
-                    if database.USE_MYSQL:
-                        c.execute(
-                            "INSERT INTO definitions (title, author, author_id, definition, reference) VALUES (%s, %s, %s, %s, %s)",
-                            (title, author, str(ref_msg.author.id), definition, reference)
-                        )
-                    else:
-                        c.execute(
-                            "INSERT INTO definitions (title, author, author_id, definition, reference) VALUES (?, ?, ?, ?, ?)",
-                            (title, author, str(ref_msg.author.id), definition, reference)
-                        )
-                    conn.commit()
+                serial = await database_async.run(
+                    add_definition, title, author, str(ref_msg.author.id), definition, reference
+                )
                 await message.channel.send(f"Definition for **{title}** by **{author}** saved! Serial: `{serial}`")
                 return
             # OUTPUT DEFINITIONS: If not a reply
             if cmd:
                 title = cmd
-                with database.get_db() as conn:
-                    c = conn.cursor()
-                    if database.USE_MYSQL:
-                        c.execute("SELECT * FROM definitions WHERE title = %s ORDER BY id ASC", (title,))
-                    else:
-                        c.execute("SELECT * FROM definitions WHERE title = ? ORDER BY id ASC", (title,))
-                    definitions = c.fetchall()
+                definitions = await database_async.run(get_definitions, title)
                 if not definitions:
                     await message.channel.send(f"No definitions found for **{title}**.")
                     return
-                current = 0
-                def make_embed(idx):
-                    entry = definitions[idx]
-                    embed = discord.Embed(title="Definition", color=discord.Color.green())
-                    if database.USE_MYSQL:
-                        embed.add_field(name=f"**{title}**", value=f"**Author:** {entry[2]}\n**Reference:** {entry[5] or 'None'}\n\n{entry[4]}", inline=False)
-                    else:
-                        embed.add_field(name=f"**{title}**", value=f"**Author:** {entry[2]}\n**Reference:** {entry[5] or 'None'}\n\n{entry[4]}", inline=False)
-                    embed.set_footer(text=f"Definition {idx+1}/{len(definitions)} | Use ◀️ ▶️ to navigate")
-                    return embed
-                msg = await message.channel.send(embed=make_embed(current))
                 if len(definitions) > 1:
-                    await msg.add_reaction("◀️")
-                    await msg.add_reaction("▶️")
-                def check(reaction, user):
-                    return user == message.author and reaction.message.id == msg.id and str(reaction.emoji) in ["◀️", "▶️"]
-                while True and len(definitions) > 1:
-                    try:
-                        reaction, user = await self.bot.wait_for('reaction_add', timeout=600.0, check=check)
-                        if str(reaction.emoji) == "▶️":
-                            current = (current + 1) % len(definitions)
-                            await msg.edit(embed=make_embed(current))
-                        elif str(reaction.emoji) == "◀️":
-                            current = (current - 1) % len(definitions)
-                            await msg.edit(embed=make_embed(current))
-                        await msg.remove_reaction(reaction, user)
-                    except Exception:
-                        break
+                    await message.channel.send(embed=definition_embed(title, definitions, 0), view=definition_pages(message.author.id, definitions, 0))
+                else:
+                    await message.channel.send(embed=definition_embed(title, definitions, 0))
                 return
 
     @commands.command(name="del_definition", usage="<serial number> <title>", help="Delete a definition by serial number (author or moderator from the allowed server only). Example: dm.del_definition 2 Python")
     async def del_definition(self, ctx, serial: int, *, title: str):
-        with database.get_db() as conn:
-            c = conn.cursor()
-            if database.USE_MYSQL:
-                c.execute("SELECT * FROM definitions WHERE title = %s ORDER BY id ASC", (title,))
-            else:
-                c.execute("SELECT * FROM definitions WHERE title = ? ORDER BY id ASC", (title,))
-            definitions = c.fetchall()
-            if not definitions or serial < 1 or serial > len(definitions):
-                await ctx.send(f"No definition with serial `{serial}` found for **{title}**.")
-                return
-            entry = definitions[serial - 1]
-            is_author = str(ctx.author.id) == entry[3]  # author_id is at index 3
-            is_mod = (
-                ctx.guild
-                and ctx.guild.id == ALLOWED_MOD_SERVER_ID
-                and ctx.author.guild_permissions.manage_messages
-            )
-            if not (is_author or is_mod):
-                await ctx.send("You do not have permission to delete this definition. Only the author or a moderator from the allowed server can delete it.")
-                return
-            if database.USE_MYSQL:
-                c.execute("DELETE FROM definitions WHERE id = %s", (entry[0],))
-            else:
-                c.execute("DELETE FROM definitions WHERE id = ?", (entry[0],))
-            conn.commit()
+        definitions = await database_async.run(get_definitions, title)
+        if not definitions or serial < 1 or serial > len(definitions):
+            await ctx.send(f"No definition with serial `{serial}` found for **{title}**.")
+            return
+        entry = definitions[serial - 1]
+        is_author = str(ctx.author.id) == entry[3]  # author_id is at index 3
+        is_mod = (
+            ctx.guild
+            and ctx.guild.id == ALLOWED_MOD_SERVER_ID
+            and ctx.author.guild_permissions.manage_messages
+        )
+        if not (is_author or is_mod):
+            await ctx.send("You do not have permission to delete this definition. Only the author or a moderator from the allowed server can delete it.")
+            return
+        await database_async.run(delete_definition, entry[0])
         await ctx.send(f"Definition #{serial} for **{title}** deleted.")
 
 async def setup(bot):
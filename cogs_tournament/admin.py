@@ -1,36 +1,102 @@
 import discord
 from discord.ext import commands
-from database import set_channel, get_channel
+import database
+import database_async
 import config
 
 class Admin(commands.Cog):
     """Commands for bot administration and configuration."""
     def __init__(self, bot):
         self.bot = bot
+        # (guild_id, channel_type) -> channel_id for every configured channel
+        self.channel_cache = None
+        self.channel_cache_stats = {'hits': 0, 'misses': 0, 'loads': 0}
+        # (guild_id, channel_type) -> resolved discord.TextChannel
+        self.resolved_channels = {}
 
-    def get_channel_id(self, channel_name, guild_id=None):
-        # channel_name: mod_channel, event_channel, team_channel, log_channel, join_channel, game_channel
+    async def cog_load(self):
+        await self.load_channel_cache()
+
+    async def load_channel_cache(self):
+        """Read the whole channels table into memory; get_channel_id never queries after this."""
+        rows = await database_async.get_all_channels()
+        self.channel_cache = {(guild_id, channel_type): channel_id for guild_id, channel_type, channel_id in rows}
+        self.channel_cache_stats['loads'] += 1
+
+    async def get_channel_id(self, channel_name, guild_id=None):
+        # channel_name: mod, event, team, log, join, game
         if guild_id is None:
             return None
-        return get_channel(guild_id, channel_name)
+        if self.channel_cache is None:
+            await self.load_channel_cache()
+        channel_id = self.channel_cache.get((guild_id, channel_name))
+        # A miss is a channel that isn't configured; the cache holds the whole table
+        self.channel_cache_stats['hits' if channel_id else 'misses'] += 1
+        return channel_id
+
+    async def resolve_channel(self, guild, channel_type):
+        """Return the TextChannel configured for ``channel_type`` in ``guild``, or None.
+
+        ``guild`` may be a discord.Guild or a guild id. Pass the guild of the
+        message, reaction or context being handled.
+        """
+        if guild is None:
+            return None
+        guild_id = guild if isinstance(guild, int) else guild.id
+        channel = self.resolved_channels.get((guild_id, channel_type))
+        if channel is not None:
+            return channel
+        channel_id = await self.get_channel_id(channel_type, guild_id)
+        if not channel_id:
+            return None
+        if isinstance(guild, int):
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                return None
+        channel = guild.get_channel(channel_id)
+        if not isinstance(channel, discord.TextChannel):
+            return None
+        self.resolved_channels[(guild_id, channel_type)] = channel
+        return channel
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self._forget_resolved(lambda cached: cached.id == channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self._forget_resolved(lambda cached: cached.guild.id == guild.id)
+
+    def _forget_resolved(self, predicate):
+        for key, cached in list(self.resolved_channels.items()):
+            if predicate(cached):
+                del self.resolved_channels[key]
+
+    async def store_channel(self, guild_id, channel_type, channel_id):
+        """Write a channel setting (None clears it) to the database and the cache."""
+        await database_async.set_channel(guild_id, channel_type, channel_id)
+        self.resolved_channels.pop((guild_id, channel_type), None)
+        if self.channel_cache is None:
+            await self.load_channel_cache()
+        elif channel_id is None:
+            self.channel_cache.pop((guild_id, channel_type), None)
+        else:
+            self.channel_cache[(guild_id, channel_type)] = channel_id
 
     async def check_mod_channel(self, ctx):
         """Check if command is being used in the mod channel"""
-        mod_channel_id = self.get_channel_id("mod", ctx.guild.id)
+        mod_channel_id = await self.get_channel_id("mod", ctx.guild.id)
         if not mod_channel_id:
             await ctx.send("❌ Mod channel not configured. Please set it up first with `dm.set_channel mod #channel`")
             return False
         if ctx.channel.id != mod_channel_id:
-            mod_channel = ctx.guild.get_channel(mod_channel_id)
+            mod_channel = await self.resolve_channel(ctx.guild, "mod")
             await ctx.send(f"❌ This command can only be used in the mod channel: {mod_channel.mention if mod_channel else f'<#{mod_channel_id}>'}")
             return False
         return True
 
     async def log_mod_action(self, ctx, command_name, details=None):
-        log_channel_id = self.get_channel_id("log", ctx.guild.id)
-        if not log_channel_id:
-            return
-        log_channel = self.bot.get_channel(log_channel_id)
+        log_channel = await self.resolve_channel(ctx.guild, "log")
         if not log_channel:
             return
         embed = discord.Embed(
@@ -55,7 +121,7 @@ class Admin(commands.Cog):
         if mode not in ("definition", "tournament", "both"):
             await ctx.send("Invalid mode. Choose from: definition, tournament, both.")
             return
-        config.set_mode(mode)
+        await database_async.run(config.set_mode, mode)
         await ctx.send(f"Bot mode set to **{mode}**. Reloading cogs...")
         await self.bot.reload_cogs(mode)
         await ctx.send(f"Cogs reloaded for mode: **{mode}**.")
@@ -86,7 +152,7 @@ class Admin(commands.Cog):
             await ctx.send(f"Invalid channel type. Available types: {', '.join(valid_types)}")
             return
             
-        set_channel(ctx.guild.id, channel_type, channel.id)
+        await self.store_channel(ctx.guild.id, channel_type, channel.id)
         await ctx.send(f"✅ Set **{channel_type}** channel to {channel.mention}")
         details = f"Set `{channel_type}` channel to {channel.mention} ({channel.id})"
         await self.log_mod_action(ctx, "set_channel", details)
@@ -113,7 +179,7 @@ class Admin(commands.Cog):
             return
             
         # Set to None to clear the channel
-        set_channel(ctx.guild.id, channel_type, None)
+        await self.store_channel(ctx.guild.id, channel_type, None)
         await ctx.send(f"✅ Cleared **{channel_type}** channel configuration")
         details = f"Cleared `{channel_type}` channel configuration"
         await self.log_mod_action(ctx, "clear_channel", details)
@@ -128,7 +194,7 @@ class Admin(commands.Cog):
         types = ["mod", "event", "team", "log", "join", "game"]
         desc = ""
         for t in types:
-            cid = get_channel(ctx.guild.id, t)
+            cid = await self.get_channel_id(t, ctx.guild.id)
             if cid:
                 ch = ctx.guild.get_channel(cid)
                 desc += f"**{t.capitalize()}**: {ch.mention if ch else f'<#{cid}>'}\n"
@@ -143,11 +209,89 @@ class Admin(commands.Cog):
         if not await self.check_mod_channel(ctx):
             return
             
-        import config
-        mode = config.get_mode()
+        mode = await database_async.run(config.get_mode)
         await ctx.send(f"Current bot mode: **{mode}**")
         await self.log_mod_action(ctx, "show_mode")
 
+    @commands.command(name="db_stats")
+    @commands.has_permissions(administrator=True)
+    async def db_stats(self, ctx):
+        """Show database connection pool counters (admin only)."""
+        if not await self.check_mod_channel(ctx):
+            return
+
+        stats = await database_async.run(database.pool_stats)
+        if not stats:
+            await ctx.send("No database connections have been opened yet.")
+            return
+        embed = discord.Embed(title="🗄️ Database Pool", color=discord.Color.blue())
+        for backend, data in stats.items():
+            embed.add_field(
+                name=backend,
+                value=(
+                    f"**Open:** {data['size']}/{data['max_size']} ({data['idle']} idle)\n"
+                    f"**Hits/Misses:** {data['hits']}/{data['misses']} ({data['hit_rate']:.0%})\n"
+                    f"**Waits:** {data['waits']} (avg {data['avg_wait'] * 1000:.1f} ms, max {data['max_wait'] * 1000:.1f} ms)\n"
+                    f"**Timeouts:** {data['timeouts']} | **Reaped:** {data['reaped']} | **Failed checks:** {data['health_failures']}"
+                ),
+                inline=False
+            )
+        failover = await database_async.run(database.failover_stats)
+        if failover:
+            embed.add_field(
+                name="failover",
+                value=(
+                    f"**State:** {failover['state']} | **Journal:** {failover['journal'] if failover['journal'] is not None else 'unknown'} pending\n"
+                    f"**Failovers:** {failover['failovers']} | **Recoveries:** {failover['recoveries']}\n"
+                    f"**Replayed:** {failover['replayed']} | **Dropped:** {failover['dropped']}"
+                ),
+                inline=False
+            )
+        lookups = self.channel_cache_stats['hits'] + self.channel_cache_stats['misses']
+        embed.add_field(
+            name="channel cache",
+            value=(
+                f"**Entries:** {len(self.channel_cache or {})} | **Loads:** {self.channel_cache_stats['loads']}\n"
+                f"**Lookups:** {lookups} ({self.channel_cache_stats['hits']} configured, {self.channel_cache_stats['misses']} unset), no DB round trips"
+            ),
+            inline=False
+        )
+        team_cog = self.bot.get_cog('Team')
+        if team_cog:
+            writes = team_cog.membership.stats
+            embed.add_field(
+                name="membership writes",
+                value=(
+                    f"**Pending:** {team_cog.membership.pending} | **Written:** {writes['written']} in {writes['batches']} batches\n"
+                    f"**Coalesced:** {writes['coalesced']} | **Failed flushes:** {writes['failures']} | **Last flush:** {writes['last_flush_ms']:.1f} ms"
+                ),
+                inline=False
+            )
+        leaderboard_cog = self.bot.get_cog('Leaderboard')
+        if leaderboard_cog:
+            refresh = leaderboard_cog.refresher.stats
+            embed.add_field(
+                name="leaderboard refresh",
+                value=(
+                    f"**Requested:** {refresh['requested']} | **Rendered:** {refresh['rendered']} | **Coalesced:** {refresh['coalesced']}\n"
+                    f"**Pending:** {leaderboard_cog.refresher.pending} | **Failed:** {refresh['failed']} | **Window:** {leaderboard_cog.refresher.window:g}s"
+                ),
+                inline=False
+            )
+        event_cog = self.bot.get_cog('Event')
+        if event_cog and event_cog.load_stats:
+            load = event_cog.load_stats
+            embed.add_field(
+                name="warm start",
+                value=(
+                    f"**Loaded:** {load['events']} events, {load['sections']} sections, "
+                    f"{load['teams']} teams, {load['members']} members\n"
+                    f"**Took:** {load['seconds'] * 1000:.1f} ms"
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
     @commands.command(name="help", usage="<tournament|definitions>", help="Show help for the bot systems. Usage: dm.help tournament or dm.help definitions")
     async def help_command(self, ctx, *, arg: str = ""):
         if not await self.check_mod_channel(ctx):
@@ -161,7 +305,7 @@ class Admin(commands.Cog):
                            "• **Mod Channel**: All admin commands (here)\n"
                            "• **Event Channel**: Tournament announcements + auto role management\n"
                            "• **Team Channel**: Tournament embed with clickable teams (DM details)\n"
-                           "• **Join Channel**: Reaction-based team joining\n"
+                           "• **Join Channel**: Pick a team from the join embed to join, or leave with its button\n"
                            "• **Log Channel**: All tournament changes logged\n"
                            "• **Game Channel**: Auto-created for each tournament"
             )
@@ -202,7 +346,11 @@ class Admin(commands.Cog):
                     "• `dm.create_leaderboard <event_id>` - Create leaderboard\n"
                     "• `dm.set_score <event_id> <team_name> <score>` - Set team score\n"
                     "• `dm.add_score <event_id> <team_name> <points>` - Add points\n"
-                    "• `dm.show_scores <event_id>` - Show all scores"
+                    "• `dm.add_scores <event_id> <team:points> ...` - Add points to several teams\n"
+                    "• `dm.import_scores <event_id> [set|add] [apply]` - Import scores from an attached CSV/JSON\n"
+                    "• `dm.show_scores <event_id> [page]` - Show scores, 10 teams per page\n"
+                    "• `dm.score_history <event_id> <team_name>` - Recent score changes for a team\n"
+                    "• `dm.scores_at <event_id> <YYYY-MM-DD> <HH:MM>` - Leaderboard at a past time (UTC)"
                 ),
                 inline=False
             )
@@ -239,7 +387,7 @@ class Admin(commands.Cog):
                 value=(
                     "Mention the bot and type: `define <title>` or `definition <title>`\n"
                     "- Example: `@Bot define Python`\n"
-                    "- If multiple definitions exist, use ◀️ ▶️ reactions to navigate."
+                    "- If multiple definitions exist, use the ◀️ ▶️ buttons to navigate."
                 ),
                 inline=False
             )
@@ -276,7 +424,8 @@ class Admin(commands.Cog):
                     "• `dm.set_channel <type> <#channel>` - Set channel for specific purpose\n"
                     "• `dm.show_channels` - Show all configured channels\n"
                     "• `dm.set_mode <mode>` - Set bot mode (definition/tournament/both)\n"
-                    "• `dm.show_mode` - Show current bot mode"
+                    "• `dm.show_mode` - Show current bot mode\n"
+                    "• `dm.db_stats` - Show database pool and failover stats"
                 ),
                 inline=False
             )
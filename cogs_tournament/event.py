@@ -1,13 +1,20 @@
 from discord.ext import commands
 import discord
 import re
-import database
+import time
+import database_async
+import db_writebehind
+import embed_registry
+from embed_registry import EmbedRegistry
+from tournament_model import Event as EventModel, TournamentRegistry
 
 class Event(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.events = {}
+        self.events = TournamentRegistry()  # Every loaded event, with team lookups
         self.next_event_id = 1
+        self.load_stats = None
+        self.event_embeds = EmbedRegistry(embed_registry.EVENT, int)  # Join embed per event
         print('[DEBUG] Event cog initialized')
 
     async def check_mod_channel(self, ctx):
@@ -29,17 +36,13 @@ class Event(commands.Cog):
             return
         name, max_sections = match.group(1).strip(), int(match.group(2))
         # Duplicate event name check
-        existing_events = database.list_events(ctx.guild.id)
+        existing_events = await database_async.list_events(ctx.guild.id)
         for eid, ename, _ in existing_events:
             if isinstance(ename, str) and ename.lower() == name.lower():
                 await ctx.send(f"❌ An event with the name **{name}** already exists (ID: {eid}).")
                 return
-        event_id = database.add_event(ctx.guild.id, name, max_sections)
-        self.events[event_id] = {
-            'name': name,
-            'max_sections': max_sections,
-            'sections': {}
-        }
+        event_id = await database_async.add_event(ctx.guild.id, name, max_sections)
+        event = self.events.add_event(EventModel(event_id, ctx.guild.id, name, max_sections))
         role_name = f"🏆 {name}"
         try:
             event_role = await ctx.guild.create_role(
@@ -47,77 +50,67 @@ class Event(commands.Cog):
                 color=discord.Color.gold(),
                 reason=f"Auto-created role for tournament: {name}"
             )
-            self.events[event_id]['role_id'] = event_role.id
+            event.role_id = event_role.id
         except Exception as e:
             await ctx.send(f"⚠️ Could not create event role: {e}")
             event_role = None
         admin_cog = self.bot.get_cog('Admin')
         game_channel = None
         if admin_cog:
-            mod_channel_id = admin_cog.get_channel_id("mod", ctx.guild.id)
-            if mod_channel_id:
-                mod_channel = ctx.guild.get_channel(mod_channel_id)
-                if mod_channel and mod_channel.category:
-                    try:
-                        game_channel = await ctx.guild.create_text_channel(
-                            name=f"🎮 {name.lower().replace(' ', '-')}",
-                            category=mod_channel.category,
-                            reason=f"Auto-created game channel for tournament: {name}"
-                        )
-                        self.events[event_id]['game_channel_id'] = game_channel.id
-                        if event_role:
-                            await game_channel.set_permissions(event_role, 
-                                read_messages=True, 
-                                send_messages=True,
-                                reason=f"Granting access to {name} participants"
-                            )
-                        await game_channel.set_permissions(ctx.guild.default_role, 
-                            read_messages=False, 
-                            send_messages=False,
-                            reason="Restricting access to tournament participants only"
-                        )
-                    except Exception as e:
-                        await ctx.send(f"⚠️ Could not create game channel: {e}")
-        if admin_cog:
-            event_channel_id = admin_cog.get_channel_id("event", ctx.guild.id)
-            if event_channel_id:
-                event_channel = self.bot.get_channel(event_channel_id)
-                if event_channel:
-                    embed = discord.Embed(
-                        title=f"🎯 Tournament Announcement: {name}",
-                        description=f"A new tournament has been created!",
-                        color=discord.Color.green()
+            mod_channel = await admin_cog.resolve_channel(ctx.guild, "mod")
+            if mod_channel and mod_channel.category:
+                try:
+                    game_channel = await ctx.guild.create_text_channel(
+                        name=f"🎮 {name.lower().replace(' ', '-')}",
+                        category=mod_channel.category,
+                        reason=f"Auto-created game channel for tournament: {name}"
                     )
-                    embed.add_field(name="Event ID", value=str(event_id), inline=True)
-                    embed.add_field(name="Max Sections", value=str(max_sections), inline=True)
-                    embed.add_field(name="Status", value="🟡 Open for Registration", inline=True)
+                    event.game_channel_id = game_channel.id
                     if event_role:
-                        embed.add_field(name="Event Role", value=f"{event_role.mention}\n*Join teams to get this role automatically*", inline=False)
-                    if game_channel:
-                        embed.add_field(name="Game Channel", value=f"{game_channel.mention}\n*Only participants can access*", inline=False)
-                    embed.add_field(name="How to Join", value="React to the join embed in the join channel to join teams!", inline=False)
-                    role_mention = f"{event_role.mention} " if event_role else ""
-                    await event_channel.send(f"{role_mention}🎯 **NEW TOURNAMENT!** 🎯", embed=embed)
-        if admin_cog:
-            join_channel_id = admin_cog.get_channel_id("join", ctx.guild.id)
-            if join_channel_id:
-                join_channel = self.bot.get_channel(join_channel_id)
-                if join_channel:
-                    embed = discord.Embed(
-                        title=f"🎯 {name}",
-                        description="React with section emojis to join teams!\n\n**Sections:**\nNo sections created yet.",
-                        color=discord.Color.green()
+                        await game_channel.set_permissions(event_role, 
+                            read_messages=True, 
+                            send_messages=True,
+                            reason=f"Granting access to {name} participants"
+                        )
+                    await game_channel.set_permissions(ctx.guild.default_role, 
+                        read_messages=False, 
+                        send_messages=False,
+                        reason="Restricting access to tournament participants only"
                     )
-                    embed.add_field(name="Event ID", value=str(event_id), inline=True)
-                    embed.add_field(name="Max Sections", value=str(max_sections), inline=True)
-                    embed.add_field(name="Status", value="🟡 Open for Registration", inline=True)
-                    embed_message = await join_channel.send(embed=embed)
-                    if not hasattr(self, 'event_embeds'):
-                        self.event_embeds = {}
-                    self.event_embeds[event_id] = embed_message.id
-                    await ctx.send(f"✅ Event created: **{name}** (ID: `{event_id}`)\n📋 Join embed posted in {join_channel.mention}")
-                else:
-                    await ctx.send(f"Event created: **{name}** (ID: `{event_id}`), Max Sections: {max_sections}\n⚠️ Join channel not found.")
+                except Exception as e:
+                    await ctx.send(f"⚠️ Could not create game channel: {e}")
+        if admin_cog:
+            event_channel = await admin_cog.resolve_channel(ctx.guild, "event")
+            if event_channel:
+                embed = discord.Embed(
+                    title=f"🎯 Tournament Announcement: {name}",
+                    description=f"A new tournament has been created!",
+                    color=discord.Color.green()
+                )
+                embed.add_field(name="Event ID", value=str(event_id), inline=True)
+                embed.add_field(name="Max Sections", value=str(max_sections), inline=True)
+                embed.add_field(name="Status", value="🟡 Open for Registration", inline=True)
+                if event_role:
+                    embed.add_field(name="Event Role", value=f"{event_role.mention}\n*Join teams to get this role automatically*", inline=False)
+                if game_channel:
+                    embed.add_field(name="Game Channel", value=f"{game_channel.mention}\n*Only participants can access*", inline=False)
+                embed.add_field(name="How to Join", value="Pick a team on the join embed in the join channel to join!", inline=False)
+                role_mention = f"{event_role.mention} " if event_role else ""
+                await event_channel.send(f"{role_mention}🎯 **NEW TOURNAMENT!** 🎯", embed=embed)
+        if admin_cog:
+            join_channel = await admin_cog.resolve_channel(ctx.guild, "join")
+            if join_channel:
+                embed = discord.Embed(
+                    title=f"🎯 {name}",
+                    description="Pick a team below to join!\n\n**Sections:**\nNo sections created yet.",
+                    color=discord.Color.green()
+                )
+                embed.add_field(name="Event ID", value=str(event_id), inline=True)
+                embed.add_field(name="Max Sections", value=str(max_sections), inline=True)
+                embed.add_field(name="Status", value="🟡 Open for Registration", inline=True)
+                embed_message = await join_channel.send(embed=embed)
+                await self.event_embeds.set(event_id, ctx.guild.id, join_channel.id, embed_message.id)
+                await ctx.send(f"✅ Event created: **{name}** (ID: `{event_id}`)\n📋 Join embed posted in {join_channel.mention}")
             else:
                 await ctx.send(f"Event created: **{name}** (ID: `{event_id}`), Max Sections: {max_sections}\n⚠️ Join channel not configured. Use `dm.set_channel join #channel`")
         else:
@@ -129,7 +122,7 @@ class Event(commands.Cog):
             return
             
         print('[DEBUG] list_events command called')
-        events = database.list_events(ctx.guild.id)
+        events = await database_async.list_events(ctx.guild.id)
         print(f'[DEBUG] Events from DB: {events}')
         if not events:
             await ctx.send("No events found.")
@@ -154,58 +147,37 @@ class Event(commands.Cog):
         event_name = None
         if not event:
             # Try to get from DB
-            db_event = database.get_event(event_id)
+            db_event = await database_async.get_event(event_id)
             if not db_event:
                 await ctx.send(f"Event with ID `{event_id}` not found.")
                 return
             event_name = db_event[2]  # type: ignore
         else:
-            event_name = event['name']
+            event_name = event.name
 
-        # Delete all section embeds (memory)
+        # Stop tracking the section, team channel and leaderboard embeds
         if event and team_cog:
-            for sect_name in event.get('sections', {}).keys():
-                section_key = f"{event_id}_{sect_name}"
-                if section_key in team_cog.section_embeds:
-                    del team_cog.section_embeds[section_key]
+            for sect_name in event.sections:
+                await team_cog.section_embeds.discard(f"{event_id}_{sect_name}")
+        if team_cog:
+            await team_cog.team_channel_embeds.discard(event_id)
 
-        # Delete leaderboard embed (memory)
-        if leaderboard_cog and event_id in getattr(leaderboard_cog, 'leaderboard_embeds', {}):
-            del leaderboard_cog.leaderboard_embeds[event_id]
-        if leaderboard_cog and event_id in getattr(leaderboard_cog, 'scores', {}):
-            del leaderboard_cog.scores[event_id]
+        if leaderboard_cog:
+            await leaderboard_cog.leaderboard_embeds.discard(event_id)
+            leaderboard_cog.forget_event(event_id)
 
         # Remove from DB (event, sections, teams, team_members, leaderboard, user_event_participation, team_event_stats)
         try:
-            with database.get_db() as conn:
-                c = conn.cursor()
-                c.execute('DELETE FROM leaderboard WHERE event_id = %s', (event_id,))
-                c.execute('DELETE FROM team_event_stats WHERE event_id = %s', (event_id,))
-                c.execute('DELETE FROM user_event_participation WHERE event_id = %s', (event_id,))
-                # Remove teams and members
-                c.execute('SELECT section_id FROM sections WHERE event_id = %s', (event_id,))
-                # IDs in these tables are always integers; suppress linter warning if needed
-                section_rows = c.fetchall()
-                section_ids = [int(row[0]) for row in section_rows]  # type: ignore
-                for section_id in section_ids:
-                    c.execute('SELECT team_id FROM teams WHERE section_id = %s', (int(section_id),))
-                    team_rows = c.fetchall()
-                    team_ids = [int(row[0]) for row in team_rows]  # type: ignore
-                    for team_id in team_ids:
-                        c.execute('DELETE FROM team_members WHERE team_id = %s', (int(team_id),))
-                    c.execute('DELETE FROM teams WHERE section_id = %s', (int(section_id),))
-                c.execute('DELETE FROM sections WHERE event_id = %s', (event_id,))
-                c.execute('DELETE FROM events WHERE event_id = %s', (event_id,))
-                conn.commit()
+            # Queued joins/leaves must land before the cascade, not recreate rows after it
+            await db_writebehind.flush_all()
+            await database_async.delete_event_cascade(event_id)
         except Exception as e:
             await ctx.send(f"⚠️ Error deleting event from database: {e}")
             return
 
         # Delete the event (memory)
-        if event_id in self.events:
-            del self.events[event_id]
-        if hasattr(self, 'event_embeds') and event_id in self.event_embeds:
-            del self.event_embeds[event_id]
+        self.events.remove_event(event_id)
+        await self.event_embeds.discard(event_id)
 
         # Attempt to delete the game channel from Discord
         def normalize_channel_name(name):
@@ -214,8 +186,8 @@ class Event(commands.Cog):
             return name.lower().replace(' ', '').replace('-', '').replace('_', '')
 
         game_channel_id = None
-        if event and 'game_channel_id' in event:
-            game_channel_id = event['game_channel_id']
+        if event:
+            game_channel_id = event.game_channel_id
         game_channel = None
         if game_channel_id:
             game_channel = ctx.guild.get_channel(game_channel_id)
@@ -235,18 +207,16 @@ class Event(commands.Cog):
                 await ctx.send(f"⚠️ Could not delete game channel: {e}")
 
         # Send log message
-        log_channel_id = admin_cog.get_channel_id("log", ctx.guild.id) if admin_cog else None
-        if log_channel_id:
-            log_channel = self.bot.get_channel(log_channel_id)
-            if log_channel:
-                embed = discord.Embed(
-                    title="🗑️ Event Closed",
-                    description=f"Event **{event_name}** has been permanently closed and all data deleted.",
-                    color=discord.Color.red(),
-                    timestamp=discord.utils.utcnow()
-                )
-                embed.set_footer(text=f"Closed by {ctx.author.name}")
-                await log_channel.send(embed=embed)
+        log_channel = await admin_cog.resolve_channel(ctx.guild, "log") if admin_cog else None
+        if log_channel:
+            embed = discord.Embed(
+                title="🗑️ Event Closed",
+                description=f"Event **{event_name}** has been permanently closed and all data deleted.",
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
+            )
+            embed.set_footer(text=f"Closed by {ctx.author.name}")
+            await log_channel.send(embed=embed)
 
         await ctx.send(f"Event '**{event_name}**' has been permanently closed and all related data deleted.")
 
@@ -263,35 +233,27 @@ class Event(commands.Cog):
         event = self.events.get(event_id)
         event_name = None
         if not event:
-            db_event = database.get_event(event_id)
+            db_event = await database_async.get_event(event_id)
             if not db_event:
                 await ctx.send(f"Event with ID `{event_id}` not found.")
                 return
             event_name = db_event[2]  # type: ignore
         else:
-            event_name = event['name']
+            event_name = event.name
 
-        # Get leaderboard data
-        event_scores = {}
-        if leaderboard_cog and event_id in getattr(leaderboard_cog, 'scores', {}):
-            event_scores = leaderboard_cog.scores[event_id].copy()
-        # If not in memory, try to get from DB
-        if not event_scores:
-            try:
-                with database.get_db() as conn:
-                    c = conn.cursor()
-                    c.execute('SELECT team_name, score FROM team_event_stats WHERE event_id = %s', (event_id,))
-                    event_scores = {row[0]: int(row[1]) for row in c.fetchall()}  # type: ignore
-            except Exception:
-                event_scores = {}
+        # Get the top three, ranked by the leaderboard's in-memory index when it's loaded
+        try:
+            if leaderboard_cog:
+                standings = await leaderboard_cog.standings(event_id, 3)
+            else:
+                standings = (await database_async.get_leaderboard_view(event_id))[:3]
+        except Exception:
+            standings = []
 
-        if not event_scores:
+        if not standings:
             await ctx.send(f"No scores recorded for event '**{event_name}**'. Cannot declare winners.")
             return
 
-        # Sort teams by score
-        sorted_teams = sorted(event_scores.items(), key=lambda x: int(x[1]), reverse=True)
-
         # Create winners embed
         embed = discord.Embed(
             title=f"🏆 Event Results - {event_name}",
@@ -299,61 +261,52 @@ class Event(commands.Cog):
         )
 
         winners = []
-        for i, (team_name, score) in enumerate(sorted_teams[:3], 1):  # Top 3
-            team_details = leaderboard_cog.get_team_details(event_id, team_name) if leaderboard_cog else None
+        for i, row in enumerate(standings[:3], 1):  # Top 3
+            team_name, score = row['name'], row['score']
             medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
             winners.append(f"**{i}st Place:** {team_name} ({score} points)" if i == 1 else f"**{i}nd Place:** {team_name} ({score} points)" if i == 2 else f"**{i}rd Place:** {team_name} ({score} points)")
-            if team_details:
-                embed.add_field(
-                    name=f"{medal} {team_name}",
-                    value=f"**Score:** {score}\n**Section:** {team_details['section']}\n**Leader:** {team_details['leader']}",
-                    inline=False
-                )
+            embed.add_field(
+                name=f"{medal} {team_name}",
+                value=f"**Score:** {score}\n**Section:** {row['section']}\n**Leader:** {row['leader']}",
+                inline=False
+            )
 
         embed.description = "\n".join(winners)
         embed.set_footer(text=f"Event ended by {ctx.author.name}")
 
         # Send to event channel
-        event_channel_id = admin_cog.get_channel_id("event", ctx.guild.id) if admin_cog else None
-        if event_channel_id:
-            event_channel = self.bot.get_channel(event_channel_id)
-            if event_channel:
-                # Tag event role if provided
-                role_mention = f"{event_role} " if event_role else ""
-                await event_channel.send(f"{role_mention}🏆 **EVENT ENDED!** 🏆", embed=embed)
+        event_channel = await admin_cog.resolve_channel(ctx.guild, "event") if admin_cog else None
+        if event_channel:
+            # Tag event role if provided
+            role_mention = f"{event_role} " if event_role else ""
+            await event_channel.send(f"{role_mention}🏆 **EVENT ENDED!** 🏆", embed=embed)
 
-        # Reset leaderboard (memory and DB)
-        if leaderboard_cog and event_id in getattr(leaderboard_cog, 'scores', {}):
-            leaderboard_cog.scores[event_id] = {}
-            await leaderboard_cog.update_leaderboard_embed(event_id)
+        # Reset leaderboard (DB, then the live embed)
         try:
-            with database.get_db() as conn:
-                c = conn.cursor()
-                c.execute('DELETE FROM leaderboard WHERE event_id = %s', (event_id,))
-                c.execute('DELETE FROM team_event_stats WHERE event_id = %s', (event_id,))
-                conn.commit()
+            await database_async.reset_event_scores(event_id, ctx.author.id)
         except Exception as e:
             await ctx.send(f"⚠️ Error resetting leaderboard in database: {e}")
+        if leaderboard_cog:
+            leaderboard_cog.forget_event(event_id)
+            await leaderboard_cog.update_leaderboard_embed(event_id)
 
         # Send log message
-        log_channel_id = admin_cog.get_channel_id("log", ctx.guild.id) if admin_cog else None
-        if log_channel_id:
-            log_channel = self.bot.get_channel(log_channel_id)
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="🏁 Event Ended",
-                    description=f"Event **{event_name}** has ended.\n**Winners:**\n" + "\n".join(winners),
-                    color=discord.Color.green(),
-                    timestamp=discord.utils.utcnow()
-                )
-                log_embed.set_footer(text=f"Ended by {ctx.author.name}")
-                await log_channel.send(embed=log_embed)
+        log_channel = await admin_cog.resolve_channel(ctx.guild, "log") if admin_cog else None
+        if log_channel:
+            log_embed = discord.Embed(
+                title="🏁 Event Ended",
+                description=f"Event **{event_name}** has ended.\n**Winners:**\n" + "\n".join(winners),
+                color=discord.Color.green(),
+                timestamp=discord.utils.utcnow()
+            )
+            log_embed.set_footer(text=f"Ended by {ctx.author.name}")
+            await log_channel.send(embed=log_embed)
 
         await ctx.send(f"Event '**{event_name}**' has ended! Winners have been declared and leaderboard has been reset.")
 
     async def update_event_embed(self, event_id):
         """Update the event embed with current sections and teams"""
-        if not hasattr(self, 'event_embeds') or event_id not in self.event_embeds:
+        if event_id not in self.event_embeds:
             return
             
         event = self.events.get(event_id)
@@ -364,79 +317,52 @@ class Event(commands.Cog):
         if not admin_cog:
             return
             
-        join_channel_id = admin_cog.get_channel_id("join")
-        if not join_channel_id:
-            return
-            
-        join_channel = self.bot.get_channel(join_channel_id)
+        join_channel = await admin_cog.resolve_channel(event.guild_id, "join")
         if not join_channel:
             return
             
-        try:
-            embed_message = await join_channel.fetch_message(self.event_embeds[event_id])
-        except:
-            return
-            
         # Create updated embed
         embed = discord.Embed(
-            title=f"🎯 {event['name']}",
-            description="React with section emojis to join teams!",
+            title=f"🎯 {event.name}",
+            description="Pick a team below to join!",
             color=discord.Color.green()
         )
         
         embed.add_field(name="Event ID", value=str(event_id), inline=True)
-        embed.add_field(name="Max Sections", value=str(event['max_sections']), inline=True)
+        embed.add_field(name="Max Sections", value=str(event.max_sections), inline=True)
         
         # Determine status
-        sections = event.get('sections', {})
+        sections = event.sections
         if not sections:
             embed.add_field(name="Status", value="🟡 Open for Registration", inline=True)
-            embed.description = "React with section emojis to join teams!\n\n**Sections:**\nNo sections created yet."
+            embed.description = "Pick a team below to join!\n\n**Sections:**\nNo sections created yet."
         else:
-            total_teams = sum(len(sect.get('teams', {})) for sect in sections.values())
-            total_members = sum(
-                len(team.get('members', [])) 
-                for sect in sections.values() 
-                for team in sect.get('teams', {}).values()
-            )
             embed.add_field(name="Status", value="🟢 Active", inline=True)
             embed.add_field(name="Sections", value=str(len(sections)), inline=True)
-            embed.add_field(name="Teams", value=str(total_teams), inline=True)
-            embed.add_field(name="Members", value=str(total_members), inline=True)
+            embed.add_field(name="Teams", value=str(event.team_count), inline=True)
+            embed.add_field(name="Members", value=str(event.member_count), inline=True)
             
             # Add sections with teams
             for sect_name, section in sections.items():
-                teams = section.get('teams', {})
-                if teams:
+                if section.teams:
                     section_text = ""
-                    for team_name, team_data in teams.items():
-                        emoji = team_data.get('emoji', '❓')
-                        current_members = len(team_data.get('members', []))
-                        max_members = team_data.get('max_members', 0)
-                        status = "🟢" if current_members < max_members else "🔴"
-                        section_text += f"{status} {emoji} **{team_name}** ({current_members}/{max_members})\n"
+                    for team_name, team in section.teams.items():
+                        emoji = team.emoji or '❓'
+                        status = "🔴" if team.is_full else "🟢"
+                        section_text += f"{status} {emoji} **{team_name}** ({team.member_count}/{team.max_members})\n"
                     embed.add_field(
                         name=f"📋 {sect_name}",
                         value=section_text or "No teams",
                         inline=False
                     )
         
-        await embed_message.edit(embed=embed)
-        
-        # Update reactions
+        # Join selects and the leave button are routed by the Team cog
+        team_cog = self.bot.get_cog('Team')
+        view = team_cog.join_controls(event_id, sections.values()) if team_cog else None
         try:
-            # Clear existing reactions
-            await embed_message.clear_reactions()
-            
-            # Add section emojis
-            for sect_name, section in sections.items():
-                teams = section.get('teams', {})
-                for team_name, team_data in teams.items():
-                    emoji = team_data.get('emoji')
-                    if emoji:
-                        await embed_message.add_reaction(emoji)
+            await self.event_embeds.publish(event_id, join_channel, embed, view)
         except Exception as e:
-            print(f"Error updating reactions: {e}")
+            print(f"Error updating event embed {event_id}: {e}")
 
     @commands.command(name="announce", usage="<event_id> [announcement]", help="Send a tournament announcement to the event channel")
     @commands.has_permissions(administrator=True)
@@ -450,11 +376,11 @@ class Event(commands.Cog):
         role_id = None
         # Check in memory first
         if event:
-            event_name = event['name']
-            role_id = event.get('role_id')
+            event_name = event.name
+            role_id = event.role_id
         else:
             # Fallback: check DB for event
-            db_event = database.get_event(event_id)
+            db_event = await database_async.get_event(event_id)
             if not db_event:
                 await ctx.send(f"Event with ID `{event_id}` not found.")
                 return
@@ -472,14 +398,9 @@ class Event(commands.Cog):
             await ctx.send("Admin cog not available.")
             return
             
-        event_channel_id = admin_cog.get_channel_id("event")
-        if not event_channel_id:
-            await ctx.send("Event channel not configured. Use `dm.set_channel event #channel` first.")
-            return
-            
-        event_channel = self.bot.get_channel(event_channel_id)
+        event_channel = await admin_cog.resolve_channel(ctx.guild, "event")
         if not event_channel:
-            await ctx.send("Event channel not found.")
+            await ctx.send("Event channel not configured. Use `dm.set_channel event #channel` first.")
             return
             
         # Create announcement embed
@@ -501,38 +422,22 @@ class Event(commands.Cog):
         await ctx.send(f"✅ Announcement sent to {event_channel.mention}")
 
     async def cog_load(self):
-        # Load all events, sections, and teams from the database for all guilds
-        for guild in self.bot.guilds:
-            events = database.list_events(guild.id)
-            for event_id, name, max_sections in events:
-                self.events[event_id] = {
-                    'name': name,
-                    'max_sections': max_sections,
-                    'sections': {}
-                }
-                # Load sections for this event
-                sections = database.get_sections(event_id)
-                for section in sections:
-                    section_id, sect_name, max_teams = section
-                    self.events[event_id]['sections'][sect_name] = {
-                        'section_id': section_id,
-                        'max_teams': max_teams,
-                        'teams': {}
-                    }
-                    # Load teams for this section
-                    teams = database.get_teams(section_id)
-                    for team in teams:
-                        team_id, team_name, leader_id, max_members, emoji = team
-                        self.events[event_id]['sections'][sect_name]['teams'][team_name] = {
-                            'team_id': team_id,
-                            'emoji': emoji,
-                            'leader': f"<@{leader_id}>",
-                            'max_members': max_members,
-                            'members': []  # Optionally, load members if needed
-                        }
-                        # Optionally, load team members
-                        members = database.get_team_members_by_id(team_id)
-                        self.events[event_id]['sections'][sect_name]['teams'][team_name]['members'] = [f"<@{uid}>" for uid in members]
+        # Load all events, sections, teams and members in one batch; at startup
+        # bot.guilds is still empty, so that means every guild in the database
+        guild_ids = [guild.id for guild in self.bot.guilds] or None
+        # Queued team joins/leaves must be in the database before we reread it
+        await db_writebehind.flush_all()
+        started = time.perf_counter()
+        rows = await database_async.load_tournament_rows(guild_ids)
+        self.events = TournamentRegistry.from_rows(rows)
+        await self.event_embeds.load()
+        elapsed = time.perf_counter() - started
+        self.load_stats = {key: len(value) for key, value in rows.items()}
+        self.load_stats['seconds'] = elapsed
+        print(
+            f"[Event] Loaded {len(rows['events'])} events, {len(rows['sections'])} sections, "
+            f"{len(rows['teams'])} teams and {len(rows['members'])} members in {elapsed * 1000:.1f} ms"
+        )
 
 async def setup(bot):
     await bot.add_cog(Event(bot)) 
\ No newline at end of file
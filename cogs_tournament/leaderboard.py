@@ -1,47 +1,303 @@
 # cogs/leaderboard.py (rebuilt version)
+import asyncio
+import csv
+import io
+import json
 import discord
 from discord.ext import commands
 import database
+import database_async
+import embed_registry
+from embed_registry import EmbedRegistry
+from ranking import EventRanking
+from refresh_scheduler import RefreshScheduler
+from tournament_model import Section, Team
+from datetime import datetime, timezone
 from typing import List, Tuple, Optional, Dict, Any
 
+MEDALS = {1: "🥇 ", 2: "🥈 ", 3: "🥉 "}
+# Discord allows 25 fields per embed; both sizes stay well under it
+SUMMARY_SIZE = 10  # Teams shown on the channel leaderboard
+PAGE_SIZE = 10  # Teams per dm.show_scores page
+IMPORT_MAX_BYTES = 256 * 1024  # Largest score file dm.import_scores accepts
+
+
+def parse_score_file(filename: str, data: bytes) -> List[Tuple[str, int]]:
+    """[(team_name, value)] from a CSV (``team,value`` rows, optional header) or JSON file.
+
+    JSON may be an object mapping team names to values or a list of [team, value]
+    pairs. Raises ValueError with a message fit for the user.
+    """
+    text = data.decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if isinstance(parsed, dict):
+            pairs = parsed.items()
+        elif isinstance(parsed, list):
+            pairs = parsed
+        else:
+            raise ValueError("Expected an object of team scores or a list of [team, score] pairs.")
+        rows = []
+        for pair in pairs:
+            try:
+                team_name, value = pair
+                # int() would read true/false as 1/0 and silently drop a fraction
+                if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                    raise ValueError(value)
+                rows.append((str(team_name).strip(), int(value)))
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid entry `{pair}`; expected a team name and a whole number.")
+        return rows
+    rows = []
+    for line_no, record in enumerate(csv.reader(io.StringIO(text)), start=1):
+        if not record or not any(cell.strip() for cell in record):
+            continue
+        if len(record) < 2:
+            raise ValueError(f"Line {line_no}: expected `team,value`.")
+        team_name, value = record[0].strip(), record[1].strip()
+        try:
+            rows.append((team_name, int(value)))
+        except ValueError:
+            if line_no == 1:
+                continue  # Header row
+            raise ValueError(f"Line {line_no}: `{value}` is not a whole number.")
+    return rows
+
+
+
+class ScoresPages(discord.ui.View):
+    """Previous/next buttons for a dm.show_scores message; only its author can turn pages."""
+
+    def __init__(self, cog: 'Leaderboard', event_id: int, page: int, pages: int, author_id: int):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.event_id = event_id
+        self.page = page
+        self.pages = pages
+        self.author_id = author_id
+        self.message: Optional[discord.Message] = None
+        self._sync_buttons()
+
+    def _sync_buttons(self) -> None:
+        self.previous_page.disabled = self.page <= 1
+        self.next_page.disabled = self.page >= self.pages
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Run `dm.show_scores` to browse the scores yourself.", ephemeral=True)
+            return False
+        return True
+
+    async def _turn(self, interaction: discord.Interaction, page: int) -> None:
+        embed, self.pages = await self.cog.scores_page(self.event_id, page)
+        self.page = min(page, self.pages)
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, self.page - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, self.page + 1)
+
+    async def on_timeout(self) -> None:
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
 class Leaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.leaderboard_embeds: Dict[int, int] = {}  # Store embed message IDs for each event
+        self.leaderboard_embeds = EmbedRegistry(embed_registry.LEADERBOARD, int)  # Embed message per event
+        self.rankings: Dict[int, EventRanking] = {}  # Live score order per event, loaded on first use
+        # Held around each score write and its ranking update, so the ranking takes
+        # concurrent writes to one event in the order the database applied them
+        self.score_locks: Dict[int, asyncio.Lock] = {}
+        # Score changes only mark the embed dirty; it is re-rendered at most once per window
+        self.refresher = RefreshScheduler(self.update_leaderboard_embed, name='Leaderboard')
+
+    async def cog_load(self):
+        await self.leaderboard_embeds.load()
+        self._loop = asyncio.get_running_loop()
+        database.add_switch_listener(self._on_backend_switch)
+
+    async def cog_unload(self):
+        database.remove_switch_listener(self._on_backend_switch)
+        await self.refresher.close()
+
+    def _on_backend_switch(self, mysql_active: bool) -> None:
+        # Runs on a database thread. Rankings loaded or updated while SQLite stood in
+        # for MySQL are stale, so they are reloaded once MySQL serves again.
+        if mysql_active:
+            self._loop.call_soon_threadsafe(self._reload_rankings)
 
-    def _get_section_name_for_team(self, event_id: int, team_id: int) -> str:
-        """Helper function to get section name for a team"""
+    def _reload_rankings(self) -> None:
+        event_ids = list(self.rankings)
+        self.rankings.clear()
+        for event_id in event_ids:
+            self.schedule_refresh(event_id)
+
+    def _record_totals(self, ranking: EventRanking, totals: Dict[int, int],
+                       deltas: Optional[List[Tuple[int, int]]] = None) -> Dict[int, int]:
+        """Put the totals a score write returned into ``ranking``; returns the scores to report.
+
+        While SQLite stands in for MySQL its totals lack MySQL's rows, so added
+        points are applied to the scores the ranking already holds instead.
+        """
+        if deltas and database.serving_fallback():
+            for team_id, points in deltas:
+                ranking.set(team_id, (ranking.score(team_id) or 0) + points)
+            return {team_id: ranking.score(team_id) for team_id in totals}
+        for team_id, score in totals.items():
+            ranking.set(team_id, score)
+        return totals
+
+    def schedule_refresh(self, event_id: int) -> None:
+        """Queue a re-render of the event's leaderboard embed without waiting for Discord."""
+        if event_id in self.leaderboard_embeds:
+            self.refresher.mark_dirty(event_id)
+
+    async def get_ranking(self, event_id: int) -> EventRanking:
+        """Return the event's ranking, loading it from the database the first time."""
+        ranking = self.rankings.get(event_id)
+        if ranking is None:
+            rows = await database_async.get_leaderboard(event_id)
+            scores = [(int(row[0]), row[1] or 0) for row in rows]
+            live = self._teams_by_id(event_id)
+            if live is not None:
+                scores = [(team_id, score) for team_id, score in scores if team_id in live]
+            ranking = self.rankings.setdefault(event_id, EventRanking(scores))
+        return ranking
+
+    def forget_teams(self, event_id: int, team_ids: Optional[List[int]] = None) -> None:
+        """Drop deleted teams from the event's ranking (all cached scores when team_ids is None)."""
+        ranking = self.rankings.get(event_id)
+        if ranking is not None:
+            if team_ids is None:
+                self.rankings.pop(event_id, None)
+            else:
+                for team_id in team_ids:
+                    ranking.remove(team_id)
+        self.schedule_refresh(event_id)
+
+    def forget_event(self, event_id: int) -> None:
+        """Drop the cached ranking after the event's scores are reset or deleted."""
+        self.rankings.pop(event_id, None)
+        self.refresher.forget(event_id)
+
+    def _teams_by_id(self, event_id: int) -> Optional[Dict[int, Tuple[Section, Team]]]:
+        """team_id -> (section, team) from the in-memory event registry."""
+        event_cog = self.bot.get_cog('Event')
+        event = event_cog.events.get(event_id) if event_cog else None
+        if not event:
+            return None
+        return {team.team_id: (section, team) for section, team in event.teams() if team.team_id is not None}
+
+    def _is_live(self, event, team_id: int) -> bool:
+        located = self.bot.get_cog('Event').events.locate(team_id)
+        return bool(located) and located[0] is event
+
+    async def standings(self, event_id: int, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Ranked rows (rank, team_id, name, score, section, leader, member_count, max_members).
+
+        ``offset``/``limit`` select a slice of the ranking, so a page only looks up
+        the teams it shows. Served from the ranking and the event graph when the
+        event is loaded; otherwise from database.get_leaderboard_view.
+        """
+        event_cog = self.bot.get_cog('Event')
+        event = event_cog.events.get(event_id) if event_cog else None
+        if not event:
+            rows = await database_async.get_leaderboard_view(event_id)
+            ranked = []
+            for i, row in enumerate(rows):
+                rank = ranked[-1]['rank'] if ranked and ranked[-1]['score'] == row['score'] else i + 1
+                ranked.append(dict(row, rank=rank))
+            return ranked[offset:offset + limit] if limit else ranked[offset:]
+        ranking = await self.get_ranking(event_id)
+        # A team deleted behind the ranking's back still holds a place; drop it so
+        # ranks, totals and page sizes only count live teams
+        while True:
+            entries = ranking.top(limit, offset)
+            orphans = [team_id for team_id, _ in entries if not self._is_live(event, team_id)]
+            if not orphans:
+                break
+            for team_id in orphans:
+                ranking.remove(team_id)
+        rows = []
+        for team_id, score in entries:
+            _, section, team = event_cog.events.locate(team_id)
+            rows.append({
+                'rank': ranking.rank(team_id),
+                'team_id': team_id,
+                'name': team.name,
+                'score': score,
+                'section': section.name,
+                'leader': team.leader,
+                'member_count': team.member_count,
+                'max_members': team.max_members,
+            })
+        return rows
+
+    async def scores_page(self, event_id: int, page: int) -> Tuple[discord.Embed, int]:
+        """Embed for one dm.show_scores page (1-based, clamped) and the number of pages."""
+        event_cog = self.bot.get_cog('Event')
+        event = event_cog.events[event_id]
+        ranking = await self.get_ranking(event_id)
+        page = max(page, 1)
+        rows = await self.standings(event_id, PAGE_SIZE, (page - 1) * PAGE_SIZE)
+        # standings() may have dropped deleted teams, so count pages afterwards
+        pages = max(1, -(-len(ranking) // PAGE_SIZE))
+        if page > pages:
+            page = pages
+            rows = await self.standings(event_id, PAGE_SIZE, (page - 1) * PAGE_SIZE)
+        embed = discord.Embed(
+            title=f"📊 Scores - {event.name}",
+            color=discord.Color.blue()
+        )
+        for row in rows:
+            embed.add_field(
+                name=f"{MEDALS.get(row['rank'], '')}#{row['rank']} {row['name']}",
+                value=f"**Score:** {row['score']}\n**Section:** {row['section']}\n**Leader:** {row['leader']}",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {page}/{pages} · {len(ranking)} teams")
+        return embed, pages
+
+    async def team_standing(self, event_id: int, team_name: str) -> Optional[Tuple[int, Optional[int]]]:
+        """(score, rank) for a team, or None if the team isn't in the event. Unscored teams have rank None."""
+        team_id = await self._find_team_id_by_name(event_id, team_name)
+        if not team_id:
+            return None
+        ranking = await self.get_ranking(event_id)
+        return ranking.score(team_id) or 0, ranking.rank(team_id)
+
+    async def _team_ids_by_name(self, event_id: int) -> Dict[str, int]:
+        """team name -> team_id for every team of the event: from memory, else one query."""
+        teams = self._teams_by_id(event_id)
+        if teams is not None:
+            return {team.name: team_id for team_id, (_, team) in teams.items()}
         try:
-            sections = database.get_sections(event_id)
-            for section in sections:
-                # Safe type casting
-                section_id = int(section[0]) if section[0] is not None else 0  # type: ignore
-                teams = database.get_teams(section_id)
-                for team in teams:
-                    current_team_id = int(team[0]) if team[0] is not None else 0  # type: ignore
-                    if current_team_id == team_id:
-                        section_name = str(section[1]) if section[1] is not None else "Unknown"  # type: ignore
-                        return section_name
+            rows = await database_async.get_event_team_ids(event_id)
         except Exception:
-            pass
-        return "Unknown"
+            return {}
+        return {str(row[1]): int(row[0]) for row in rows}
 
-    def _find_team_id_by_name(self, event_id: int, team_name: str) -> Optional[int]:
+    async def _find_team_id_by_name(self, event_id: int, team_name: str) -> Optional[int]:
         """Helper function to find team_id by team name"""
-        try:
-            sections = database.get_sections(event_id)
-            for section in sections:
-                # Safe type casting
-                section_id = int(section[0]) if section[0] is not None else 0  # type: ignore
-                teams = database.get_teams(section_id)
-                for team in teams:
-                    current_team_name = str(team[1]) if team[1] is not None else ""  # type: ignore
-                    if current_team_name == team_name:
-                        team_id = int(team[0]) if team[0] is not None else 0  # type: ignore
-                        return team_id
-        except Exception:
-            pass
-        return None
+        event_cog = self.bot.get_cog('Event')
+        event = event_cog.events.get(event_id) if event_cog else None
+        if event:
+            found = event_cog.events.find_in_event(event_id, team_name)
+            return found[1].team_id if found else None
+        return (await self._team_ids_by_name(event_id)).get(team_name)
 
     async def update_leaderboard_embed(self, event_id: int) -> None:
         """Updates the leaderboard embed for a specific event"""
@@ -55,76 +311,44 @@ class Leaderboard(commands.Cog):
         if not event:
             return
             
-        embed_message_id = self.leaderboard_embeds.get(event_id)
-        if not embed_message_id:
-            return
-            
-        event_channel_id = admin_cog.get_channel_id("event")
-        if not event_channel_id:
+        if event_id not in self.leaderboard_embeds:
             return
             
-        event_channel = self.bot.get_channel(event_channel_id)
+        event_channel = await admin_cog.resolve_channel(event.guild_id, "event")
         if not event_channel:
             return
             
-        try:
-            embed_message = await event_channel.fetch_message(embed_message_id)
-        except Exception:
-            return
-            
         # Create updated leaderboard embed
         embed = discord.Embed(
-            title=f"🏆 Leaderboard - {event['name']}",
+            title=f"🏆 Leaderboard - {event.name}",
             color=discord.Color.gold()
         )
         
-        # Use database-backed leaderboard
+        # Ranked in memory; team details come from the event graph. Only the top
+        # teams are shown so the embed stays within Discord's field limit.
+        footer = f"Last updated: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M:%S')}"
         try:
-            db_scores = database.get_leaderboard(event_id)
-            if not db_scores:
+            rows = await self.standings(event_id, SUMMARY_SIZE)
+            total = len(await self.get_ranking(event_id))  # Live teams only, after standings()
+            if total > len(rows):
+                footer = f"Top {len(rows)} of {total} teams · dm.show_scores {event_id} for the rest · {footer}"
+            if not rows:
                 embed.description = "No scores recorded yet."
             else:
-                # Sort teams by score (already sorted in SQL)
-                for i, score_data in enumerate(db_scores, 1):
-                    # Safe type casting
-                    team_id = int(score_data[0]) if score_data[0] is not None else 0  # type: ignore
-                    score = int(score_data[1]) if score_data[1] is not None else 0  # type: ignore
-                    
-                    team_details = database.get_team_info(team_id)
-                    if team_details:
-                        team_name = str(team_details.get('name', 'Unknown'))
-                        leader_id = int(team_details.get('leader', 0)) if team_details.get('leader') is not None else 0  # type: ignore
-                        max_members = int(team_details.get('max_members', 0)) if team_details.get('max_members') is not None else 0  # type: ignore
-                        
-                        # Get member count
-                        try:
-                            members = database.get_team_members_by_id(team_id)
-                            member_count = len(members) if members else 0
-                        except Exception:
-                            member_count = 0
-                        
-                        # Get section info
-                        section_name = self._get_section_name_for_team(event_id, team_id)
-                        
-                        # Add medal emojis for top 3
-                        medal = ""
-                        if i == 1:
-                            medal = "🥇 "
-                        elif i == 2:
-                            medal = "🥈 "
-                        elif i == 3:
-                            medal = "🥉 "
-                        
-                        embed.add_field(
-                            name=f"{medal}#{i} {team_name}",
-                            value=f"**Score:** {score}\n**Section:** {section_name}\n**Leader:** <@{leader_id}>\n**Members:** {member_count}/{max_members}",
-                            inline=False
-                        )
+                for row in rows:
+                    embed.add_field(
+                        name=f"{MEDALS.get(row['rank'], '')}#{row['rank']} {row['name']}",
+                        value=f"**Score:** {row['score']}\n**Section:** {row['section']}\n**Leader:** {row['leader']}\n**Members:** {row['member_count']}/{row['max_members']}",
+                        inline=False
+                    )
         except Exception as e:
             embed.description = f"Error loading scores: {str(e)}"
         
-        embed.set_footer(text=f"Last updated: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
-        await embed_message.edit(embed=embed)
+        embed.set_footer(text=footer)
+        try:
+            await self.leaderboard_embeds.publish(event_id, event_channel, embed)
+        except Exception as e:
+            print(f"Error updating leaderboard embed for event {event_id}: {e}")
 
     async def check_mod_channel(self, ctx):
         """Check if command is being used in the mod channel"""
@@ -155,31 +379,26 @@ class Leaderboard(commands.Cog):
         
         # Check if leaderboard already exists
         if event_id in self.leaderboard_embeds:
-            await ctx.send(f"Leaderboard for event '**{event['name']}**' already exists.")
+            await ctx.send(f"Leaderboard for event '**{event.name}**' already exists.")
             return
         
         # Send leaderboard embed to event channel
-        event_channel_id = admin_cog.get_channel_id("event")
-        if not event_channel_id:
-            await ctx.send("Event channel not configured. Use `dm.set_channel event #channel` first.")
-            return
-            
-        event_channel = self.bot.get_channel(event_channel_id)
+        event_channel = await admin_cog.resolve_channel(ctx.guild, "event")
         if not event_channel:
-            await ctx.send("Event channel not found.")
+            await ctx.send("Event channel not configured. Use `dm.set_channel event #channel` first.")
             return
             
         embed = discord.Embed(
-            title=f"🏆 Leaderboard - {event['name']}",
+            title=f"🏆 Leaderboard - {event.name}",
             description="No scores recorded yet.",
             color=discord.Color.gold()
         )
         embed.set_footer(text=f"Last updated: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
         
         embed_message = await event_channel.send(embed=embed)
-        self.leaderboard_embeds[event_id] = embed_message.id
+        await self.leaderboard_embeds.set(event_id, ctx.guild.id, event_channel.id, embed_message.id)
         
-        await ctx.send(f"Leaderboard created for event '**{event['name']}**' in {event_channel.mention}")
+        await ctx.send(f"Leaderboard created for event '**{event.name}**' in {event_channel.mention}")
 
     @commands.command(name="set_score", usage="<event_id> <team_name> <score>")
     async def set_score(self, ctx, event_id: int, team_name: str, score: int):
@@ -196,15 +415,17 @@ class Leaderboard(commands.Cog):
             return
             
         # Find team_id by event_id and team_name
-        team_id = self._find_team_id_by_name(event_id, team_name)
+        team_id = await self._find_team_id_by_name(event_id, team_name)
         if not team_id:
-            await ctx.send(f"Team '**{team_name}**' not found in event '**{event_cog.events[event_id]['name']}**'.")
+            await ctx.send(f"Team '**{team_name}**' not found in event '**{event_cog.events[event_id].name}**'.")
             return
             
         try:
-            database.set_leaderboard_score(event_id, team_id, score)
-            await self.update_leaderboard_embed(event_id)
-            await ctx.send(f"Score for team '**{team_name}**' set to **{score}** in event '**{event_cog.events[event_id]['name']}**'")
+            async with self.score_locks.setdefault(event_id, asyncio.Lock()):
+                await database_async.set_leaderboard_score(event_id, team_id, score, ctx.author.id)
+                (await self.get_ranking(event_id)).set(team_id, score)
+            self.schedule_refresh(event_id)
+            await ctx.send(f"Score for team '**{team_name}**' set to **{score}** in event '**{event_cog.events[event_id].name}**'")
         except Exception as e:
             await ctx.send(f"Error setting score: {str(e)}")
 
@@ -223,31 +444,156 @@ class Leaderboard(commands.Cog):
             return
             
         # Find team_id by event_id and team_name
-        team_id = self._find_team_id_by_name(event_id, team_name)
+        team_id = await self._find_team_id_by_name(event_id, team_name)
         if not team_id:
-            await ctx.send(f"Team '**{team_name}**' not found in event '**{event_cog.events[event_id]['name']}**'.")
+            await ctx.send(f"Team '**{team_name}**' not found in event '**{event_cog.events[event_id].name}**'.")
             return
             
         try:
-            # Get current score
-            leaderboard_data = database.get_leaderboard(event_id)
-            leaderboard = {}
-            for score_data in leaderboard_data:
-                tid = int(score_data[0]) if score_data[0] is not None else 0  # type: ignore
-                s = int(score_data[1]) if score_data[1] is not None else 0  # type: ignore
-                leaderboard[tid] = s
-                
-            current_score = leaderboard.get(team_id, 0)
-            new_score = current_score + points
-            database.set_leaderboard_score(event_id, team_id, new_score)
-            await self.update_leaderboard_embed(event_id)
+            # Incremented in the database, so simultaneous scorers can't overwrite each other
+            async with self.score_locks.setdefault(event_id, asyncio.Lock()):
+                ranking = await self.get_ranking(event_id)
+                new_score = await database_async.add_leaderboard_score(event_id, team_id, points, ctx.author.id)
+                new_score = self._record_totals(ranking, {team_id: new_score}, [(team_id, points)])[team_id]
+            self.schedule_refresh(event_id)
             await ctx.send(f"Added **{points}** points to team '**{team_name}**'. New score: **{new_score}**")
         except Exception as e:
             await ctx.send(f"Error adding score: {str(e)}")
 
-    @commands.command(name="show_scores", usage="<event_id>")
-    async def show_scores(self, ctx, event_id: int):
-        """Shows all scores for an event (database-backed)"""
+    @commands.command(name="add_scores", usage="<event_id> <team_name:points> [team_name:points ...]")
+    async def add_scores(self, ctx, event_id: int, *entries: str):
+        """Adds points to several teams at once in a single transaction"""
+        if not await self.check_mod_channel(ctx):
+            return
+            
+        event_cog = self.bot.get_cog('Event')
+        if not event_cog or not hasattr(event_cog, 'events'):
+            await ctx.send("Event data is not available.")
+            return
+        if event_id not in event_cog.events:
+            await ctx.send(f"Event with ID `{event_id}` not found.")
+            return
+        if not entries:
+            await ctx.send("Usage: `dm.add_scores <event_id> <team_name:points> [team_name:points ...]`")
+            return
+            
+        deltas = []
+        names = {}
+        for entry in entries:
+            team_name, sep, points = entry.rpartition(':')
+            try:
+                points = int(points)
+            except ValueError:
+                sep = ''
+            if not sep or not team_name:
+                await ctx.send(f"Invalid entry `{entry}`. Use `team_name:points`.")
+                return
+            team_id = await self._find_team_id_by_name(event_id, team_name)
+            if not team_id:
+                await ctx.send(f"Team '**{team_name}**' not found in event '**{event_cog.events[event_id].name}**'.")
+                return
+            deltas.append((team_id, points))
+            names[team_id] = team_name
+            
+        try:
+            async with self.score_locks.setdefault(event_id, asyncio.Lock()):
+                ranking = await self.get_ranking(event_id)
+                new_scores = await database_async.add_leaderboard_scores(event_id, deltas, ctx.author.id)
+                new_scores = self._record_totals(ranking, new_scores, deltas)
+            self.schedule_refresh(event_id)
+            lines = [f"'**{names[team_id]}**': **{score}**" for team_id, score in new_scores.items()]
+            await ctx.send("Scores updated:\n" + "\n".join(lines))
+        except Exception as e:
+            await ctx.send(f"Error adding scores: {str(e)}")
+
+    @commands.command(name="import_scores", usage="<event_id> [set|add] [apply]")
+    async def import_scores(self, ctx, event_id: int, mode: str = "set", confirm: str = ""):
+        """Imports scores from an attached CSV/JSON file; a dry run unless `apply` is given"""
+        if not await self.check_mod_channel(ctx):
+            return
+            
+        event_cog = self.bot.get_cog('Event')
+        if not event_cog or not hasattr(event_cog, 'events'):
+            await ctx.send("Event data is not available.")
+            return
+        if event_id not in event_cog.events:
+            await ctx.send(f"Event with ID `{event_id}` not found.")
+            return
+        mode = mode.lower()
+        if mode not in ("set", "add") or confirm.lower() not in ("", "apply"):
+            await ctx.send("Usage: `dm.import_scores <event_id> [set|add] [apply]` with a CSV or JSON file attached.")
+            return
+        if not ctx.message.attachments:
+            await ctx.send("Attach a CSV (`team,score` per line) or JSON (`{\"team\": score}`) file.")
+            return
+        attachment = ctx.message.attachments[0]
+        if attachment.size > IMPORT_MAX_BYTES:
+            await ctx.send(f"File too large; the limit is {IMPORT_MAX_BYTES // 1024} KB.")
+            return
+            
+        try:
+            entries = parse_score_file(attachment.filename, await attachment.read())
+        except (ValueError, UnicodeDecodeError) as e:
+            await ctx.send(f"❌ Could not read `{attachment.filename}`: {e}")
+            return
+        if not entries:
+            await ctx.send(f"`{attachment.filename}` has no scores in it.")
+            return
+            
+        # Resolve every name at once
+        team_ids = await self._team_ids_by_name(event_id)
+        unknown = list(dict.fromkeys(name for name, _ in entries if name not in team_ids))
+        if unknown:
+            await ctx.send(
+                f"❌ {len(unknown)} unknown team(s) in event '**{event_cog.events[event_id].name}**', nothing imported: "
+                + ", ".join(f"'**{name}**'" for name in unknown[:20]) + (" …" if len(unknown) > 20 else "")
+            )
+            return
+            
+        ranking = await self.get_ranking(event_id)
+        if mode == "set":
+            # Later lines win
+            changes = {team_ids[name]: value for name, value in entries}
+            preview = dict(changes)
+        else:
+            changes = [(team_ids[name], value) for name, value in entries]
+            preview = {}
+            for team_id, value in changes:
+                preview[team_id] = preview.get(team_id, ranking.score(team_id) or 0) + value
+        names = {team_ids[name]: name for name, _ in entries}
+        lines = [
+            f"'**{names[team_id]}**': {ranking.score(team_id) or 0} → **{score}**"
+            for team_id, score in sorted(preview.items(), key=lambda item: -item[1])
+        ]
+        summary = "\n".join(lines[:PAGE_SIZE * 2]) + (f"\n… and {len(lines) - PAGE_SIZE * 2} more" if len(lines) > PAGE_SIZE * 2 else "")
+        
+        if confirm.lower() != "apply":
+            embed = discord.Embed(
+                title=f"📥 Import preview - {event_cog.events[event_id].name}",
+                description=summary,
+                color=discord.Color.orange()
+            )
+            embed.set_footer(text=f"{len(entries)} lines, {len(preview)} teams ({mode}). Nothing saved; rerun with `apply` to import.")
+            await ctx.send(embed=embed)
+            return
+            
+        async with self.score_locks.setdefault(event_id, asyncio.Lock()):
+            ranking = await self.get_ranking(event_id)
+            try:
+                if mode == "set":
+                    new_scores = await database_async.import_leaderboard_scores(event_id, scores=changes, moderator_id=ctx.author.id)
+                else:
+                    new_scores = await database_async.import_leaderboard_scores(event_id, deltas=changes, moderator_id=ctx.author.id)
+            except Exception as e:
+                await ctx.send(f"Error importing scores: {str(e)}")
+                return
+            new_scores = self._record_totals(ranking, new_scores, changes if mode == "add" else None)
+        self.schedule_refresh(event_id)
+        await ctx.send(f"✅ Imported scores for {len(new_scores)} teams ({mode}).")
+
+    @commands.command(name="show_scores", usage="<event_id> [page]")
+    async def show_scores(self, ctx, event_id: int, page: int = 1):
+        """Shows an event's scores, a page at a time"""
         if not await self.check_mod_channel(ctx):
             return
             
@@ -262,49 +608,99 @@ class Leaderboard(commands.Cog):
         event = event_cog.events[event_id]
         
         try:
-            db_scores = database.get_leaderboard(event_id)
-            if not db_scores:
-                await ctx.send(f"No scores recorded for event '**{event['name']}**'.")
+            if not len(await self.get_ranking(event_id)):
+                await ctx.send(f"No scores recorded for event '**{event.name}**'.")
                 return
                 
-            embed = discord.Embed(
-                title=f"📊 Scores - {event['name']}",
-                color=discord.Color.blue()
-            )
+            embed, pages = await self.scores_page(event_id, page)
+            if pages == 1:
+                await ctx.send(embed=embed)
+                return
+            view = ScoresPages(self, event_id, min(max(page, 1), pages), pages, ctx.author.id)
+            view.message = await ctx.send(embed=embed, view=view)
             
-            # Sort teams by score (already sorted in SQL)
-            for i, score_data in enumerate(db_scores, 1):
-                # Safe type casting
-                team_id = int(score_data[0]) if score_data[0] is not None else 0  # type: ignore
-                score = int(score_data[1]) if score_data[1] is not None else 0  # type: ignore
-                
-                team_details = database.get_team_info(team_id)
-                if team_details:
-                    team_name = str(team_details.get('name', 'Unknown'))
-                    leader_id = int(team_details.get('leader', 0)) if team_details.get('leader') is not None else 0  # type: ignore
-                    
-                    # Get section info
-                    section_name = self._get_section_name_for_team(event_id, team_id)
-                    
-                    # Add medal emojis for top 3
-                    medal = ""
-                    if i == 1:
-                        medal = "🥇 "
-                    elif i == 2:
-                        medal = "🥈 "
-                    elif i == 3:
-                        medal = "🥉 "
-                    
-                    embed.add_field(
-                        name=f"{medal}#{i} {team_name}",
-                        value=f"**Score:** {score}\n**Section:** {section_name}\n**Leader:** <@{leader_id}>",
-                        inline=False
-                    )
+        except Exception as e:
+            await ctx.send(f"Error loading scores: {str(e)}")
+
+    @commands.command(name="score_history", usage="<event_id> <team_name>")
+    async def score_history(self, ctx, event_id: int, team_name: str):
+        """Shows the latest score changes for a team, with who made them"""
+        if not await self.check_mod_channel(ctx):
+            return
             
-            await ctx.send(embed=embed)
+        event_cog = self.bot.get_cog('Event')
+        if not event_cog or not hasattr(event_cog, 'events'):
+            await ctx.send("Event data is not available.")
+            return
+        if event_id not in event_cog.events:
+            await ctx.send(f"Event with ID `{event_id}` not found.")
+            return
             
+        team_id = await self._find_team_id_by_name(event_id, team_name)
+        if not team_id:
+            await ctx.send(f"Team '**{team_name}**' not found in event '**{event_cog.events[event_id].name}**'.")
+            return
+            
+        try:
+            history = await database_async.get_score_history(event_id, team_id, PAGE_SIZE * 2)
         except Exception as e:
-            await ctx.send(f"Error loading scores: {str(e)}")
+            await ctx.send(f"Error loading score history: {str(e)}")
+            return
+        if not history:
+            await ctx.send(f"No score changes recorded for team '**{team_name}**'.")
+            return
+            
+        lines = []
+        for delta, score, kind, moderator_id, created_at in history:
+            when = discord.utils.format_dt(datetime.fromtimestamp(created_at, tz=timezone.utc), 'f')
+            by = f" by <@{moderator_id}>" if moderator_id else ""
+            lines.append(f"{when} `{delta:+}` → **{score}** ({kind}{by})")
+        embed = discord.Embed(
+            title=f"📈 Score History - {team_name}",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Last {len(history)} changes · {event_cog.events[event_id].name}")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="scores_at", usage="<event_id> <YYYY-MM-DD> <HH:MM>")
+    async def scores_at(self, ctx, event_id: int, date: str, clock: str = "23:59"):
+        """Shows the top of the leaderboard as it stood at a past time (UTC)"""
+        if not await self.check_mod_channel(ctx):
+            return
+            
+        event_cog = self.bot.get_cog('Event')
+        if not event_cog or not hasattr(event_cog, 'events'):
+            await ctx.send("Event data is not available.")
+            return
+        if event_id not in event_cog.events:
+            await ctx.send(f"Event with ID `{event_id}` not found.")
+            return
+        try:
+            moment = datetime.strptime(f"{date} {clock}", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+        except ValueError:
+            await ctx.send("Invalid time. Use `YYYY-MM-DD HH:MM` (UTC).")
+            return
+            
+        try:
+            scores = await database_async.get_scores_at(event_id, moment.timestamp())
+        except Exception as e:
+            await ctx.send(f"Error rebuilding scores: {str(e)}")
+            return
+        ranking = EventRanking(scores.items())
+        teams = self._teams_by_id(event_id) or {}
+        embed = discord.Embed(
+            title=f"🕰️ Scores - {event_cog.events[event_id].name}",
+            description=f"As of {discord.utils.format_dt(moment, 'f')}",
+            color=discord.Color.blue()
+        )
+        for team_id, score in ranking.top(PAGE_SIZE):
+            rank = ranking.rank(team_id)
+            name = teams[team_id][1].name if team_id in teams else f"Team {team_id}"
+            embed.add_field(name=f"{MEDALS.get(rank, '')}#{rank} {name}", value=f"**Score:** {score}", inline=False)
+        if not embed.fields:
+            embed.description += "\nNo scores recorded yet."
+        await ctx.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Leaderboard(bot)) 
\ No newline at end of file
@@ -1,8 +1,7 @@
 import discord
 from discord.ext import commands
-import database
+import database_async
 from typing import Optional
-from database import fetch_user_stats
 
 class Stats(commands.Cog):
     def __init__(self, bot):
@@ -22,14 +21,19 @@ class Stats(commands.Cog):
             return
             
         member = member or ctx.author
-        participations = database.get_user_event_participation(ctx.guild.id, member.id)
+        participations = await database_async.get_user_event_participation(ctx.guild.id, member.id)
         embed = discord.Embed(title=f"Event Stats for {member.display_name}", color=discord.Color.blurple())
         embed.set_thumbnail(url=member.display_avatar.url)
         if not participations:
             embed.description = "No event participation recorded."
         else:
+            leaderboard_cog = self.bot.get_cog('Leaderboard')
             for event_id, team_name in participations:
-                team, rank = database.get_user_event_rank(ctx.guild.id, event_id, member.id)
+                if leaderboard_cog:
+                    standing = await leaderboard_cog.team_standing(event_id, team_name)
+                    rank = standing[1] if standing else None
+                else:
+                    _, rank = await database_async.get_user_event_rank(ctx.guild.id, event_id, member.id)
                 value = f"Team: {team_name or 'N/A'}\nRank: {rank if rank is not None else 'N/A'}"
                 embed.add_field(name=f"Event ID: {event_id}", value=value, inline=False)
         await ctx.send(embed=embed)
@@ -39,12 +43,17 @@ class Stats(commands.Cog):
         if not await self.check_mod_channel(ctx):
             return
             
-        stats = database.get_team_stats(ctx.guild.id, event_id, team_name)
+        # Score and rank come from the leaderboard's live ranking
+        leaderboard_cog = self.bot.get_cog('Leaderboard')
+        if leaderboard_cog:
+            stats = await leaderboard_cog.team_standing(event_id, team_name)
+        else:
+            stats = await database_async.get_team_stats(ctx.guild.id, event_id, team_name)
         if not stats:
             await ctx.send("Team or event not found.")
             return
         score, rank = stats
-        member_ids = database.get_team_members(ctx.guild.id, event_id, team_name)
+        member_ids = await database_async.get_team_members(ctx.guild.id, event_id, team_name)
         members = []
         for uid in member_ids:
             member = ctx.guild.get_member(uid)
@@ -60,7 +69,7 @@ class Stats(commands.Cog):
         if not await self.check_mod_channel(ctx):
             return
             
-        stats = database.get_server_stats(ctx.guild.id)
+        stats = await database_async.get_server_stats(ctx.guild.id)
         embed = discord.Embed(title=f"Server Stats for {ctx.guild.name}", color=discord.Color.green())
         if not stats:
             embed.description = "No server stats recorded yet."
@@ -71,13 +80,7 @@ class Stats(commands.Cog):
             embed.add_field(name="Members Joined", value=str(members), inline=True)
         # Top 5 users by command usage
         try:
-            with database.get_db() as conn:
-                c = conn.cursor()
-                if database.USE_MYSQL:
-                    c.execute('''SELECT user_id, SUM(count) as total FROM user_usage WHERE guild_id = %s GROUP BY user_id ORDER BY total DESC LIMIT 5''', (ctx.guild.id,))
-                else:
-                    c.execute('''SELECT user_id, SUM(count) as total FROM user_usage WHERE guild_id = ? GROUP BY user_id ORDER BY total DESC LIMIT 5''', (ctx.guild.id,))
-                top_users = c.fetchall()
+            top_users = await database_async.get_top_users(ctx.guild.id, 5)
             if top_users:
                 desc = ""
                 for uid, total in top_users:
@@ -95,7 +98,7 @@ class Stats(commands.Cog):
             return
             
         member = member or ctx.author
-        stats = fetch_user_stats(member.id, ctx.guild.id)
+        stats = await database_async.fetch_user_stats(member.id, ctx.guild.id)
         embed = discord.Embed(title=f"Profile: {member.display_name}", color=discord.Color.blurple())
         embed.set_thumbnail(url=member.display_avatar.url)
         if not stats:
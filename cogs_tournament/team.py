@@ -1,14 +1,61 @@
 from discord.ext import commands
 import discord
-import database
+import components
+import database_async
+import db_writebehind
+import embed_registry
+from embed_registry import EmbedRegistry
+from tournament_model import Section, Team as TeamModel
 
 DEFAULT_TEAM_EMOJIS = ["🦁", "🐯", "🐻", "🦊", "🐸", "🐼", "🐨", "🦄", "🐙", "🐵"]
+MAX_JOIN_SELECTS = 4  # A message has five component rows; the last holds the leave button
 
 class Team(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.section_embeds = {}  # Store embed message IDs for each section
-        self.team_channel_embeds = {}  # Store embed message IDs for team channel
+        self.section_embeds = EmbedRegistry(embed_registry.SECTION)  # Keyed "<event_id>_<section>"
+        self.team_channel_embeds = EmbedRegistry(embed_registry.TEAM_CHANNEL, int)  # Keyed by event id
+        self.membership = db_writebehind.MembershipWriter()  # Persists joins/leaves in batches
+
+    async def cog_load(self):
+        self.membership.start()
+        await self.section_embeds.load()
+        await self.team_channel_embeds.load()
+        components.route('team_join', self.on_join_select)
+        components.route('team_leave', self.on_leave_button)
+        components.route('team_leave_pick', self.on_leave_select)
+
+    async def cog_unload(self):
+        for action in ('team_join', 'team_leave', 'team_leave_pick'):
+            components.unroute(action)
+        await self.membership.close()
+
+    def join_controls(self, event_id, sections):
+        """Join selects for the sections' teams and a leave button, for a join or section embed.
+
+        Sections past MAX_JOIN_SELECTS and teams past a select's 25 options can still
+        be joined with dm.join_team.
+        """
+        items = []
+        for section in sections:
+            options = [
+                discord.SelectOption(
+                    label=f"{team_name} ({team.member_count}/{team.max_members})"[:100],
+                    value=str(team.team_id),
+                    emoji=team.emoji or None,
+                    description="Full" if team.is_full else None
+                )
+                for team_name, team in list(section.teams.items())[:25]
+                if team.team_id is not None
+            ]
+            if options and len(items) < MAX_JOIN_SELECTS:
+                items.append(components.select(
+                    'team_join', event_id, section.section_id,
+                    options=options, placeholder=f"Join a team in {section.name}"[:150]
+                ))
+        if items:
+            items.append(components.button('team_leave', event_id, label="Leave team", style=discord.ButtonStyle.danger))
+        return components.view(*items)
 
     async def send_join_notifications(self, user, team_name, sect_name, event_name, join_type="joined", method="command"):
         """Send DM to user when they join/leave a team"""
@@ -36,10 +83,7 @@ class Team(commands.Cog):
         admin_cog = self.bot.get_cog('Admin')
         if not admin_cog:
             return
-        log_channel_id = admin_cog.get_channel_id("log_channel")
-        if not log_channel_id:
-            return
-        log_channel = self.bot.get_channel(log_channel_id)
+        log_channel = await admin_cog.resolve_channel(getattr(user, 'guild', None), "log")
         if not log_channel:
             return
         embed = discord.Embed(
@@ -67,58 +111,39 @@ class Team(commands.Cog):
             return
             
         event = event_cog.events.get(event_id)
-        if not event or sect_name not in event.get('sections', {}):
-            return
-            
-        section = event['sections'][sect_name]
-        embed_message_id = self.section_embeds.get(f"{event_id}_{sect_name}")
-        
-        if not embed_message_id:
+        if not event or sect_name not in event.sections:
             return
             
-        team_channel_id = admin_cog.get_channel_id("team_channel")
-        if not team_channel_id:
+        section = event.sections[sect_name]
+        section_key = f"{event_id}_{sect_name}"
+        if section_key not in self.section_embeds:
             return
             
-        team_channel = self.bot.get_channel(team_channel_id)
+        team_channel = await admin_cog.resolve_channel(event.guild_id, "team")
         if not team_channel:
             return
             
-        try:
-            embed_message = await team_channel.fetch_message(embed_message_id)
-        except:
-            return
-            
         # Create updated embed
         embed = discord.Embed(
             title=f"📋 {sect_name}",
             color=discord.Color.blue()
         )
         
-        teams = section.get('teams', {})
+        teams = section.teams
         if not teams:
             embed.description = "No teams created yet."
         else:
-            for team_name, team_data in teams.items():
-                emoji = team_data.get('emoji', '❓')
-                leader = team_data.get('leader', 'Unknown')
-                current_members = len(team_data.get('members', []))
-                max_members = team_data.get('max_members', 0)
+            for team_name, team in teams.items():
                 embed.add_field(
-                    name=f"{emoji} {team_name}",
-                    value=f"**Leader:** {leader}\n**Members:** {current_members}/{max_members}",
+                    name=f"{team.emoji or '❓'} {team_name}",
+                    value=f"**Leader:** {team.leader}\n**Members:** {team.member_count}/{team.max_members}",
                     inline=False
                 )
         
-        await embed_message.edit(embed=embed)
-        # Add reactions for each team emoji
         try:
-            for team in teams.values():
-                emoji = team.get('emoji')
-                if emoji:
-                    await embed_message.add_reaction(emoji)
-        except Exception:
-            pass
+            await self.section_embeds.publish(section_key, team_channel, embed, self.join_controls(event_id, [section]))
+        except Exception as e:
+            print(f"Error updating section embed {section_key}: {e}")
 
     async def check_mod_channel(self, ctx):
         """Check if command is being used in the mod channel"""
@@ -131,10 +156,9 @@ class Team(commands.Cog):
     @commands.command(name="create_section_embed", usage="<event_id> <sect_name>")
     @commands.has_permissions(administrator=True)
     async def create_section_embed(self, ctx, event_id: int, sect_name: str):
-        """Create an embed for a section that allows reaction-based team joining (Admin only)"""
+        """Create an embed for a section with a select for joining its teams (Admin only)"""
         if not await self.check_mod_channel(ctx):
             return
-        import database
         event_cog = self.bot.get_cog('Event')
         admin_cog = self.bot.get_cog('Admin')
         
@@ -146,81 +170,58 @@ class Team(commands.Cog):
         section_found = False
         section_data = None
         # Check in memory first
-        if event and sect_name in event.get('sections', {}):
+        if event and sect_name in event.sections:
             section_found = True
-            section_data = event['sections'][sect_name]
+            section_data = event.sections[sect_name]
         else:
             # Fallback: check DB for section
-            sections = database.get_sections(event_id)
+            sections = await database_async.get_sections(event_id)
             for section in sections:
-                section_id, db_sect_name, _ = section
+                section_id, db_sect_name, max_teams = section
                 if str(db_sect_name) == str(sect_name):
                     section_found = True
                     # Load teams from DB
-                    teams = database.get_teams(section_id)
-                    section_data = {'teams': {}}
+                    teams = await database_async.get_teams(section_id)
+                    section_data = Section(str(db_sect_name), section_id, max_teams)
                     for team in teams:
                         team_id, team_name, leader_id, max_members, emoji = team
-                        members = database.get_team_members_by_id(team_id)
-                        section_data['teams'][team_name] = {
-                            'emoji': emoji,
-                            'leader': f"<@{leader_id}>",
-                            'max_members': max_members,
-                            'members': [f"<@{uid}>" for uid in members]
-                        }
+                        members = await database_async.get_team_members_by_id(team_id)
+                        section_data.teams[team_name] = TeamModel(team_name, team_id, leader_id, max_members, emoji, set(members))
                     break
         if not section_found:
             await ctx.send(f"Section '**{sect_name}**' not found in event ID `{event_id}`.")
             return
             
-        team_channel_id = admin_cog.get_channel_id("team_channel")
-        if not team_channel_id:
-            await ctx.send("Team channel not configured. Use `dm.set_channel team #channel` first.")
-            return
-            
-        team_channel = self.bot.get_channel(team_channel_id)
+        team_channel = await admin_cog.resolve_channel(ctx.guild, "team")
         if not team_channel:
-            await ctx.send("Team channel not found.")
+            await ctx.send("Team channel not configured. Use `dm.set_channel team #channel` first.")
             return
             
         # Create embed
         embed = discord.Embed(
             title=f"📋 {sect_name}",
-            description=f"React with the team emoji to join!",
+            description=f"Pick a team below to join!",
             color=discord.Color.blue()
         )
         
-        teams = section_data.get('teams', {}) if section_data else {}
+        teams = section_data.teams if section_data else {}
         if not teams:
             embed.description = "No teams created yet."
         else:
-            for team_name, team_data in teams.items():
-                emoji = team_data.get('emoji', '❓')
-                leader = team_data.get('leader', 'Unknown')
-                current_members = len(team_data.get('members', []))
-                max_members = team_data.get('max_members', 0)
+            for team_name, team in teams.items():
                 embed.add_field(
-                    name=f"{emoji} {team_name}",
-                    value=f"**Leader:** {leader}\n**Members:** {current_members}/{max_members}",
+                    name=f"{team.emoji or '❓'} {team_name}",
+                    value=f"**Leader:** {team.leader}\n**Members:** {team.member_count}/{team.max_members}",
                     inline=False
                 )
         
         # Send embed and store message ID
-        embed_message = await team_channel.send(embed=embed)
+        embed_message = await team_channel.send(embed=embed, view=self.join_controls(event_id, [section_data]))
         section_key = f"{event_id}_{sect_name}"
-        self.section_embeds[section_key] = embed_message.id
-        
-        # Add reactions for each team emoji
-        for team in teams.values():
-            emoji = team.get('emoji')
-            if emoji:
-                try:
-                    await embed_message.add_reaction(emoji)
-                except Exception as e:
-                    print(f"Error adding reaction {emoji}: {e}")
+        await self.section_embeds.set(section_key, team_channel.guild.id, team_channel.id, embed_message.id)
         
         await ctx.send(f"✅ Created section embed for '**{sect_name}**' in {team_channel.mention}")
-        await ctx.send(f"Users can now react to join teams in {team_channel.mention}")
+        await ctx.send(f"Users can now pick a team to join in {team_channel.mention}")
 
     @commands.command(name="create_section", usage="<event_id> (sect_name/Max_team)")
     async def create_section(self, ctx, event_id: int, *, section_info: str):
@@ -229,10 +230,10 @@ class Team(commands.Cog):
             
         import re
         # Debug: print all events in DB for this guild
-        all_events = database.list_events(ctx.guild.id)
+        all_events = await database_async.list_events(ctx.guild.id)
         print(f"[DEBUG] All events in DB for guild {ctx.guild.id}: {all_events}")
 
-        event = database.get_event(event_id)
+        event = await database_async.get_event(event_id)
         print(f"[DEBUG] Lookup for event_id {event_id}: {event}")
         if not event:
             await ctx.send(f"Event with ID `{event_id}` not found.")
@@ -243,17 +244,12 @@ class Team(commands.Cog):
             await ctx.send("Invalid format. Use: (Section Name/Max Teams)")
             return
         sect_name, max_team = match.group(1).strip(), int(match.group(2))
-        section_id = database.add_section(event_id, sect_name, max_team)
+        section_id = await database_async.add_section(event_id, sect_name, max_team)
         
         # Update event data in memory
         event_cog = self.bot.get_cog('Event')
         if event_cog and event_id in event_cog.events:
-            if 'sections' not in event_cog.events[event_id]:
-                event_cog.events[event_id]['sections'] = {}
-            event_cog.events[event_id]['sections'][sect_name] = {
-                'max_teams': max_team,
-                'teams': {}
-            }
+            event_cog.events.add_section(event_id, Section(sect_name, section_id, max_team))
         # Always update the join embed after creating a section
         if event_cog:
             await event_cog.update_event_embed(event_id)
@@ -278,56 +274,31 @@ class Team(commands.Cog):
             await ctx.send("Please mention the leader user.")
             return
         
-        # Get section info to find event_id
-        sections = database.get_sections(section_id)
-        if not sections:
+        # Find the event for this section
+        event_cog = self.bot.get_cog('Event')
+        if not event_cog or not hasattr(event_cog, 'events'):
+            await ctx.send("Event data is not available.")
+            return
+        located = event_cog.events.section(section_id)
+        if not located:
             await ctx.send(f"Section with ID `{section_id}` not found.")
             return
         
-        # Find the event_id for this section
-        event_cog = self.bot.get_cog('Event')
-        event_id = None
-        for event_id_check, event in event_cog.events.items():
-            for sect_name, section in event.get('sections', {}).items():
-                if section.get('section_id') == section_id:
-                    event_id = event_id_check
-                    break
-            if event_id:
-                break
-        
-        if not event_id:
-            await ctx.send("Could not find event for this section.")
+        event, section = located
+        # Team commands look teams up by name within the event, so names must be unique there
+        existing = event_cog.events.find_in_event(event.event_id, team_name)
+        if existing:
+            await ctx.send(f"Team '**{team_name}**' already exists in section '**{existing[0].name}**' of event '**{event.name}**'.")
             return
-        
         emoji = "⚔️"  # Default emoji, you can customize this
-        team_id = database.add_team(section_id, team_name, leader_id, max_member, emoji)
-        database.add_team_member(team_id, leader_id)
+        team_id = await database_async.add_team(section_id, team_name, leader_id, max_member, emoji)
+        await database_async.add_team_member(team_id, leader_id)
         
         # Update event data in memory
-        if event_cog and event_id in event_cog.events:
-            # Find the section name
-            sect_name = None
-            for sect_name_check, section in event_cog.events[event_id].get('sections', {}).items():
-                if section.get('section_id') == section_id:
-                    sect_name = sect_name_check
-                    break
-            
-            if sect_name:
-                if 'teams' not in event_cog.events[event_id]['sections'][sect_name]:
-                    event_cog.events[event_id]['sections'][sect_name]['teams'] = {}
-                
-                event_cog.events[event_id]['sections'][sect_name]['teams'][team_name] = {
-                    'emoji': emoji,
-                    'leader': f"<@{leader_id}>",
-                    'max_members': max_member,
-                    'members': [f"<@{leader_id}>"]
-                }
-                
-                # Update the event embed
-                await event_cog.update_event_embed(event_id)
-                
-                # Update team channel embed
-                await self.update_team_channel_embed(event_id)
+        event_cog.events.add_team(event.event_id, section.name, TeamModel(team_name, team_id, leader_id, max_member, emoji, {leader_id}))
+        
+        # Update the join, section and team channel embeds so the team can be picked
+        await self.refresh_team_embeds(event.event_id, section.name)
         
         await ctx.send(f"Team created: **{team_name}** (ID: `{team_id}`), Leader: <@{leader_id}>, Max Members: {max_member}")
 
@@ -339,180 +310,137 @@ class Team(commands.Cog):
         if not event_cog or not hasattr(event_cog, 'events'):
             await ctx.send("Event data is not available.")
             return
-        found_teams = []
-        for event_id, event in event_cog.events.items():
-            for sect_name, sect in event.get('sections', {}).items():
-                if team_name in sect.get('teams', {}):
-                    found_teams.append({'event_id': event_id, 'event_name': event['name'], 'section_name': sect_name})
+        found_teams = event_cog.events.find_by_name(ctx.guild.id, team_name)
         if not found_teams:
             await ctx.send(f"Team '**{team_name}**' not found.")
             return
         if len(found_teams) > 1:
             response = f"Found multiple teams with the name '**{team_name}**'. Please be more specific.\n"
-            for team_info in found_teams:
-                response += f"- Event: '**{team_info['event_name']}**' (`{team_info['event_id']}`), Section: '**{team_info['section_name']}**'\n"
+            for event, section, _ in found_teams:
+                response += f"- Event: '**{event.name}**' (`{event.event_id}`), Section: '**{section.name}**'\n"
             await ctx.send(response)
             return
-        team_info = found_teams[0]
-        event_id = team_info['event_id']
-        sect_name = team_info['section_name']
-        team = event_cog.events[event_id]['sections'][sect_name]['teams'][team_name]
-        if ctx.author.mention in team['members']:
+        event, section, team = found_teams[0]
+        if ctx.author.id in team.members:
             await ctx.send(f"You are already in team '**{team_name}**'.")
             return
-        if len(team['members']) >= team.get('max_members', float('inf')):
-            await ctx.send(f"Team '**{team_name}**' is full (Max members: {team.get('max_members', 'unknown')}).")
+        if team.is_full:
+            await ctx.send(f"Team '**{team_name}**' is full (Max members: {team.max_members}).")
             return
-        team['members'].append(ctx.author.mention)
+        await self.add_member(ctx.author, event, section, team, method="command")
+        await ctx.send(f"You have joined team '**{team_name}**' in section '**{section.name}**' for event '**{event.name}**'.")
+
+    def enroll(self, user, event, team):
+        """Put a user in a team; callers check capacity and call this before their first await"""
+        team.members.add(user.id)
+        self.membership.join(event.guild_id, event.event_id, team.team_id, team.name, user.id)
+
+    def unenroll(self, user, event, team):
+        """Take a user out of a team; callers call this before their first await"""
+        team.members.discard(user.id)
+        self.membership.leave(event.guild_id, event.event_id, team.team_id, team.name, user.id)
+
+    async def add_member(self, user, event, section, team, method):
+        """Put a user in a team and bring the role, embeds, DM and log up to date"""
+        self.enroll(user, event, team)
+        await self.member_joined(user, event, section, team, method)
+
+    async def member_joined(self, user, event, section, team, method):
+        """Bring the role, embeds, DM and log up to date after enroll()"""
+        await self.assign_event_role(user, event.event_id)
+        await self.refresh_team_embeds(event.event_id, section.name)
+        await self.send_join_notifications(user, team.name, section.name, event.name, "joined", method=method)
+        await self.send_log_message(user, team.name, section.name, event.name, "joined", method=method)
+
+    async def member_left(self, user, event, section, team, method):
+        """Bring the role, embeds, DM and log up to date after unenroll()"""
+        await self.remove_event_role(user, event.event_id)
+        await self.refresh_team_embeds(event.event_id, section.name)
+        await self.send_join_notifications(user, team.name, section.name, event.name, "left", method=method)
+        await self.send_log_message(user, team.name, section.name, event.name, "left", method=method)
+
+    def forget_scores(self, event_id, team_ids=None):
+        """Take deleted teams out of the leaderboard's ranking"""
+        leaderboard_cog = self.bot.get_cog('Leaderboard')
+        if leaderboard_cog:
+            leaderboard_cog.forget_teams(event_id, team_ids)
+
+    async def refresh_team_embeds(self, event_id, sect_name):
+        """Re-render the join, section and team channel embeds after a membership change"""
+        event_cog = self.bot.get_cog('Event')
+        if event_cog:
+            await event_cog.update_event_embed(event_id)
         await self.update_section_embed(event_id, sect_name)
-        
-        # Assign event role
-        await self.assign_event_role(ctx.author, event_id)
-        
-        # Update team channel embed
         await self.update_team_channel_embed(event_id)
-        
-        await self.send_join_notifications(ctx.author, team_name, sect_name, event_cog.events[event_id]['name'], "joined", method="command")
-        await self.send_log_message(ctx.author, team_name, sect_name, event_cog.events[event_id]['name'], "joined", method="command")
-        await ctx.send(f"You have joined team '**{team_name}**' in section '**{sect_name}**' for event '**{event_cog.events[event_id]['name']}**'.")
 
-    @commands.Cog.listener()
-    async def on_reaction_add(self, reaction, user):
-        """Handle team joining via reactions"""
-        if user.bot:
-            return
-        admin_cog = self.bot.get_cog('Admin')
-        if not admin_cog:
-            return
-        
-        # Check if this is a reaction in the join channel
-        join_channel_id = admin_cog.get_channel_id("join")
-        if not join_channel_id or reaction.message.channel.id != join_channel_id:
-            return
-            
+    def _locate_team(self, event_id, team_id):
+        """(event, section, team) for a team id from a component, or None if it's gone"""
         event_cog = self.bot.get_cog('Event')
-        if not event_cog:
-            return
-            
-        # Check if this is an event embed
-        event_id = None
-        for eid, embed_id in event_cog.event_embeds.items():
-            if embed_id == reaction.message.id:
-                event_id = eid
-                break
-                
-        if not event_id:
-            return
-            
-        event = event_cog.events.get(event_id)
-        if not event:
-            return
-            
-        # Find the team by emoji
-        team_found = False
-        for sect_name, section in event.get('sections', {}).items():
-            for team_name, team_data in section.get('teams', {}).items():
-                if team_data.get('emoji') == str(reaction.emoji):
-                    team_found = True
-                    break
-            if team_found:
-                break
-                
-        if not team_found:
-            await reaction.remove(user)
-            return
-            
-        team = section['teams'][team_name]
-        
-        # Check if user is already in the team
-        if user.mention in team['members']:
-            await reaction.remove(user)
-            return
-            
-        # Check if team is full
-        if len(team['members']) >= team.get('max_members', float('inf')):
-            await reaction.remove(user)
-            return
-            
-        # Add user to team
-        team['members'].append(user.mention)
-        
-        # Assign event role
-        await self.assign_event_role(user, event_id)
-        
-        # Update the event embed
-        await event_cog.update_event_embed(event_id)
-        
-        # Update team channel embed
-        await self.update_team_channel_embed(event_id)
-        
-        # Send notifications
-        await self.send_join_notifications(user, team_name, sect_name, event['name'], "joined", method="reaction")
-        await self.send_log_message(user, team_name, sect_name, event['name'], "joined", method="reaction")
+        located = event_cog.events.locate(int(team_id)) if event_cog else None
+        if not located or located[0].event_id != int(event_id):
+            return None
+        return located
 
-    @commands.Cog.listener()
-    async def on_reaction_remove(self, reaction, user):
-        """Handle team leaving via reactions"""
-        if user.bot:
-            return
-        admin_cog = self.bot.get_cog('Admin')
-        if not admin_cog:
-            return
-        
-        # Check if this is a reaction in the join channel
-        join_channel_id = admin_cog.get_channel_id("join")
-        if not join_channel_id or reaction.message.channel.id != join_channel_id:
-            return
-            
+    async def on_join_select(self, interaction, event_id, section_id, values):
+        """Handle a pick from a join select on a join or section embed"""
+        located = self._locate_team(event_id, values[0]) if values else None
+        if not located:
+            await interaction.response.send_message("❌ That team no longer exists.", ephemeral=True)
+            return
+        event, section, team = located
+        user = interaction.user
+        if user.id in team.members:
+            await interaction.response.send_message(f"You are already in team '**{team.name}**'.", ephemeral=True)
+            return
+        if team.is_full:
+            await interaction.response.send_message(f"Team '**{team.name}**' is full (Max members: {team.max_members}).", ephemeral=True)
+            return
+        # Take the slot before the first await so simultaneous picks can't over-fill the team
+        self.enroll(user, event, team)
+        await interaction.response.send_message(
+            f"✅ You have joined team '**{team.name}**' in section '**{section.name}**' for event '**{event.name}**'.",
+            ephemeral=True
+        )
+        await self.member_joined(user, event, section, team, method="select")
+
+    async def on_leave_button(self, interaction, event_id):
+        """Handle the leave button: leave the user's team, or ask which one if there are several"""
         event_cog = self.bot.get_cog('Event')
-        if not event_cog:
-            return
-            
-        # Check if this is an event embed
-        event_id = None
-        for eid, embed_id in event_cog.event_embeds.items():
-            if embed_id == reaction.message.id:
-                event_id = eid
-                break
-                
-        if not event_id:
-            return
-            
-        event = event_cog.events.get(event_id)
+        event = event_cog.events.get(int(event_id)) if event_cog else None
         if not event:
-            return
-            
-        # Find the team by emoji
-        team_found = False
-        for sect_name, section in event.get('sections', {}).items():
-            for team_name, team_data in section.get('teams', {}).items():
-                if team_data.get('emoji') == str(reaction.emoji):
-                    team_found = True
-                    break
-            if team_found:
-                break
-                
-        if not team_found:
-            return
-            
-        team = section['teams'][team_name]
-        
-        # Remove user from team
-        if user.mention in team['members']:
-            team['members'].remove(user.mention)
-            
-            # Remove event role if user is not in any other team
-            await self.remove_event_role(user, event_id)
-            
-            # Update the event embed
-            await event_cog.update_event_embed(event_id)
-            
-            # Update team channel embed
-            await self.update_team_channel_embed(event_id)
-            
-            # Send notifications
-            await self.send_join_notifications(user, team_name, sect_name, event['name'], "left", method="reaction")
-            await self.send_log_message(user, team_name, sect_name, event['name'], "left", method="reaction")
+            await interaction.response.send_message("❌ This event is no longer running.", ephemeral=True)
+            return
+        user = interaction.user
+        joined = [(section, team) for section, team in event.teams() if user.id in team.members]
+        if not joined:
+            await interaction.response.send_message("You are not in a team in this event.", ephemeral=True)
+            return
+        if len(joined) == 1:
+            section, team = joined[0]
+            self.unenroll(user, event, team)
+            await interaction.response.send_message(f"👋 You have left team '**{team.name}**'.", ephemeral=True)
+            await self.member_left(user, event, section, team, method="button")
+            return
+        options = [
+            discord.SelectOption(label=f"{team.name} ({section.name})"[:100], value=str(team.team_id), emoji=team.emoji or None)
+            for section, team in joined[:25]
+        ]
+        await interaction.response.send_message(
+            "Which team do you want to leave?",
+            view=components.view(components.select('team_leave_pick', event.event_id, options=options)),
+            ephemeral=True
+        )
+
+    async def on_leave_select(self, interaction, event_id, values):
+        """Handle the pick from the leave button's which-team select"""
+        located = self._locate_team(event_id, values[0]) if values else None
+        if not located or interaction.user.id not in located[2].members:
+            await interaction.response.edit_message(content="You are no longer in that team.", view=None)
+            return
+        event, section, team = located
+        self.unenroll(interaction.user, event, team)
+        await interaction.response.edit_message(content=f"👋 You have left team '**{team.name}**'.", view=None)
+        await self.member_left(interaction.user, event, section, team, method="button")
 
     @commands.command(name="delete_team", usage="<event_id> <sect_name> <team_name>")
     @commands.has_permissions(administrator=True)
@@ -520,26 +448,27 @@ class Team(commands.Cog):
         """Delete a team from a section (Admin only)"""
         if not await self.check_mod_channel(ctx):
             return
-        import database
         event_cog = self.bot.get_cog('Event')
         event = event_cog.events.get(event_id) if event_cog else None
         team_found = False
         # Check in memory first
-        if event and sect_name in event.get('sections', {}) and team_name in event['sections'][sect_name].get('teams', {}):
+        if event and sect_name in event.sections and team_name in event.sections[sect_name].teams:
             team_found = True
         else:
             # Fallback: check DB for team
-            sections = database.get_sections(event_id)
+            sections = await database_async.get_sections(event_id)
             for section in sections:
                 section_id, db_sect_name, _ = section
                 if str(db_sect_name) == str(sect_name):
-                    teams = database.get_teams(section_id)
+                    teams = await database_async.get_teams(section_id)
                     for team in teams:
                         team_id, db_team_name, _, _, _ = team
                         if str(db_team_name) == str(team_name):
                             team_found = True
-                            # Remove from DB
-                            database.remove_team(team_id)
+                            # Remove from DB; queued changes must not land after the delete
+                            await self.membership.flush()
+                            await database_async.remove_team(team_id)
+                            self.forget_scores(event_id, [team_id])
                             await ctx.send(f"Team '**{team_name}**' has been deleted from section '**{sect_name}**' in event ID `{event_id}` (DB fallback).")
                             # Optionally, reload event into memory
                             if event_cog:
@@ -548,11 +477,16 @@ class Team(commands.Cog):
         if not team_found:
             await ctx.send(f"Team '**{team_name}**' not found in section '**{sect_name}**' of event ID `{event_id}`.")
             return
-        # Remove from memory if event is in memory
+        # Remove from the database and memory if event is in memory
         if event:
-            del event['sections'][sect_name]['teams'][team_name]
-            # Update section embed if it exists
-            await self.update_section_embed(event_id, sect_name)
+            # Out of the registry first so no join can queue a write for it while we
+            # await; then flush what was queued before, so it can't land after the delete
+            team = event_cog.events.remove_team(event_id, sect_name, team_name)
+            await self.membership.flush()
+            await database_async.remove_team(team.team_id)
+            self.forget_scores(event_id, [team.team_id])
+            # Drop the team from the join and section embeds
+            await self.refresh_team_embeds(event_id, sect_name)
             await ctx.send(f"Team '**{team_name}**' has been deleted from section '**{sect_name}**'.")
 
     @commands.command(name="delete_section", usage="<event_id> <sect_name>")
@@ -561,22 +495,23 @@ class Team(commands.Cog):
         """Delete a section from an event (Admin only)"""
         if not await self.check_mod_channel(ctx):
             return
-        import database
         event_cog = self.bot.get_cog('Event')
         event = event_cog.events.get(event_id) if event_cog else None
         section_found = False
         # Check in memory first
-        if event and sect_name in event.get('sections', {}):
+        if event and sect_name in event.sections:
             section_found = True
         else:
             # Fallback: check DB for section
-            sections = database.get_sections(event_id)
+            sections = await database_async.get_sections(event_id)
             for section in sections:
                 section_id, db_sect_name, _ = section
                 if str(db_sect_name) == str(sect_name):
                     section_found = True
-                    # Remove from DB
-                    database.remove_section(section_id)
+                    # Remove from DB; queued changes must not land after the delete
+                    await self.membership.flush()
+                    await database_async.remove_section(section_id)
+                    self.forget_scores(event_id)
                     await ctx.send(f"Section '**{sect_name}**' has been deleted from event ID `{event_id}` (DB fallback).")
                     # Optionally, reload event into memory
                     if event_cog:
@@ -585,16 +520,19 @@ class Team(commands.Cog):
         if not section_found:
             await ctx.send(f"Section '**{sect_name}**' not found in event ID `{event_id}`.")
             return
-        # Remove from memory if event is in memory
+        # Remove from the database and memory if event is in memory
         if event:
-            del event['sections'][sect_name]
+            # Out of the registry first so no join can queue a write for it while we
+            # await; then flush what was queued before, so it can't land after the delete
+            section = event_cog.events.remove_section(event_id, sect_name)
+            await self.membership.flush()
+            await database_async.remove_section(section.section_id)
+            self.forget_scores(event_id, [team.team_id for team in section.teams.values()])
             # Remove section embed if it exists
-            section_key = f"{event_id}_{sect_name}"
-            if section_key in self.section_embeds:
-                del self.section_embeds[section_key]
+            await self.section_embeds.discard(f"{event_id}_{sect_name}")
             # Update event embed
             await event_cog.update_event_embed(event_id)
-            await ctx.send(f"Section '**{sect_name}**' has been deleted from event '**{event['name']}**'.")
+            await ctx.send(f"Section '**{sect_name}**' has been deleted from event '**{event.name}**'.")
 
     @commands.command(name="disqualify_team", usage="<event_id> <team_name> [reason]")
     @commands.has_permissions(administrator=True)
@@ -602,32 +540,30 @@ class Team(commands.Cog):
         """Disqualify a team from an event (Admin only)"""
         if not await self.check_mod_channel(ctx):
             return
-        import database
         event_cog = self.bot.get_cog('Event')
         event = event_cog.events.get(event_id) if event_cog else None
         found_team = None
         found_section = None
         # Check in memory first
         if event:
-            for sect_name, section in event.get('sections', {}).items():
-                if team_name in section.get('teams', {}):
-                    found_team = section['teams'][team_name]
-                    found_section = sect_name
-                    break
+            found = event_cog.events.find_in_event(event_id, team_name)
+            if found:
+                found_section, found_team = found[0].name, found[1]
         else:
-            # Fallback: check DB for team
-            sections = database.get_sections(event_id)
+            # Fallback: check DB for team; queued changes must not land after our deletes
+            await self.membership.flush()
+            sections = await database_async.get_sections(event_id)
             for section in sections:
                 section_id, db_sect_name, _ = section
-                teams = database.get_teams(section_id)
+                teams = await database_async.get_teams(section_id)
                 for team in teams:
                     team_id, db_team_name, _, _, _ = team
                     if str(db_team_name) == str(team_name):
                         found_section = str(db_sect_name)
                         # Remove all team members from DB
-                        members = database.get_team_members_by_id(team_id)
+                        members = await database_async.get_team_members_by_id(team_id)
                         for member_id in members:
-                            database.remove_team_member(team_id, member_id)
+                            await database_async.remove_team_member(team_id, member_id)
                         await ctx.send(f"Team '**{team_name}**' has been disqualified from event ID `{event_id}` (DB fallback).\nReason: {reason}")
                         # Optionally, reload event into memory
                         if event_cog:
@@ -637,25 +573,19 @@ class Team(commands.Cog):
             await ctx.send(f"Team '**{team_name}**' not found in event ID `{event_id}`.")
             return
         # Remove all members from the team (memory)
-        members_to_remove = found_team.get('members', []).copy()
-        for member_mention in members_to_remove:
-            # Extract user ID from mention
-            if member_mention.startswith('<@') and member_mention.endswith('>'):
-                user_id = int(member_mention.strip('<@!>'))
-                # Remove from memory
-                if member_mention in found_team['members']:
-                    found_team['members'].remove(member_mention)
+        members_to_remove = list(found_team.members)
+        found_team.members.clear()
+        for user_id in members_to_remove:
+            self.membership.leave(ctx.guild.id, event_id, found_team.team_id, team_name, user_id)
         # Send notification to all removed members
-        for member_mention in members_to_remove:
-            if member_mention.startswith('<@') and member_mention.endswith('>'):
-                user_id = int(member_mention.strip('<@!>'))
-                user = ctx.guild.get_member(user_id)
-                if user and event:
-                    await self.send_join_notifications(user, team_name, found_section, event['name'], "disqualified", "admin")
+        for user_id in members_to_remove:
+            user = ctx.guild.get_member(user_id)
+            if user and event:
+                await self.send_join_notifications(user, team_name, found_section, event.name, "disqualified", "admin")
         # Update section embed
         await self.update_section_embed(event_id, found_section)
         if event:
-            await ctx.send(f"Team '**{team_name}**' has been disqualified from event '**{event['name']}**'.\nReason: {reason}")
+            await ctx.send(f"Team '**{team_name}**' has been disqualified from event '**{event.name}**'.\nReason: {reason}")
 
     @commands.command(name="disqualify_member", usage="<event_id> <@member> [reason]")
     @commands.has_permissions(administrator=True)
@@ -663,7 +593,6 @@ class Team(commands.Cog):
         """Disqualify a member from all teams in an event (Admin only)"""
         if not await self.check_mod_channel(ctx):
             return
-        import database
         # Extract user ID from mention
         if not member_mention.startswith('<@') or not member_mention.endswith('>'):
             await ctx.send("Please mention the member to disqualify.")
@@ -679,27 +608,29 @@ class Team(commands.Cog):
         # Check in memory first
         if event:
             # Remove user from all teams in the event
-            for sect_name, section in event.get('sections', {}).items():
-                for team_name, team_data in section.get('teams', {}).items():
-                    if member_mention in team_data.get('members', []):
-                        # Remove from memory
-                        team_data['members'].remove(member_mention)
-                        removed_teams.append((team_name, sect_name))
+            for section, team in event.teams():
+                if user_id in team.members:
+                    # Remove from memory
+                    team.members.discard(user_id)
+                    self.membership.leave(ctx.guild.id, event_id, team.team_id, team.name, user_id)
+                    removed_teams.append((team.name, section.name))
         else:
-            # Fallback: check DB for user participation
-            sections = database.get_sections(event_id)
+            # Fallback: check DB for user participation; queued changes must not land after our deletes
+            await self.membership.flush()
+            sections = await database_async.get_sections(event_id)
             for section in sections:
                 section_id, db_sect_name, _ = section
-                teams = database.get_teams(section_id)
+                teams = await database_async.get_teams(section_id)
                 for team in teams:
                     team_id, db_team_name, _, _, _ = team
-                    members = database.get_team_members_by_id(team_id)
+                    members = await database_async.get_team_members_by_id(team_id)
                     if user_id in members:
                         # Remove from DB
-                        database.remove_team_member(team_id, user_id)
+                        await database_async.remove_team_member(team_id, user_id)
                         removed_teams.append((str(db_team_name), str(db_sect_name)))
             if removed_teams:
-                await ctx.send(f"User {user.mention} has been disqualified from the following teams in event ID `{event_id}` (DB fallback): {', '.join([f"'{team_name}' ({sect_name})" for team_name, sect_name in removed_teams])}\nReason: {reason}")
+                teams_list = ", ".join([f"'{team_name}' ({sect_name})" for team_name, sect_name in removed_teams])
+                await ctx.send(f"User {user.mention} has been disqualified from the following teams in event ID `{event_id}` (DB fallback): {teams_list}\nReason: {reason}")
                 # Optionally, reload event into memory
                 if event_cog:
                     await event_cog.cog_load()
@@ -710,44 +641,43 @@ class Team(commands.Cog):
         # Send notification to the user
         for team_name, sect_name in removed_teams:
             if event:
-                await self.send_join_notifications(user, team_name, sect_name, event['name'], "disqualified", "admin")
+                await self.send_join_notifications(user, team_name, sect_name, event.name, "disqualified", "admin")
         # Update all affected section embeds
         affected_sections = set(sect_name for _, sect_name in removed_teams)
         for sect_name in affected_sections:
             await self.update_section_embed(event_id, sect_name)
         teams_list = ", ".join([f"'{team_name}' ({sect_name})" for team_name, sect_name in removed_teams])
         if event:
-            await ctx.send(f"User {user.mention} has been disqualified from the following teams in event '**{event['name']}**': {teams_list}\nReason: {reason}")
+            await ctx.send(f"User {user.mention} has been disqualified from the following teams in event '**{event.name}**': {teams_list}\nReason: {reason}")
 
     @commands.command(name="list_teams", usage="<event_id>", help="List all teams for an event, with their members.")
     async def list_teams(self, ctx, event_id: int):
         """List all teams for an event, with their members."""
         if not await self.check_mod_channel(ctx):
             return
-        import database
         event_cog = self.bot.get_cog('Event')
         event = event_cog.events.get(event_id) if event_cog else None
         event_name = None
         # Check in memory first
         if event:
-            event_name = event['name']
+            event_name = event.name
         else:
             # Fallback: check DB for event
-            db_event = database.get_event(event_id)
+            db_event = await database_async.get_event(event_id)
             if not db_event:
                 await ctx.send(f"Event with ID `{event_id}` not found.")
                 return
             event_name = db_event[2]  # type: ignore
             # Load teams from DB for display
             embed = discord.Embed(title=f"Teams for {event_name}", color=discord.Color.blue())
-            sections = database.get_sections(event_id)
+            sections = await database_async.get_sections(event_id)
             for section in sections:
                 section_id, sect_name, _ = section
                 teams_text = ""
-                teams = database.get_teams(section_id)
+                teams = await database_async.get_teams(section_id)
                 for team in teams:
                     team_id, team_name, _, max_members, _ = team
-                    members = database.get_team_members_by_id(team_id)
+                    members = await database_async.get_team_members_by_id(team_id)
                     member_mentions = [f"<@{uid}>" for uid in members]
                     teams_text += f"**{team_name}** ({len(members)}/{max_members}): {', '.join(member_mentions) if member_mentions else 'No members'}\n"
                 if teams_text:
@@ -758,11 +688,11 @@ class Team(commands.Cog):
             return
         # Display teams from memory
         embed = discord.Embed(title=f"Teams for {event_name}", color=discord.Color.blue())
-        for sect_name, section in event.get('sections', {}).items():
+        for sect_name, section in event.sections.items():
             teams_text = ""
-            for team_name, team_data in section.get('teams', {}).items():
-                members = team_data.get('members', [])
-                teams_text += f"**{team_name}** ({len(members)}/{team_data.get('max_members', 0)}): {', '.join(members) if members else 'No members'}\n"
+            for team_name, team in section.teams.items():
+                members = team.member_mentions()
+                teams_text += f"**{team_name}** ({len(members)}/{team.max_members}): {', '.join(members) if members else 'No members'}\n"
             if teams_text:
                 embed.add_field(name=f"📋 {sect_name}", value=teams_text, inline=False)
         if not embed.fields:
@@ -784,27 +714,22 @@ class Team(commands.Cog):
         # Try to delete the message
         admin_cog = self.bot.get_cog('Admin')
         if admin_cog:
-            team_channel_id = admin_cog.get_channel_id("team")
-            if team_channel_id:
-                team_channel = self.bot.get_channel(team_channel_id)
-                if team_channel:
-                    try:
-                        message = await team_channel.fetch_message(self.section_embeds[section_key])
-                        await message.delete()
-                        await ctx.send(f"✅ Section embed for '**{sect_name}**' has been deleted.")
-                    except discord.NotFound:
-                        await ctx.send(f"⚠️ Section embed message not found, but removed from tracking.")
-                    except Exception as e:
-                        await ctx.send(f"❌ Error deleting section embed: {e}")
-                else:
-                    await ctx.send("❌ Team channel not found.")
+            team_channel = await admin_cog.resolve_channel(ctx.guild, "team")
+            if team_channel:
+                try:
+                    await team_channel.get_partial_message(self.section_embeds[section_key]).delete()
+                    await ctx.send(f"✅ Section embed for '**{sect_name}**' has been deleted.")
+                except discord.NotFound:
+                    await ctx.send(f"⚠️ Section embed message not found, but removed from tracking.")
+                except Exception as e:
+                    await ctx.send(f"❌ Error deleting section embed: {e}")
             else:
                 await ctx.send("❌ Team channel not configured.")
         else:
             await ctx.send("❌ Admin cog not available.")
 
         # Remove from tracking
-        del self.section_embeds[section_key]
+        await self.section_embeds.discard(section_key)
 
     @commands.command(name="list_section_embeds", usage="", help="List all section embeds and their status")
     async def list_section_embeds(self, ctx):
@@ -833,14 +758,14 @@ class Team(commands.Cog):
             return
             
         event = event_cog.events[event_id]
-        role_id = event.get('role_id')
+        role_id = event.role_id
         if not role_id:
             return
             
         try:
             role = user.guild.get_role(role_id)
             if role and role not in user.roles:
-                await user.add_roles(role, reason=f"Joined tournament: {event['name']}")
+                await user.add_roles(role, reason=f"Joined tournament: {event.name}")
         except Exception as e:
             print(f"Error assigning event role: {e}")
 
@@ -851,21 +776,19 @@ class Team(commands.Cog):
             return
             
         event = event_cog.events[event_id]
-        role_id = event.get('role_id')
+        role_id = event.role_id
         if not role_id:
             return
             
         # Check if user is still in any team in this event
-        for sect_name, section in event.get('sections', {}).items():
-            for team_name, team_data in section.get('teams', {}).items():
-                if user.mention in team_data.get('members', []):
-                    return  # User is still in a team, don't remove role
+        if any(user.id in team.members for _, team in event.teams()):
+            return  # User is still in a team, don't remove role
         
         # User is not in any team, remove role
         try:
             role = user.guild.get_role(role_id)
             if role and role in user.roles:
-                await user.remove_roles(role, reason=f"Left all teams in tournament: {event['name']}")
+                await user.remove_roles(role, reason=f"Left all teams in tournament: {event.name}")
         except Exception as e:
             print(f"Error removing event role: {e}")
 
@@ -881,26 +804,21 @@ class Team(commands.Cog):
         if not event:
             return
             
-        team_channel_id = admin_cog.get_channel_id("team")
-        if not team_channel_id:
-            return
-            
-        team_channel = self.bot.get_channel(team_channel_id)
+        team_channel = await admin_cog.resolve_channel(event.guild_id, "team")
         if not team_channel:
             return
             
         # Create or update the main tournament embed
         embed = discord.Embed(
-            title=f"🏆 {event['name']}",
+            title=f"🏆 {event.name}",
             description="Click on a team name to get details via DM!",
             color=discord.Color.blue()
         )
         
-        for sect_name, section in event.get('sections', {}).items():
+        for sect_name, section in event.sections.items():
             teams_text = ""
-            for team_name, team_data in section.get('teams', {}).items():
-                members = team_data.get('members', [])
-                teams_text += f"**{team_name}** ({len(members)}/{team_data.get('max_members', 0)})\n"
+            for team_name, team in section.teams.items():
+                teams_text += f"**{team_name}** ({team.member_count}/{team.max_members})\n"
             
             if teams_text:
                 embed.add_field(name=f"📋 {sect_name}", value=teams_text, inline=False)
@@ -909,20 +827,10 @@ class Team(commands.Cog):
             embed.description = "No teams created yet."
         
         # Store or update the embed message
-        if not hasattr(self, 'team_channel_embeds'):
-            self.team_channel_embeds = {}
-        
-        if event_id in self.team_channel_embeds:
-            try:
-                message = await team_channel.fetch_message(self.team_channel_embeds[event_id])
-                await message.edit(embed=embed)
-            except:
-                # Message not found, create new one
-                message = await team_channel.send(embed=embed)
-                self.team_channel_embeds[event_id] = message.id
-        else:
-            message = await team_channel.send(embed=embed)
-            self.team_channel_embeds[event_id] = message.id
+        try:
+            await self.team_channel_embeds.publish(event_id, team_channel, embed)
+        except Exception as e:
+            print(f"Error updating team channel embed for event {event_id}: {e}")
 
     async def send_team_details_dm(self, user, event_id, team_name):
         """Send team details to user via DM"""
@@ -933,26 +841,26 @@ class Team(commands.Cog):
         event = event_cog.events[event_id]
         
         # Find the team
-        for sect_name, section in event.get('sections', {}).items():
-            if team_name in section.get('teams', {}):
-                team_data = section['teams'][team_name]
-                members = team_data.get('members', [])
-                
-                embed = discord.Embed(
-                    title=f"👥 Team Details: {team_name}",
-                    description=f"**Event:** {event['name']}\n**Section:** {sect_name}",
-                    color=discord.Color.green()
-                )
-                embed.add_field(name="Leader", value=team_data.get('leader', 'Unknown'), inline=True)
-                embed.add_field(name="Members", value=f"{len(members)}/{team_data.get('max_members', 0)}", inline=True)
-                embed.add_field(name="Team Members", value=", ".join(members) if members else "No members", inline=False)
-                
-                try:
-                    await user.send(embed=embed)
-                except:
-                    # User has DMs disabled
-                    pass
-                break
+        found = event_cog.events.find_in_event(event_id, team_name)
+        if not found:
+            return
+        section, team = found
+        members = team.member_mentions()
+        
+        embed = discord.Embed(
+            title=f"👥 Team Details: {team_name}",
+            description=f"**Event:** {event.name}\n**Section:** {section.name}",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="Leader", value=team.leader, inline=True)
+        embed.add_field(name="Members", value=f"{len(members)}/{team.max_members}", inline=True)
+        embed.add_field(name="Team Members", value=", ".join(members) if members else "No members", inline=False)
+        
+        try:
+            await user.send(embed=embed)
+        except:
+            # User has DMs disabled
+            pass
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -965,8 +873,8 @@ class Team(commands.Cog):
             return
             
         # Check if this is in the team channel
-        team_channel_id = admin_cog.get_channel_id("team")
-        if not team_channel_id or message.channel.id != team_channel_id:
+        team_channel = await admin_cog.resolve_channel(message.guild, "team")
+        if not team_channel or message.channel.id != team_channel.id:
             return
             
         # Check if the message is just a team name
@@ -978,17 +886,15 @@ class Team(commands.Cog):
         if not event_cog:
             return
             
-        # Find the team across all events
-        for event_id, event in event_cog.events.items():
-            for sect_name, section in event.get('sections', {}).items():
-                if team_name in section.get('teams', {}):
-                    await self.send_team_details_dm(message.author, event_id, team_name)
-                    # Delete the message to keep channel clean
-                    try:
-                        await message.delete()
-                    except:
-                        pass
-                    return
+        # Find the team across the guild's events
+        found = event_cog.events.find_by_name(message.guild.id, team_name)
+        if found:
+            await self.send_team_details_dm(message.author, found[0][0].event_id, team_name)
+            # Delete the message to keep channel clean
+            try:
+                await message.delete()
+            except:
+                pass
 
 async def setup(bot):
     await bot.add_cog(Team(bot)) 
\ No newline at end of file
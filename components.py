@@ -0,0 +1,80 @@
+# components.py - persistent buttons and selects routed by custom id
+#
+# Every button and select the bot posts has a custom id "dm:<action>:<arg>:...".
+# A single DynamicItem registered on the bot at startup matches that pattern and
+# hands the interaction to the handler a cog routed for the action, so controls
+# keep working across restarts and an idle message holds no view in memory.
+# Everything a handler needs must be in the custom id or the database.
+
+import discord
+
+PREFIX = 'dm'
+
+# action -> async handler(interaction, *args); select handlers also get the chosen values
+_handlers = {}
+
+
+def route(action, handler):
+    _handlers[action] = handler
+
+
+def unroute(action):
+    _handlers.pop(action, None)
+
+
+def custom_id(action, *args):
+    value = ':'.join([PREFIX, action, *map(str, args)])
+    if len(value) > 100:
+        raise ValueError(f"custom id for {action} is longer than 100 characters")
+    return value
+
+
+class Dispatcher(discord.ui.DynamicItem[discord.ui.Item], template=PREFIX + r':(?P<action>[a-z_]+)(?P<args>(?::[^:]*)*)'):
+    """Routes a component interaction to the handler for its action."""
+
+    def __init__(self, item, action, args):
+        super().__init__(item)
+        self.action = action
+        self.args = args
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(item, match['action'], match['args'].split(':')[1:])
+
+    async def callback(self, interaction):
+        handler = _handlers.get(self.action)
+        if not handler:
+            await interaction.response.send_message("❌ This control is no longer active.", ephemeral=True)
+            return
+        args = list(self.args)
+        if isinstance(self.item, discord.ui.Select):
+            args.append(interaction.data.get('values', []))
+        try:
+            await handler(interaction, *args)
+        except Exception as e:
+            print(f"[components] {self.action} handler failed: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message("❌ Something went wrong. Please try again.", ephemeral=True)
+
+
+def button(action, *args, label=None, emoji=None, style=discord.ButtonStyle.secondary, disabled=False, row=None):
+    item = discord.ui.Button(custom_id=custom_id(action, *args), label=label, emoji=emoji, style=style, disabled=disabled, row=row)
+    return Dispatcher(item, action, [str(arg) for arg in args])
+
+
+def select(action, *args, options, placeholder=None, row=None):
+    item = discord.ui.Select(custom_id=custom_id(action, *args), options=options, placeholder=placeholder, row=row)
+    return Dispatcher(item, action, [str(arg) for arg in args])
+
+
+def view(*items):
+    """A view of dispatcher items; it never times out and isn't kept per message."""
+    result = discord.ui.View(timeout=None)
+    for item in items:
+        result.add_item(item)
+    return result
+
+
+def setup(bot):
+    """Register the dispatcher so controls on existing messages are routed after a restart."""
+    bot.add_dynamic_items(Dispatcher)
@@ -1,8 +1,14 @@
 # database.py (rebuilt version)
 import mysql.connector
-import sqlite3
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from contextlib import contextmanager
+from db_pool import ConnectionPool, MySQLDriver, SQLiteDriver
+from db_dialect import DialectConnection
+from db_failover import FailoverManager
+from db_migrations import migrate
 
 # Railway MySQL configuration (for deployment)
 RAILWAY_MYSQL_CONFIG = {
@@ -22,316 +28,230 @@ LOCAL_MYSQL_CONFIG = {
     'database': os.getenv('MYSQL_DATABASE', 'botdb'),
 }
 
-# Use Railway MySQL if available, otherwise fall back to local MySQL or SQLite
-def get_mysql_config():
-    # Try Railway MySQL first
+# Backend selection: 'auto' probes Railway then local MySQL and falls back to SQLite;
+# 'railway', 'mysql' or 'sqlite' pick a backend explicitly without probing.
+DB_BACKEND = os.getenv('DB_BACKEND', 'auto').lower()
+DB_PROBE_TIMEOUT = float(os.getenv('DB_PROBE_TIMEOUT', 3))
+
+# Resolved lazily by init_backend() on first use
+MYSQL_CONFIG = None
+
+# Flag to track if we're using MySQL or SQLite (for display; queries take their
+# dialect from the connection get_db() hands out)
+USE_MYSQL = False
+
+_init_lock = threading.RLock()
+_initialized = False
+_initializing = False
+
+def _probe_mysql(config, timeout):
     try:
-        test_conn = mysql.connector.connect(**RAILWAY_MYSQL_CONFIG)
+        test_conn = mysql.connector.connect(**config, connection_timeout=max(1, int(timeout)))
         test_conn.close()
+        return True
+    except Exception:
+        return False
+
+# Use Railway MySQL if available, otherwise fall back to local MySQL or SQLite
+def get_mysql_config(timeout=None):
+    """Probe Railway and local MySQL concurrently, bounded by ``timeout`` seconds in total.
+
+    Railway is preferred when both answer; returns None if neither does in time.
+    """
+    timeout = DB_PROBE_TIMEOUT if timeout is None else timeout
+    candidates = [RAILWAY_MYSQL_CONFIG, LOCAL_MYSQL_CONFIG]
+    deadline = time.monotonic() + timeout
+    executor = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix='db-probe')
+    try:
+        futures = [executor.submit(_probe_mysql, config, timeout) for config in candidates]
+        for config, future in zip(candidates, futures):
+            try:
+                if future.result(timeout=max(0, deadline - time.monotonic())):
+                    return config
+            except FutureTimeout:
+                continue
+        return None
+    finally:
+        # Don't wait for a probe that is still hanging on a dead host
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _resolve_mysql_config():
+    if DB_BACKEND == 'sqlite':
+        return None
+    if DB_BACKEND == 'railway':
         return RAILWAY_MYSQL_CONFIG
-    except:
-        # Try local MySQL
+    if DB_BACKEND == 'mysql':
+        return LOCAL_MYSQL_CONFIG
+    return get_mysql_config()
+
+def init_backend():
+    """Pick the database backend and create the schema, once per process.
+
+    Called automatically by get_db(); call it early to resolve the backend
+    off the hot path.
+    """
+    global MYSQL_CONFIG, USE_MYSQL, _initialized, _initializing
+    if _initialized:
+        return
+    with _init_lock:
+        # setup_db() re-enters through get_db() on this thread while initializing
+        if _initialized or _initializing:
+            return
+        _initializing = True
         try:
-            test_conn = mysql.connector.connect(**LOCAL_MYSQL_CONFIG)
-            test_conn.close()
-            return LOCAL_MYSQL_CONFIG
-        except:
-            return None
+            MYSQL_CONFIG = _resolve_mysql_config()
+            USE_MYSQL = MYSQL_CONFIG is not None
+            print(f"Database backend: {'MySQL (' + MYSQL_CONFIG['host'] + ')' if USE_MYSQL else 'SQLite'}")
+            setup_db()
+            if MYSQL_CONFIG:
+                # Replays any journal left behind by a previous run's outage
+                _get_failover().start()
+            _initialized = True
+        finally:
+            _initializing = False
+
+SQLITE_PATH = 'botdata.sqlite3'
+
+# Pool sizing; tune with the counters from pool_stats()
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', 300))
+POOL_ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', 10))
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(backend):
+    pool = _pools.get(backend)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(backend)
+            if pool is None:
+                if backend == 'mysql':
+                    driver = MySQLDriver(MYSQL_CONFIG, connect_timeout=DB_PROBE_TIMEOUT)
+                else:
+                    driver = SQLiteDriver(SQLITE_PATH)
+                pool = ConnectionPool(
+                    driver,
+                    max_size=POOL_SIZE,
+                    max_idle=POOL_MAX_IDLE,
+                    acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+                )
+                _pools[backend] = pool
+    return pool
+
+def pool_stats():
+    """Return hit/miss/wait counters for every pool that has been used."""
+    return {backend: pool.snapshot() for backend, pool in _pools.items()}
+
+def close_pools():
+    if _failover:
+        _failover.stop()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+# Failover tuning for when MySQL drops out at runtime
+DB_RETRY_ATTEMPTS = int(os.getenv('DB_RETRY_ATTEMPTS', 3))
+DB_FAILURE_THRESHOLD = int(os.getenv('DB_FAILURE_THRESHOLD', 1))
+DB_RECOVERY_PROBE_INTERVAL = float(os.getenv('DB_RECOVERY_PROBE_INTERVAL', 10))
+
+# Auto-increment primary keys; failover keeps these ids when replaying inserts
+AUTO_ID_COLUMNS = {
+    'events': 'event_id',
+    'sections': 'section_id',
+    'teams': 'team_id',
+    'definitions': 'id',
+    'score_events': 'id',
+}
 
-MYSQL_CONFIG = get_mysql_config()
+_failover = None
 
-# Flag to track if we're using MySQL or SQLite
-USE_MYSQL = MYSQL_CONFIG is not None
+# Callbacks told when failover switches backends; see add_switch_listener()
+_switch_listeners = []
 
-@contextmanager
-def get_db():
+def add_switch_listener(callback):
+    """Call ``callback(mysql_active)`` whenever failover switches between MySQL and SQLite.
+
+    The callback runs on whichever database thread made the switch.
+    """
+    _switch_listeners.append(callback)
+
+def remove_switch_listener(callback):
+    if callback in _switch_listeners:
+        _switch_listeners.remove(callback)
+
+def serving_fallback():
+    """True while MySQL is configured but SQLite is serving in its place.
+
+    The SQLite copy lacks MySQL's rows, so totals read back from it are not the real ones.
+    """
+    return MYSQL_CONFIG is not None and not USE_MYSQL
+
+def _set_active_backend(mysql_active):
     global USE_MYSQL
-    if USE_MYSQL and MYSQL_CONFIG:
+    USE_MYSQL = mysql_active
+    for callback in list(_switch_listeners):
         try:
-            conn = mysql.connector.connect(**MYSQL_CONFIG)
-            try:
-                yield conn
-            finally:
-                conn.close()
+            callback(mysql_active)
         except Exception as e:
-            print(f"MySQL connection failed: {e}")
-            print("Falling back to SQLite...")
-            USE_MYSQL = False
-            # Fall through to SQLite
-            pass
-    
-    if not USE_MYSQL:
-        # Use SQLite fallback
-        conn = sqlite3.connect('botdata.sqlite3')
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+            print(f"Backend switch listener failed: {e}")
+
+def _get_failover():
+    global _failover
+    if _failover is None:
+        mysql_pool = _get_pool('mysql')
+        sqlite_pool = _get_pool('sqlite')
+        with _pools_lock:
+            if _failover is None:
+                _failover = FailoverManager(
+                    mysql_pool,
+                    sqlite_pool,
+                    prepare_fallback=migrate,
+                    id_columns=AUTO_ID_COLUMNS,
+                    on_switch=_set_active_backend,
+                    retry_attempts=DB_RETRY_ATTEMPTS,
+                    failure_threshold=DB_FAILURE_THRESHOLD,
+                    probe_interval=DB_RECOVERY_PROBE_INTERVAL,
+                )
+    return _failover
+
+def failover_stats():
+    """Breaker state, journal depth and replay counters, or None when MySQL isn't configured."""
+    return _failover.snapshot() if _failover else None
+
+@contextmanager
+def get_db():
+    init_backend()
+    if MYSQL_CONFIG:
+        # MySQL with SQLite failover; USE_MYSQL tracks which one is serving
+        with _get_failover().connection() as conn:
+            yield DialectConnection(conn)
+        return
+
+    pool = _get_pool('sqlite')
+    conn = pool.acquire()
+    try:
+        yield DialectConnection(conn)
+    finally:
+        pool.release(conn)
 
 def setup_db():
-    global USE_MYSQL
+    """Bring the active backend's schema up to date (see db_migrations)."""
+    global USE_MYSQL, MYSQL_CONFIG
     try:
-        with get_db() as conn:
-            c = conn.cursor()
-            if USE_MYSQL:
-                # MySQL table creation
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS channel_config (
-                        guild_id BIGINT PRIMARY KEY,
-                        mod_channel BIGINT,
-                        event_channel BIGINT,
-                        team_channel BIGINT,
-                        log_channel BIGINT
-                    )
-                ''')
-                # Bot configuration table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS bot_config (
-                        config_key VARCHAR(64) PRIMARY KEY,
-                        config_value TEXT
-                    )
-                ''')
-                # User usage
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS user_usage (
-                        guild_id BIGINT,
-                        user_id BIGINT,
-                        command VARCHAR(64),
-                        count INT DEFAULT 0,
-                        PRIMARY KEY (guild_id, user_id, command)
-                    )
-                ''')
-                # Server usage
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS server_usage (
-                        guild_id BIGINT PRIMARY KEY,
-                        events_created INT DEFAULT 0,
-                        teams_created INT DEFAULT 0,
-                        members_joined INT DEFAULT 0
-                    )
-                ''')
-                # User participation in events/teams
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS user_event_participation (
-                        guild_id BIGINT,
-                        event_id BIGINT,
-                        user_id BIGINT,
-                        team_name VARCHAR(255),
-                        PRIMARY KEY (guild_id, event_id, user_id)
-                    )
-                ''')
-                # Team stats per event
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS team_event_stats (
-                        guild_id BIGINT,
-                        event_id BIGINT,
-                        team_name VARCHAR(255),
-                        score INT DEFAULT 0,
-                        `rank` INT DEFAULT NULL,
-                        PRIMARY KEY (guild_id, event_id, team_name)
-                    )
-                ''')
-                # Events table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS events (
-                        event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
-                        guild_id BIGINT,
-                        name VARCHAR(255),
-                        max_sections INT
-                    )
-                ''')
-                # Sections table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS sections (
-                        section_id BIGINT AUTO_INCREMENT PRIMARY KEY,
-                        event_id BIGINT,
-                        name VARCHAR(255),
-                        max_teams INT
-                    )
-                ''')
-                # Teams table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS teams (
-                        team_id BIGINT AUTO_INCREMENT PRIMARY KEY,
-                        section_id BIGINT,
-                        name VARCHAR(255),
-                        leader_id BIGINT,
-                        max_members INT,
-                        emoji VARCHAR(32)
-                    )
-                ''')
-                # Team members table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS team_members (
-                        team_id BIGINT,
-                        user_id BIGINT,
-                        PRIMARY KEY (team_id, user_id)
-                    )
-                ''')
-                # Channels table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS channels (
-                        guild_id BIGINT,
-                        channel_type VARCHAR(32),
-                        channel_id BIGINT,
-                        PRIMARY KEY (guild_id, channel_type)
-                    )
-                ''')
-                # User stats table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS user_stats (
-                        user_id BIGINT,
-                        guild_id BIGINT,
-                        events_participated INT DEFAULT 0,
-                        `rank` INT DEFAULT 0,
-                        team_id BIGINT,
-                        PRIMARY KEY (user_id, guild_id)
-                    )
-                ''')
-                # Leaderboard table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS leaderboard (
-                        event_id BIGINT,
-                        team_id BIGINT,
-                        score INT DEFAULT 0,
-                        PRIMARY KEY (event_id, team_id)
-                    )
-                ''')
-                # Server stats table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS server_stats (
-                        guild_id BIGINT,
-                        stat_name VARCHAR(64),
-                        value INT DEFAULT 0,
-                        PRIMARY KEY (guild_id, stat_name)
-                    )
-                ''')
-            else:
-                # SQLite table creation
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS channel_config (
-                        guild_id INTEGER PRIMARY KEY,
-                        mod_channel INTEGER,
-                        event_channel INTEGER,
-                        team_channel INTEGER,
-                        log_channel INTEGER
-                    )
-                ''')
-                # Bot configuration table
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS bot_config (
-                        config_key TEXT PRIMARY KEY,
-                        config_value TEXT
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS user_usage (
-                        guild_id INTEGER,
-                        user_id INTEGER,
-                        command TEXT,
-                        count INTEGER DEFAULT 0,
-                        PRIMARY KEY (guild_id, user_id, command)
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS server_usage (
-                        guild_id INTEGER PRIMARY KEY,
-                        events_created INTEGER DEFAULT 0,
-                        teams_created INTEGER DEFAULT 0,
-                        members_joined INTEGER DEFAULT 0
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS user_event_participation (
-                        guild_id INTEGER,
-                        event_id INTEGER,
-                        user_id INTEGER,
-                        team_name TEXT,
-                        PRIMARY KEY (guild_id, event_id, user_id)
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS team_event_stats (
-                        guild_id INTEGER,
-                        event_id INTEGER,
-                        team_name TEXT,
-                        score INTEGER DEFAULT 0,
-                        rank INTEGER DEFAULT NULL,
-                        PRIMARY KEY (guild_id, event_id, team_name)
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS events (
-                        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        guild_id INTEGER,
-                        name TEXT,
-                        max_sections INTEGER
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS sections (
-                        section_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        event_id INTEGER,
-                        name TEXT,
-                        max_teams INTEGER
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS teams (
-                        team_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        section_id INTEGER,
-                        name TEXT,
-                        leader_id INTEGER,
-                        max_members INTEGER,
-                        emoji TEXT
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS team_members (
-                        team_id INTEGER,
-                        user_id INTEGER,
-                        PRIMARY KEY (team_id, user_id)
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS channels (
-                        guild_id INTEGER,
-                        channel_type TEXT,
-                        channel_id INTEGER,
-                        PRIMARY KEY (guild_id, channel_type)
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS user_stats (
-                        user_id INTEGER,
-                        guild_id INTEGER,
-                        events_participated INTEGER DEFAULT 0,
-                        rank INTEGER DEFAULT 0,
-                        team_id INTEGER,
-                        PRIMARY KEY (user_id, guild_id)
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS leaderboard (
-                        event_id INTEGER,
-                        team_id INTEGER,
-                        score INTEGER DEFAULT 0,
-                        PRIMARY KEY (event_id, team_id)
-                    )
-                ''')
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS server_stats (
-                        guild_id INTEGER,
-                        stat_name TEXT,
-                        value INTEGER DEFAULT 0,
-                        PRIMARY KEY (guild_id, stat_name)
-                    )
-                ''')
-            conn.commit()
+        # Straight from the pool: migration writes must never land in the failover journal
+        pool = _get_pool('mysql' if MYSQL_CONFIG else 'sqlite')
+        conn = pool.acquire()
+        try:
+            migrate(conn)
+        finally:
+            pool.release(conn)
     except Exception as e:
         print(f"Database setup failed: {e}")
         USE_MYSQL = False
+        MYSQL_CONFIG = None
         # Try again with SQLite
         setup_db()
 
@@ -340,90 +260,92 @@ def set_channel(guild_id, channel_type, channel_id):
         c = conn.cursor()
         if channel_id is None:
             # Delete the channel configuration
-            if USE_MYSQL:
-                c.execute(
-                    "DELETE FROM channels WHERE guild_id=%s AND channel_type=%s",
-                    (guild_id, channel_type)
-                )
-            else:
-                c.execute(
-                    "DELETE FROM channels WHERE guild_id=? AND channel_type=?",
-                    (guild_id, channel_type)
-                )
+            c.execute(
+                "DELETE FROM channels WHERE guild_id=? AND channel_type=?",
+                (guild_id, channel_type)
+            )
         else:
             # Set the channel configuration
-            if USE_MYSQL:
-                c.execute(
-                    "REPLACE INTO channels (guild_id, channel_type, channel_id) VALUES (%s, %s, %s)",
-                    (guild_id, channel_type, channel_id)
-                )
-            else:
-                c.execute(
-                    "INSERT OR REPLACE INTO channels (guild_id, channel_type, channel_id) VALUES (?, ?, ?)",
-                    (guild_id, channel_type, channel_id)
-                )
+            c.execute(
+                "INSERT OR REPLACE INTO channels (guild_id, channel_type, channel_id) VALUES (?, ?, ?)",
+                (guild_id, channel_type, channel_id)
+            )
         conn.commit()
 
 def get_channel(guild_id, channel_type):
     with get_db() as conn:
         c = conn.cursor()
-        if USE_MYSQL:
-            c.execute(
-                "SELECT channel_id FROM channels WHERE guild_id=%s AND channel_type=%s",
-                (guild_id, channel_type)
-            )
-        else:
-            c.execute(
-                "SELECT channel_id FROM channels WHERE guild_id=? AND channel_type=?",
-                (guild_id, channel_type)
-            )
+        c.execute(
+            "SELECT channel_id FROM channels WHERE guild_id=? AND channel_type=?",
+            (guild_id, channel_type)
+        )
         row = c.fetchone()
         return row[0] if row else None
 
+def get_all_channels():
+    """Every configured channel as (guild_id, channel_type, channel_id) rows."""
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute("SELECT guild_id, channel_type, channel_id FROM channels")
+        return c.fetchall()
+
+def get_embeds(kind):
+    """Registered embeds of one kind as (embed_key, guild_id, channel_id, message_id) rows."""
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT embed_key, guild_id, channel_id, message_id FROM embed_registry WHERE kind=?",
+            (kind,)
+        )
+        return c.fetchall()
+
+def set_embed(kind, embed_key, guild_id, channel_id, message_id):
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(
+            "INSERT OR REPLACE INTO embed_registry (kind, embed_key, guild_id, channel_id, message_id) VALUES (?, ?, ?, ?, ?)",
+            (kind, str(embed_key), guild_id, channel_id, message_id)
+        )
+        conn.commit()
+
+def delete_embed(kind, embed_key):
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM embed_registry WHERE kind=? AND embed_key=?", (kind, str(embed_key)))
+        conn.commit()
+
 def log_user_command(guild_id, user_id, command):
     with get_db() as conn:
         c = conn.cursor()
-        if USE_MYSQL:
-            c.execute('''
-                INSERT INTO user_usage (guild_id, user_id, command, count) VALUES (%s, %s, %s, 1)
-                ON DUPLICATE KEY UPDATE count = count + 1
-            ''', (guild_id, user_id, command))
-        else:
-            c.execute('''
-                INSERT INTO user_usage (guild_id, user_id, command, count) VALUES (?, ?, ?, 1)
-                ON CONFLICT(guild_id, user_id, command) DO UPDATE SET count = count + 1
-            ''', (guild_id, user_id, command))
+        c.execute('''
+            INSERT INTO user_usage (guild_id, user_id, command, count) VALUES (?, ?, ?, 1)
+            ON CONFLICT(guild_id, user_id, command) DO UPDATE SET count = count + 1
+        ''', (guild_id, user_id, command))
         conn.commit()
 
 def increment_server_stat(guild_id, stat):
     with get_db() as conn:
         c = conn.cursor()
-        if USE_MYSQL:
-            c.execute(f"INSERT INTO server_usage (guild_id, {stat}) VALUES (%s, 1) ON DUPLICATE KEY UPDATE {stat} = {stat} + 1", (guild_id,))
-        else:
-            c.execute(f"INSERT INTO server_usage (guild_id, {stat}) VALUES (?, 1) ON CONFLICT(guild_id) DO UPDATE SET {stat} = {stat} + 1", (guild_id,))
+        c.execute(f"INSERT INTO server_usage (guild_id, {stat}) VALUES (?, 1) ON CONFLICT(guild_id) DO UPDATE SET {stat} = {stat} + 1", (guild_id,))
         conn.commit()
 
 def get_user_stats(guild_id, user_id):
     with get_db() as conn:
         c = conn.cursor()
-        if USE_MYSQL:
-            c.execute('''SELECT command, count FROM user_usage WHERE guild_id = %s AND user_id = %s ORDER BY count DESC''', (guild_id, user_id))
-        else:
-            c.execute('''SELECT command, count FROM user_usage WHERE guild_id = ? AND user_id = ? ORDER BY count DESC''', (guild_id, user_id))
+        c.execute('''SELECT command, count FROM user_usage WHERE guild_id = ? AND user_id = ? ORDER BY count DESC''', (guild_id, user_id))
         return c.fetchall()
 
 def get_server_stats(guild_id):
     with get_db() as conn:
         c = conn.cursor()
-        if USE_MYSQL:
-            c.execute('''SELECT events_created, teams_created, members_joined FROM server_usage WHERE guild_id = %s''', (guild_id,))
-        else:
-            c.execute('''SELECT events_created, teams_created, members_joined FROM server_usage WHERE guild_id = ?''', (guild_id,))
+        c.execute('''SELECT events_created, teams_created, members_joined FROM server_usage WHERE guild_id = ?''', (guild_id,))
         return c.fetchone()
 
-# Call this on bot startup
-setup_db()
+def get_top_users(guild_id, limit=5):
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT user_id, SUM(count) as total FROM user_usage WHERE guild_id = ? GROUP BY user_id ORDER BY total DESC LIMIT ?''', (guild_id, limit))
+        return c.fetchall()
 
 # --- User Event Participation Functions ---
 def log_user_participation(guild_id, event_id, user_id, team_name):
@@ -431,8 +353,8 @@ def log_user_participation(guild_id, event_id, user_id, team_name):
         c = conn.cursor()
         c.execute('''
             INSERT INTO user_event_participation (guild_id, event_id, user_id, team_name)
-            VALUES (%s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE team_name = VALUES(team_name)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, event_id, user_id) DO UPDATE SET team_name = excluded.team_name
         ''', (guild_id, event_id, user_id, team_name))
         conn.commit()
 
@@ -440,7 +362,7 @@ def get_user_event_participation(guild_id, user_id):
     with get_db() as conn:
         c = conn.cursor()
         c.execute('''
-            SELECT event_id, team_name FROM user_event_participation WHERE guild_id = %s AND user_id = %s
+            SELECT event_id, team_name FROM user_event_participation WHERE guild_id = ? AND user_id = ?
         ''', (guild_id, user_id))
         return c.fetchall()
 
@@ -450,8 +372,8 @@ def log_team_stats(guild_id, event_id, team_name, score=0, rank=None):
         c = conn.cursor()
         c.execute('''
             INSERT INTO team_event_stats (guild_id, event_id, team_name, score, `rank`)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE score = VALUES(score), `rank` = VALUES(`rank`)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id, event_id, team_name) DO UPDATE SET score = excluded.score, `rank` = excluded.`rank`
         ''', (guild_id, event_id, team_name, score, rank))
         conn.commit()
 
@@ -459,7 +381,7 @@ def get_team_stats(guild_id, event_id, team_name):
     with get_db() as conn:
         c = conn.cursor()
         c.execute('''
-            SELECT score, `rank` FROM team_event_stats WHERE guild_id = %s AND event_id = %s AND team_name = %s
+            SELECT score, `rank` FROM team_event_stats WHERE guild_id = ? AND event_id = ? AND team_name = ?
         ''', (guild_id, event_id, team_name))
         return c.fetchone()
 
@@ -467,7 +389,7 @@ def get_team_members(guild_id, event_id, team_name):
     with get_db() as conn:
         c = conn.cursor()
         c.execute('''
-            SELECT user_id FROM user_event_participation WHERE guild_id = %s AND event_id = %s AND team_name = %s
+            SELECT user_id FROM user_event_participation WHERE guild_id = ? AND event_id = ? AND team_name = ?
         ''', (guild_id, event_id, team_name))
         return [row[0] for row in c.fetchall()]
 
@@ -475,14 +397,14 @@ def get_user_event_rank(guild_id, event_id, user_id):
     with get_db() as conn:
         c = conn.cursor()
         c.execute('''
-            SELECT team_name FROM user_event_participation WHERE guild_id = %s AND event_id = %s AND user_id = %s
+            SELECT team_name FROM user_event_participation WHERE guild_id = ? AND event_id = ? AND user_id = ?
         ''', (guild_id, event_id, user_id))
         row = c.fetchone()
         if not row:
             return None, None
         team_name = row[0]
         c.execute('''
-            SELECT `rank` FROM team_event_stats WHERE guild_id = %s AND event_id = %s AND team_name = %s
+            SELECT `rank` FROM team_event_stats WHERE guild_id = ? AND event_id = ? AND team_name = ?
         ''', (guild_id, event_id, team_name))
         rank_row = c.fetchone()
         return team_name, (rank_row[0] if rank_row else None)
@@ -490,82 +412,188 @@ def get_user_event_rank(guild_id, event_id, user_id):
 def add_event(guild_id, name, max_sections):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''INSERT INTO events (guild_id, name, max_sections) VALUES (%s, %s, %s)''', (guild_id, name, max_sections))
+        c.execute('''INSERT INTO events (guild_id, name, max_sections) VALUES (?, ?, ?)''', (guild_id, name, max_sections))
         conn.commit()
         return c.lastrowid
 
 def get_event(event_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT event_id, guild_id, name, max_sections FROM events WHERE event_id = %s''', (event_id,))
+        c.execute('''SELECT event_id, guild_id, name, max_sections FROM events WHERE event_id = ?''', (event_id,))
         return c.fetchone()
 
 def list_events(guild_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT event_id, name, max_sections FROM events WHERE guild_id = %s''', (guild_id,))
+        c.execute('''SELECT event_id, name, max_sections FROM events WHERE guild_id = ?''', (guild_id,))
         return c.fetchall()
 
 def remove_event(event_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''DELETE FROM events WHERE event_id = %s''', (event_id,))
+        c.execute('''DELETE FROM events WHERE event_id = ?''', (event_id,))
+        conn.commit()
+
+def delete_event_cascade(event_id):
+    """Delete an event with its sections, teams, members, scores and participation rows.
+
+    The score log (score_events and score_snapshots) is an append-only audit trail
+    and is kept; event ids are never reused, so it can't mix with a later event.
+    """
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('DELETE FROM leaderboard WHERE event_id = ?', (event_id,))
+        c.execute('DELETE FROM team_event_stats WHERE event_id = ?', (event_id,))
+        c.execute('DELETE FROM user_event_participation WHERE event_id = ?', (event_id,))
+        # Remove teams and members
+        c.execute('SELECT section_id FROM sections WHERE event_id = ?', (event_id,))
+        section_ids = [int(row[0]) for row in c.fetchall()]
+        for section_id in section_ids:
+            c.execute('SELECT team_id FROM teams WHERE section_id = ?', (section_id,))
+            team_ids = [int(row[0]) for row in c.fetchall()]
+            for team_id in team_ids:
+                c.execute('DELETE FROM team_members WHERE team_id = ?', (team_id,))
+            c.execute('DELETE FROM teams WHERE section_id = ?', (section_id,))
+        c.execute('DELETE FROM sections WHERE event_id = ?', (event_id,))
+        c.execute('DELETE FROM events WHERE event_id = ?', (event_id,))
+        conn.commit()
+
+def reset_event_scores(event_id, moderator_id=None):
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('SELECT team_id, score FROM leaderboard WHERE event_id = ?', (event_id,))
+        for team_id, score in c.fetchall():
+            if score:
+                _log_score_set(c, event_id, team_id, 0, 'reset', moderator_id)
+        c.execute('''DELETE FROM leaderboard WHERE event_id = ?''', (event_id,))
+        c.execute('''DELETE FROM team_event_stats WHERE event_id = ?''', (event_id,))
         conn.commit()
 
+def load_tournament_rows(guild_ids=None):
+    """Fetch every event, section, team and member in four queries on one connection.
+
+    Restricted to ``guild_ids`` when given. Returns a dict of row lists keyed by
+    'events', 'sections', 'teams' and 'members', each ordered so a single pass
+    can assemble the nested graph.
+    """
+    where, params = '', ()
+    if guild_ids:
+        where = f"WHERE e.guild_id IN ({', '.join('?' * len(guild_ids))})"
+        params = tuple(guild_ids)
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT e.event_id, e.guild_id, e.name, e.max_sections FROM events e {where} ORDER BY e.event_id''', params)
+        events = c.fetchall()
+        c.execute(f'''
+            SELECT s.section_id, s.event_id, s.name, s.max_teams
+            FROM sections s JOIN events e ON e.event_id = s.event_id
+            {where} ORDER BY s.section_id
+        ''', params)
+        sections = c.fetchall()
+        c.execute(f'''
+            SELECT t.team_id, t.section_id, t.name, t.leader_id, t.max_members, t.emoji
+            FROM teams t JOIN sections s ON s.section_id = t.section_id JOIN events e ON e.event_id = s.event_id
+            {where} ORDER BY t.team_id
+        ''', params)
+        teams = c.fetchall()
+        c.execute(f'''
+            SELECT m.team_id, m.user_id
+            FROM team_members m JOIN teams t ON t.team_id = m.team_id
+            JOIN sections s ON s.section_id = t.section_id JOIN events e ON e.event_id = s.event_id
+            {where}
+        ''', params)
+        members = c.fetchall()
+        return {'events': events, 'sections': sections, 'teams': teams, 'members': members}
+
 def add_section(event_id, name, max_teams):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''INSERT INTO sections (event_id, name, max_teams) VALUES (%s, %s, %s)''', (event_id, name, max_teams))
+        c.execute('''INSERT INTO sections (event_id, name, max_teams) VALUES (?, ?, ?)''', (event_id, name, max_teams))
         conn.commit()
         return c.lastrowid
 
 def get_sections(event_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT section_id, name, max_teams FROM sections WHERE event_id = %s''', (event_id,))
+        c.execute('''SELECT section_id, name, max_teams FROM sections WHERE event_id = ?''', (event_id,))
         return c.fetchall()
 
 def add_team(section_id, name, leader_id, max_members, emoji):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''INSERT INTO teams (section_id, name, leader_id, max_members, emoji) VALUES (%s, %s, %s, %s, %s)''', (section_id, name, leader_id, max_members, emoji))
+        c.execute('''INSERT INTO teams (section_id, name, leader_id, max_members, emoji) VALUES (?, ?, ?, ?, ?)''', (section_id, name, leader_id, max_members, emoji))
         conn.commit()
         return c.lastrowid
 
 def get_teams(section_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT team_id, name, leader_id, max_members, emoji FROM teams WHERE section_id = %s''', (section_id,))
+        c.execute('''SELECT team_id, name, leader_id, max_members, emoji FROM teams WHERE section_id = ?''', (section_id,))
         return c.fetchall()
 
 def add_team_member(team_id, user_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''INSERT IGNORE INTO team_members (team_id, user_id) VALUES (%s, %s)''', (team_id, user_id))
+        c.execute('''INSERT OR IGNORE INTO team_members (team_id, user_id) VALUES (?, ?)''', (team_id, user_id))
+        conn.commit()
+
+def apply_membership_changes(joins, leaves):
+    """Apply batched team joins and leaves in one transaction.
+
+    Each change is ``(team_id, user_id, guild_id, event_id, team_name)``.
+    Leaves are applied first; participation rows are only removed if they
+    still point at the team being left.
+    """
+    with get_db() as conn:
+        c = conn.cursor()
+        if leaves:
+            c.executemany('''DELETE FROM team_members WHERE team_id = ? AND user_id = ?''',
+                          [(team_id, user_id) for team_id, user_id, _, _, _ in leaves])
+            c.executemany('''
+                DELETE FROM user_event_participation WHERE guild_id = ? AND event_id = ? AND user_id = ? AND team_name = ?
+            ''', [(guild_id, event_id, user_id, team_name) for _, user_id, guild_id, event_id, team_name in leaves])
+        if joins:
+            c.executemany('''INSERT OR IGNORE INTO team_members (team_id, user_id) VALUES (?, ?)''',
+                          [(team_id, user_id) for team_id, user_id, _, _, _ in joins])
+            c.executemany('''
+                INSERT INTO user_event_participation (guild_id, event_id, user_id, team_name)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(guild_id, event_id, user_id) DO UPDATE SET team_name = excluded.team_name
+            ''', [(guild_id, event_id, user_id, team_name) for _, user_id, guild_id, event_id, team_name in joins])
         conn.commit()
 
 def get_team_members_by_id(team_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT user_id FROM team_members WHERE team_id = %s''', (team_id,))
+        c.execute('''SELECT user_id FROM team_members WHERE team_id = ?''', (team_id,))
         return [row[0] for row in c.fetchall()]
 
 def remove_team_member(team_id, user_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''DELETE FROM team_members WHERE team_id = %s AND user_id = %s''', (team_id, user_id))
+        c.execute('''DELETE FROM team_members WHERE team_id = ? AND user_id = ?''', (team_id, user_id))
         conn.commit()
 
+def _remove_teams(c, team_ids):
+    for team_id in team_ids:
+        c.execute('DELETE FROM team_members WHERE team_id = ?', (team_id,))
+        c.execute('DELETE FROM leaderboard WHERE team_id = ?', (team_id,))
+        c.execute('DELETE FROM teams WHERE team_id = ?', (team_id,))
+
 def remove_team(team_id):
+    """Delete a team with its members and leaderboard row."""
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''DELETE FROM teams WHERE team_id = %s''', (team_id,))
+        _remove_teams(c, [team_id])
         conn.commit()
 
 def remove_section(section_id):
+    """Delete a section with its teams, their members and leaderboard rows."""
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''DELETE FROM sections WHERE section_id = %s''', (section_id,))
+        c.execute('SELECT team_id FROM teams WHERE section_id = ?', (section_id,))
+        _remove_teams(c, [int(row[0]) for row in c.fetchall()])
+        c.execute('''DELETE FROM sections WHERE section_id = ?''', (section_id,))
         conn.commit()
 
 # User stats helpers
@@ -574,54 +602,251 @@ def set_user_stats(user_id, guild_id, events_participated=0, rank=0, team_id=Non
         c = conn.cursor()
         c.execute('''
             INSERT INTO user_stats (user_id, guild_id, events_participated, `rank`, team_id)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE events_participated=VALUES(events_participated), `rank`=VALUES(`rank`), team_id=VALUES(team_id)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, guild_id) DO UPDATE SET events_participated=excluded.events_participated, `rank`=excluded.`rank`, team_id=excluded.team_id
         ''', (user_id, guild_id, events_participated, rank, team_id))
         conn.commit()
 
 def fetch_user_stats(user_id, guild_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT events_participated, `rank`, team_id FROM user_stats WHERE user_id = %s AND guild_id = %s''', (user_id, guild_id))
+        c.execute('''SELECT events_participated, `rank`, team_id FROM user_stats WHERE user_id = ? AND guild_id = ?''', (user_id, guild_id))
         return c.fetchone()
 
 # Leaderboard helpers
-def set_leaderboard_score(event_id, team_id, score):
+# Every score change is also appended to score_events in the same transaction.
+# The logged delta of a set and the logged score of an add are read from the
+# leaderboard row inside the INSERT itself, so a write journaled during failover
+# is recomputed against MySQL's scores when it is replayed.
+# Every SCORE_SNAPSHOT_INTERVAL log entries the event's leaderboard is copied to
+# score_snapshots, so a past leaderboard is one snapshot plus a short replay.
+SCORE_SNAPSHOT_INTERVAL = int(os.getenv('SCORE_SNAPSHOT_INTERVAL', 100))
+
+_ROW_SCORE = '(SELECT score FROM leaderboard WHERE event_id = ? AND team_id = ?)'
+
+# One row per statement so failover replay keeps the ids snapshots refer to
+def _log_score_set(c, event_id, team_id, score, kind, moderator_id):
+    """Log a team's score becoming ``score``; call before the leaderboard row changes."""
+    c.execute(f'''
+        INSERT INTO score_events (event_id, team_id, delta, score, kind, moderator_id, created_at)
+        VALUES (?, ?, ? - COALESCE({_ROW_SCORE}, 0), ?, ?, ?, ?)
+    ''', (event_id, team_id, score, event_id, team_id, score, kind, moderator_id, time.time()))
+
+def _log_score_add(c, event_id, team_id, points, later, moderator_id):
+    """Log ``points`` added to a team; call after the leaderboard row changes.
+
+    ``later`` is the sum of points added to the team after this entry in the same write.
+    """
+    c.execute(f'''
+        INSERT INTO score_events (event_id, team_id, delta, score, kind, moderator_id, created_at)
+        VALUES (?, ?, ?, {_ROW_SCORE} - ?, 'add', ?, ?)
+    ''', (event_id, team_id, points, event_id, team_id, later, moderator_id, time.time()))
+
+def _maybe_snapshot_scores(c, event_id):
+    c.execute('SELECT MAX(event_log_id) FROM score_snapshots WHERE event_id = ?', (event_id,))
+    covered = c.fetchone()[0] or 0
+    c.execute('SELECT COUNT(*), MAX(id) FROM score_events WHERE event_id = ? AND id > ?', (event_id, covered))
+    count, last_id = c.fetchone()
+    if count >= SCORE_SNAPSHOT_INTERVAL:
+        c.execute('''
+            INSERT INTO score_snapshots (event_id, event_log_id, team_id, score, taken_at)
+            SELECT event_id, ?, team_id, score, ? FROM leaderboard WHERE event_id = ?
+        ''', (last_id, time.time(), event_id))
+
+def _current_scores(c, event_id, team_ids):
+    c.execute(
+        f"SELECT team_id, score FROM leaderboard WHERE event_id = ? AND team_id IN ({', '.join('?' * len(team_ids))})",
+        (event_id, *team_ids)
+    )
+    return {row[0]: int(row[1]) for row in c.fetchall()}
+
+def _set_scores(c, event_id, scores, moderator_id):
+    """Overwrite the scores in ``{team_id: score}`` and log each change."""
+    for team_id, score in scores.items():
+        _log_score_set(c, event_id, team_id, score, 'set', moderator_id)
+    c.executemany('''
+        INSERT INTO leaderboard (event_id, team_id, score) VALUES (?, ?, ?)
+        ON CONFLICT(event_id, team_id) DO UPDATE SET score = excluded.score
+    ''', [(event_id, team_id, score) for team_id, score in scores.items()])
+
+def _add_scores(c, event_id, deltas, moderator_id):
+    """Apply ``[(team_id, points)]`` increments, log them and return {team_id: new_score}."""
+    c.executemany('''
+        INSERT INTO leaderboard (event_id, team_id, score) VALUES (?, ?, ?)
+        ON CONFLICT(event_id, team_id) DO UPDATE SET score = score + excluded.score
+    ''', [(event_id, team_id, points) for team_id, points in deltas])
+    # Score after each entry is the final total minus the points added after it
+    later = {}
+    entries = []
+    for team_id, points in reversed(deltas):
+        entries.append((team_id, points, later.get(team_id, 0)))
+        later[team_id] = later.get(team_id, 0) + points
+    for team_id, points, pending in reversed(entries):
+        _log_score_add(c, event_id, team_id, points, pending, moderator_id)
+    # Read back inside the same transaction; our upsert still holds the row lock
+    return _current_scores(c, event_id, list(later))
+
+def set_leaderboard_score(event_id, team_id, score, moderator_id=None):
+    with get_db() as conn:
+        c = conn.cursor()
+        _set_scores(c, event_id, {team_id: score}, moderator_id)
+        _maybe_snapshot_scores(c, event_id)
+        conn.commit()
+
+def add_leaderboard_score(event_id, team_id, points, moderator_id=None):
+    """Atomically add ``points`` to a team's score (creating the row) and return the new score."""
+    return add_leaderboard_scores(event_id, [(team_id, points)], moderator_id)[team_id]
+
+def add_leaderboard_scores(event_id, deltas, moderator_id=None):
+    """Apply many ``(team_id, points)`` increments in one transaction.
+
+    The increment happens in the database, so concurrent callers never lose
+    updates. Returns {team_id: new_score} for the teams touched.
+    """
+    return import_leaderboard_scores(event_id, deltas=deltas, moderator_id=moderator_id)
+
+def import_leaderboard_scores(event_id, scores=None, deltas=None, moderator_id=None):
+    """Set ``{team_id: score}`` and add ``[(team_id, points)]`` in one transaction.
+
+    Returns {team_id: new_score} for every team touched.
+    """
+    scores = dict(scores or {})
+    deltas = list(deltas.items()) if isinstance(deltas, dict) else list(deltas or ())
+    if not scores and not deltas:
+        return {}
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''
-            INSERT INTO leaderboard (event_id, team_id, score) VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE score = VALUES(score)
-        ''', (event_id, team_id, score))
+        result = {}
+        if scores:
+            _set_scores(c, event_id, scores, moderator_id)
+            result.update(scores)
+        if deltas:
+            result.update(_add_scores(c, event_id, deltas, moderator_id))
+        _maybe_snapshot_scores(c, event_id)
         conn.commit()
+        return result
+
+def get_event_team_ids(event_id):
+    """Every team of an event as (team_id, name) rows, in one query."""
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT t.team_id, t.name FROM teams t
+            JOIN sections s ON s.section_id = t.section_id
+            WHERE s.event_id = ?
+        ''', (event_id,))
+        return c.fetchall()
+
+def get_score_history(event_id, team_id, limit=None):
+    """A team's score log, oldest first: (delta, score, kind, moderator_id, created_at) rows.
+
+    With ``limit``, only the most recent ``limit`` entries.
+    """
+    with get_db() as conn:
+        c = conn.cursor()
+        sql = '''
+            SELECT id, delta, score, kind, moderator_id, created_at FROM score_events
+            WHERE event_id = ? AND team_id = ? ORDER BY id DESC
+        '''
+        params = (event_id, team_id)
+        if limit:
+            sql += ' LIMIT ?'
+            params += (limit,)
+        c.execute(sql, params)
+        return [tuple(row[1:]) for row in reversed(c.fetchall())]
+
+def get_scores_at(event_id, timestamp):
+    """{team_id: score} as the leaderboard stood at ``timestamp`` (seconds since the epoch).
+
+    Starts from the latest snapshot taken before then and replays the log after it.
+    """
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT MAX(s.event_log_id) FROM score_snapshots s
+            JOIN score_events e ON e.id = s.event_log_id
+            WHERE s.event_id = ? AND e.created_at <= ?
+        ''', (event_id, timestamp))
+        covered = c.fetchone()[0] or 0
+        scores = {}
+        if covered:
+            c.execute(
+                'SELECT team_id, score FROM score_snapshots WHERE event_id = ? AND event_log_id = ?',
+                (event_id, covered)
+            )
+            scores = {row[0]: int(row[1]) for row in c.fetchall()}
+        c.execute('''
+            SELECT team_id, SUM(delta) FROM score_events
+            WHERE event_id = ? AND id > ? AND created_at <= ?
+            GROUP BY team_id
+        ''', (event_id, covered, timestamp))
+        for team_id, delta in c.fetchall():
+            scores[team_id] = scores.get(team_id, 0) + int(delta)
+        return scores
 
 def get_leaderboard(event_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT team_id, score FROM leaderboard WHERE event_id = %s ORDER BY score DESC''', (event_id,))
+        c.execute('''
+            SELECT l.team_id, l.score FROM leaderboard l
+            JOIN teams t ON t.team_id = l.team_id
+            WHERE l.event_id = ?
+            ORDER BY l.score DESC
+        ''', (event_id,))
         return c.fetchall()
 
+def get_leaderboard_view(event_id):
+    """Ranked leaderboard for an event with everything the embeds show, in one query.
+
+    Returns dicts with team_id, name, score, leader_id, leader (a mention),
+    max_members, section and member_count, highest score first.
+    """
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT l.team_id, t.name, l.score, t.leader_id, t.max_members, s.name,
+                   (SELECT COUNT(*) FROM team_members m WHERE m.team_id = l.team_id)
+            FROM leaderboard l
+            JOIN teams t ON t.team_id = l.team_id
+            LEFT JOIN sections s ON s.section_id = t.section_id
+            WHERE l.event_id = ?
+            ORDER BY l.score DESC
+        ''', (event_id,))
+        return [
+            {
+                'team_id': row[0],
+                'name': row[1],
+                'score': int(row[2] or 0),
+                'leader_id': row[3],
+                'leader': f"<@{row[3]}>",
+                'max_members': row[4] or 0,
+                'section': row[5] or 'Unknown',
+                'member_count': int(row[6] or 0),
+            }
+            for row in c.fetchall()
+        ]
+
 # Server stats helpers
 def set_server_stat(guild_id, stat_name, value):
     with get_db() as conn:
         c = conn.cursor()
         c.execute('''
-            INSERT INTO server_stats (guild_id, stat_name, value) VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE value = VALUES(value)
+            INSERT INTO server_stats (guild_id, stat_name, value) VALUES (?, ?, ?)
+            ON CONFLICT(guild_id, stat_name) DO UPDATE SET value = excluded.value
         ''', (guild_id, stat_name, value))
         conn.commit()
 
 def get_server_stat(guild_id, stat_name):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT value FROM server_stats WHERE guild_id = %s AND stat_name = %s''', (guild_id, stat_name))
+        c.execute('''SELECT value FROM server_stats WHERE guild_id = ? AND stat_name = ?''', (guild_id, stat_name))
         row = c.fetchone()
         return row[0] if row else 0
 
 def get_team_info(team_id):
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('''SELECT name, leader_id, max_members, emoji FROM teams WHERE team_id = %s''', (team_id,))
+        c.execute('''SELECT name, leader_id, max_members, emoji FROM teams WHERE team_id = ?''', (team_id,))
         row = c.fetchone()
         if not row:
             return None
@@ -636,24 +861,15 @@ def get_team_info(team_id):
 def get_bot_config(key, default=None):
     with get_db() as conn:
         c = conn.cursor()
-        if USE_MYSQL:
-            c.execute("SELECT config_value FROM bot_config WHERE config_key = %s", (key,))
-        else:
-            c.execute("SELECT config_value FROM bot_config WHERE config_key = ?", (key,))
+        c.execute("SELECT config_value FROM bot_config WHERE config_key = ?", (key,))
         row = c.fetchone()
         return row[0] if row else default
 
 def set_bot_config(key, value):
     with get_db() as conn:
         c = conn.cursor()
-        if USE_MYSQL:
-            c.execute(
-                "REPLACE INTO bot_config (config_key, config_value) VALUES (%s, %s)",
-                (key, value)
-            )
-        else:
-            c.execute(
-                "INSERT OR REPLACE INTO bot_config (config_key, config_value) VALUES (?, ?)",
-                (key, value)
-            )
-        conn.commit() 
\ No newline at end of file
+        c.execute(
+            "INSERT OR REPLACE INTO bot_config (config_key, config_value) VALUES (?, ?)",
+            (key, value)
+        )
+        conn.commit()
@@ -0,0 +1,93 @@
+# database_async.py - awaitable versions of the helpers in database.py
+#
+# Every helper runs on a dedicated thread pool so a slow query never blocks the
+# discord.py event loop. Cogs should await these instead of calling database.* directly.
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+# One worker per pooled connection: excess calls queue here instead of blocking on the pool
+_executor = ThreadPoolExecutor(max_workers=database.POOL_SIZE, thread_name_prefix='db')
+
+async def run(func, *args, **kwargs):
+    """Run a blocking database function on the database executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+def shutdown():
+    """Wait for in-flight queries to finish and stop the executor."""
+    _executor.shutdown(wait=True)
+
+def _wrap(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+    return wrapper
+
+init_backend = _wrap(database.init_backend)
+setup_db = _wrap(database.setup_db)
+
+# Channels and bot configuration
+set_channel = _wrap(database.set_channel)
+get_channel = _wrap(database.get_channel)
+get_all_channels = _wrap(database.get_all_channels)
+get_bot_config = _wrap(database.get_bot_config)
+set_bot_config = _wrap(database.set_bot_config)
+
+# Embed registry
+get_embeds = _wrap(database.get_embeds)
+set_embed = _wrap(database.set_embed)
+delete_embed = _wrap(database.delete_embed)
+
+# Usage and server stats
+log_user_command = _wrap(database.log_user_command)
+increment_server_stat = _wrap(database.increment_server_stat)
+get_user_stats = _wrap(database.get_user_stats)
+get_server_stats = _wrap(database.get_server_stats)
+get_top_users = _wrap(database.get_top_users)
+set_server_stat = _wrap(database.set_server_stat)
+get_server_stat = _wrap(database.get_server_stat)
+set_user_stats = _wrap(database.set_user_stats)
+fetch_user_stats = _wrap(database.fetch_user_stats)
+
+# Participation and team stats
+log_user_participation = _wrap(database.log_user_participation)
+get_user_event_participation = _wrap(database.get_user_event_participation)
+log_team_stats = _wrap(database.log_team_stats)
+get_team_stats = _wrap(database.get_team_stats)
+get_team_members = _wrap(database.get_team_members)
+get_user_event_rank = _wrap(database.get_user_event_rank)
+
+# Events, sections and teams
+add_event = _wrap(database.add_event)
+get_event = _wrap(database.get_event)
+list_events = _wrap(database.list_events)
+remove_event = _wrap(database.remove_event)
+delete_event_cascade = _wrap(database.delete_event_cascade)
+load_tournament_rows = _wrap(database.load_tournament_rows)
+add_section = _wrap(database.add_section)
+get_sections = _wrap(database.get_sections)
+remove_section = _wrap(database.remove_section)
+add_team = _wrap(database.add_team)
+get_teams = _wrap(database.get_teams)
+get_team_info = _wrap(database.get_team_info)
+remove_team = _wrap(database.remove_team)
+add_team_member = _wrap(database.add_team_member)
+apply_membership_changes = _wrap(database.apply_membership_changes)
+get_team_members_by_id = _wrap(database.get_team_members_by_id)
+remove_team_member = _wrap(database.remove_team_member)
+
+# Leaderboard
+set_leaderboard_score = _wrap(database.set_leaderboard_score)
+add_leaderboard_score = _wrap(database.add_leaderboard_score)
+add_leaderboard_scores = _wrap(database.add_leaderboard_scores)
+import_leaderboard_scores = _wrap(database.import_leaderboard_scores)
+get_event_team_ids = _wrap(database.get_event_team_ids)
+get_leaderboard = _wrap(database.get_leaderboard)
+get_leaderboard_view = _wrap(database.get_leaderboard_view)
+get_score_history = _wrap(database.get_score_history)
+get_scores_at = _wrap(database.get_scores_at)
+reset_event_scores = _wrap(database.reset_event_scores)
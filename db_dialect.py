@@ -0,0 +1,93 @@
+# db_dialect.py - one canonical SQL statement, compiled per backend
+#
+# Queries are written once in the canonical (SQLite) form: ``?`` placeholders,
+# ``INSERT OR REPLACE`` / ``INSERT OR IGNORE`` and ``ON CONFLICT(...) DO UPDATE SET``
+# upserts with ``excluded.col``. compile_sql() rewrites them for MySQL and caches
+# the result, so each distinct statement is translated once per process and the
+# driver sees the same string every call (which keeps sqlite3's statement cache hot).
+
+import re
+import sqlite3
+from functools import lru_cache
+
+SQLITE = 'sqlite'
+MYSQL = 'mysql'
+
+_REWRITES = (
+    (re.compile(r'\bINSERT\s+OR\s+REPLACE\s+INTO\b', re.IGNORECASE), 'REPLACE INTO'),
+    (re.compile(r'\bINSERT\s+OR\s+IGNORE\s+INTO\b', re.IGNORECASE), 'INSERT IGNORE INTO'),
+    (re.compile(r'\bON\s+CONFLICT\s*\([^)]*\)\s*DO\s+UPDATE\s+SET\b', re.IGNORECASE), 'ON DUPLICATE KEY UPDATE'),
+    (re.compile(r'\bexcluded\.(`?\w+`?)', re.IGNORECASE), r'VALUES(\1)'),
+)
+
+
+@lru_cache(maxsize=512)
+def compile_sql(sql, dialect):
+    """Return the canonical statement ``sql`` rewritten for ``dialect``.
+
+    Canonical statements must not contain a literal ``?`` or ``%``; pass values as parameters.
+    """
+    if dialect == SQLITE:
+        return sql
+    sql = sql.replace('?', '%s')
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def to_mysql(sql):
+    """Translate a canonical statement into MySQL syntax."""
+    return compile_sql(sql, MYSQL)
+
+
+def dialect_of(conn):
+    """Work out which dialect a (possibly proxied) connection speaks."""
+    dialect = getattr(conn, 'dialect', None)
+    if dialect:
+        return dialect
+    return SQLITE if isinstance(conn, sqlite3.Connection) else MYSQL
+
+
+class DialectCursor:
+    """Cursor proxy that compiles canonical statements before running them."""
+
+    def __init__(self, cursor, dialect):
+        self._cursor = cursor
+        self.dialect = dialect
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(compile_sql(sql, self.dialect), tuple(params))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(compile_sql(sql, self.dialect), [tuple(params) for params in seq_of_params])
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class DialectConnection:
+    """Connection proxy handed out by database.get_db(); its cursors accept canonical SQL."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.dialect = dialect_of(conn)
+
+    def cursor(self):
+        return DialectCursor(self._conn.cursor(), self.dialect)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
@@ -0,0 +1,478 @@
+# db_failover.py - MySQL -> SQLite failover with a write-ahead journal and automatic recovery
+
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+from db_dialect import SQLITE, to_mysql
+
+# Errors that mean "MySQL is unreachable" rather than "this statement is bad"
+CONNECTION_ERRORS = (mysql.connector.errors.InterfaceError, mysql.connector.errors.OperationalError)
+
+_WRITE_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def retry_with_backoff(func, attempts=3, base_delay=0.1, max_delay=2.0):
+    """Call ``func`` up to ``attempts`` times, sleeping with jittered exponential backoff between tries."""
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def _is_write(sql):
+    return sql.lstrip().upper().startswith(_WRITE_KEYWORDS)
+
+
+class CircuitBreaker:
+    """Tracks consecutive primary failures.
+
+    closed: requests go to the primary. open: requests go to the fallback while
+    a background probe waits for the primary. half_open: the primary answers and
+    the journal is being replayed; requests still go to the fallback.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=1):
+        self.failure_threshold = failure_threshold
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def allow_request(self):
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        """Count a failure; returns True if this one opened the breaker."""
+        self.failures += 1
+        if self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self.trip()
+            return True
+        return False
+
+    def trip(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def half_open(self):
+        self.state = self.HALF_OPEN
+
+    def close(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+
+class WriteJournal:
+    """Durable, ordered log of writes made against the SQLite fallback.
+
+    Entries are stored in the fallback database itself and inserted in the same
+    transaction as the write they describe, so a write and its journal entry
+    commit or roll back together.
+    """
+    TABLE = 'failover_journal'
+
+    def ensure(self, conn):
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                statement TEXT NOT NULL,
+                params TEXT NOT NULL,
+                row_id INTEGER,
+                created_at REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+
+    def append(self, conn, entries):
+        now = time.time()
+        conn.executemany(
+            f"INSERT INTO {self.TABLE} (statement, params, row_id, created_at) VALUES (?, ?, ?, ?)",
+            [(sql, json.dumps(list(params)), row_id, now) for sql, params, row_id in entries]
+        )
+
+    def read_batch(self, conn, limit=200):
+        rows = conn.execute(
+            f"SELECT seq, statement, params, row_id FROM {self.TABLE} ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+        return [(row[0], row[1], json.loads(row[2]), row[3]) for row in rows]
+
+    def delete(self, conn, seqs):
+        conn.executemany(f"DELETE FROM {self.TABLE} WHERE seq = ?", [(seq,) for seq in seqs])
+        conn.commit()
+
+    def count(self, conn):
+        return conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+
+class ReplayLog:
+    """Journal seqs already applied to MySQL, kept in MySQL itself.
+
+    Each replayed batch records its seqs in the same MySQL transaction as its
+    statements. If the bot stops after that commit but before the entries are
+    deleted from the journal, the next replay skips them instead of applying
+    non-idempotent writes such as ``score = score + ?`` twice.
+    """
+    TABLE = 'failover_replayed'
+
+    def ensure(self, cursor):
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} (seq BIGINT PRIMARY KEY, replayed_at DOUBLE NOT NULL)")
+
+    def applied(self, cursor, seqs):
+        cursor.execute(f"SELECT seq FROM {self.TABLE} WHERE seq IN ({', '.join(['%s'] * len(seqs))})", tuple(seqs))
+        return {int(row[0]) for row in cursor.fetchall()}
+
+    def record(self, cursor, seqs):
+        now = time.time()
+        cursor.executemany(f"INSERT INTO {self.TABLE} (seq, replayed_at) VALUES (%s, %s)", [(seq, now) for seq in seqs])
+
+    def forget(self, cursor, up_to):
+        """Drop records for entries that are gone from the journal; seqs are never reused."""
+        cursor.execute(f"DELETE FROM {self.TABLE} WHERE seq <= %s", (up_to,))
+
+
+class JournalingCursor:
+    """Cursor proxy that remembers every write it executes."""
+
+    def __init__(self, cursor, pending):
+        self._cursor = cursor
+        self._pending = pending
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(sql, params)
+        if _is_write(sql):
+            self._pending.append((sql, tuple(params), self._cursor.lastrowid))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = [tuple(params) for params in seq_of_params]
+        self._cursor.executemany(sql, seq_of_params)
+        if _is_write(sql):
+            # lastrowid is only meaningful for single-row statements
+            self._pending.extend((sql, params, None) for params in seq_of_params)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class JournalingConnection:
+    """SQLite connection proxy that journals committed writes for later replay on MySQL."""
+    dialect = SQLITE
+
+    def __init__(self, conn, journal):
+        self._conn = conn
+        self._journal = journal
+        self._pending = []
+        self.journaled = False
+
+    def cursor(self):
+        return JournalingCursor(self._conn.cursor(), self._pending)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        if self._pending:
+            self._journal.append(self._conn, self._pending)
+            self._pending.clear()
+            self.journaled = True
+        self._conn.commit()
+
+    def rollback(self):
+        self._pending.clear()
+        self._conn.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class FailoverManager:
+    """Serves connections from the MySQL pool, failing over to the SQLite pool.
+
+    While MySQL is unavailable, writes go to SQLite through a journaling proxy.
+    A background thread probes MySQL with backoff, replays the journal in order
+    and only then switches traffic back, so the two stores never diverge.
+    """
+
+    def __init__(self, primary, fallback, prepare_fallback, id_columns=None, on_switch=None,
+                 retry_attempts=3, failure_threshold=1, probe_interval=10.0, max_probe_interval=60.0,
+                 id_reserve_gap=100000):
+        self.primary = primary
+        self.fallback = fallback
+        self.prepare_fallback = prepare_fallback
+        # table -> auto-increment primary key column, so replayed inserts keep their ids
+        self.id_columns = id_columns or {}
+        self.on_switch = on_switch
+        self.retry_attempts = retry_attempts
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.id_reserve_gap = id_reserve_gap
+        self.breaker = CircuitBreaker(failure_threshold)
+        self.journal = WriteJournal()
+        self.replay_log = ReplayLog()
+        self.high_water = {}
+        self._lock = threading.Lock()
+        self._fallback_in_use = 0
+        self._fallback_ready = False
+        self._probe_thread = None
+        self._stop = threading.Event()
+        self.stats = {'failovers': 0, 'recoveries': 0, 'replayed': 0, 'dropped': 0}
+
+    def start(self):
+        """Record id high-water marks and resume replaying a journal left by a previous run."""
+        try:
+            self.refresh_high_water()
+        except Exception as e:
+            print(f"Could not read MySQL id high-water marks: {e}")
+        if self._journal_depth():
+            print("Found unreplayed failover journal; serving from SQLite until it is replayed")
+            with self._lock:
+                self.breaker.trip()
+            self._switch(False)
+            self._start_probe(immediate=True)
+
+    def stop(self):
+        self._stop.set()
+
+    @contextmanager
+    def connection(self):
+        # Decide and count under one lock so recovery never switches back while
+        # a request is about to write to the fallback
+        with self._lock:
+            use_primary = self.breaker.allow_request()
+            if not use_primary:
+                self._fallback_in_use += 1
+        if use_primary:
+            try:
+                conn = retry_with_backoff(self.primary.acquire, attempts=self.retry_attempts)
+            except Exception as e:
+                print(f"MySQL connection failed: {e}")
+                with self._lock:
+                    self._fallback_in_use += 1
+                self._record_failure()
+            else:
+                with self._lock:
+                    self.breaker.record_success()
+                discard = False
+                try:
+                    yield conn
+                except CONNECTION_ERRORS:
+                    discard = True
+                    self._record_failure()
+                    raise
+                finally:
+                    self.primary.release(conn, discard=discard)
+                return
+
+        with self._fallback_connection() as conn:
+            yield conn
+
+    def refresh_high_water(self):
+        conn = self.primary.acquire()
+        try:
+            c = conn.cursor()
+            for table, column in self.id_columns.items():
+                try:
+                    c.execute(f"SELECT MAX({column}) FROM {table}")
+                    row = c.fetchone()
+                    self.high_water[table] = int(row[0] or 0)
+                except mysql.connector.Error:
+                    pass
+        finally:
+            self.primary.release(conn)
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.stats)
+            data['state'] = self.breaker.state
+            data['failures'] = self.breaker.failures
+        try:
+            data['journal'] = self._journal_depth()
+        except Exception:
+            data['journal'] = None
+        return data
+
+    @contextmanager
+    def _fallback_connection(self):
+        """Yield a journaling SQLite connection; the caller has already counted it in use."""
+        raw = None
+        conn = None
+        try:
+            raw = self.fallback.acquire()
+            self._ensure_fallback(raw)
+            conn = JournalingConnection(raw, self.journal)
+            yield conn
+        finally:
+            if raw is not None:
+                self.fallback.release(raw)
+            with self._lock:
+                self._fallback_in_use -= 1
+                closed = self.breaker.allow_request()
+            if conn is not None and conn.journaled and closed:
+                # A one-off fallback below the failure threshold still has to be replayed
+                self._start_probe(immediate=True)
+
+    def _ensure_fallback(self, raw):
+        if self._fallback_ready:
+            return
+        self.prepare_fallback(raw)
+        self.journal.ensure(raw)
+        self._fallback_ready = True
+
+    def _journal_depth(self):
+        raw = self.fallback.acquire()
+        try:
+            self._ensure_fallback(raw)
+            return self.journal.count(raw)
+        finally:
+            self.fallback.release(raw)
+
+    def _record_failure(self):
+        with self._lock:
+            opened = self.breaker.record_failure()
+            if opened:
+                self.stats['failovers'] += 1
+        if opened:
+            print("MySQL unavailable; serving from SQLite and journaling writes until it recovers")
+            self._switch(False)
+            try:
+                self._reserve_ids()
+            except Exception as e:
+                print(f"Could not reserve SQLite ids for failover: {e}")
+            self._start_probe()
+
+    def _reserve_ids(self):
+        """Move SQLite auto-increment counters past MySQL's so replayed ids don't collide."""
+        raw = self.fallback.acquire()
+        try:
+            self._ensure_fallback(raw)
+            for table, high_water in self.high_water.items():
+                floor = high_water + self.id_reserve_gap
+                cur = raw.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (floor, table))
+                if cur.rowcount == 0:
+                    raw.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, floor))
+            raw.commit()
+        finally:
+            self.fallback.release(raw)
+
+    def _switch(self, primary_active):
+        if self.on_switch:
+            self.on_switch(primary_active)
+
+    def _start_probe(self, immediate=False):
+        with self._lock:
+            if self._probe_thread and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(
+                target=self._probe_loop, args=(immediate,), name='db-failover-probe', daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_loop(self, immediate):
+        delay = 0 if immediate else self.probe_interval
+        while not self._stop.wait(delay):
+            try:
+                if self._recover():
+                    return
+                # MySQL is back; just waiting for in-flight fallback writes to drain
+                delay = min(1.0, self.probe_interval)
+            except Exception as e:
+                print(f"MySQL recovery probe failed: {e}")
+                delay = min(max(delay, self.probe_interval) * 2, self.max_probe_interval)
+
+    def _recover(self):
+        """Replay the journal into MySQL; returns True once traffic is switched back."""
+        conn = self.primary.acquire()
+        try:
+            with self._lock:
+                self.breaker.half_open()
+            self._replay(conn)
+        finally:
+            self.primary.release(conn)
+        with self._lock:
+            # Only switch once no fallback connection can still add journal entries
+            if self._fallback_in_use or self._journal_depth():
+                return False
+            self.breaker.close()
+            self.stats['recoveries'] += 1
+        self._switch(True)
+        print("MySQL recovered; journal replayed and traffic switched back")
+        try:
+            self.refresh_high_water()
+        except Exception:
+            pass
+        return True
+
+    def _replay(self, mysql_conn):
+        # DDL commits implicitly on MySQL, so create the log before any batch starts
+        self.replay_log.ensure(mysql_conn.cursor())
+        while True:
+            raw = self.fallback.acquire()
+            try:
+                batch = self.journal.read_batch(raw)
+            finally:
+                self.fallback.release(raw)
+            if not batch:
+                return
+            c = mysql_conn.cursor()
+            applied = self.replay_log.applied(c, [entry[0] for entry in batch])
+            for seq, sql, params, row_id in batch:
+                if seq in applied:
+                    continue  # Committed by a replay that stopped before clearing the journal
+                statement, args = self._for_primary(sql, params, row_id)
+                try:
+                    c.execute(statement, args)
+                except CONNECTION_ERRORS:
+                    raise
+                except mysql.connector.errors.IntegrityError:
+                    # The row is already on MySQL, e.g. written there before the outage
+                    pass
+                except mysql.connector.Error as e:
+                    print(f"Dropping journal entry {seq} that MySQL rejected: {e}")
+                    self.stats['dropped'] += 1
+            fresh = [entry[0] for entry in batch if entry[0] not in applied]
+            if fresh:
+                self.replay_log.record(c, fresh)
+            mysql_conn.commit()
+            raw = self.fallback.acquire()
+            try:
+                self.journal.delete(raw, [entry[0] for entry in batch])
+            finally:
+                self.fallback.release(raw)
+            self.replay_log.forget(c, batch[-1][0])
+            mysql_conn.commit()
+            self.stats['replayed'] += len(batch)
+
+    def _for_primary(self, sql, params, row_id):
+        statement = to_mysql(sql)
+        args = list(params)
+        match = re.match(r'\s*INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES\s*\(', statement, re.IGNORECASE)
+        if match and row_id is not None:
+            table, columns = match.group(1), match.group(2)
+            id_column = self.id_columns.get(table)
+            if id_column and id_column not in [col.strip() for col in columns.split(',')]:
+                # Keep the id SQLite handed out; later journal entries reference it
+                statement = (
+                    statement[:match.start(2)] + f"{id_column}, " + statement[match.start(2):match.end()]
+                    + "%s, " + statement[match.end():]
+                )
+                args.insert(0, row_id)
+        return statement, tuple(args)
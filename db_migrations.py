@@ -0,0 +1,508 @@
+# db_migrations.py - versioned schema migrations for MySQL and SQLite
+#
+# Each migration runs once per database and is recorded in schema_version.
+# To change the schema, append a new function to MIGRATIONS; never edit one
+# that has already shipped.
+
+import time
+
+from db_dialect import DialectConnection, MYSQL
+
+VERSION_TABLE = 'schema_version'
+
+
+def _columns(c, dialect, table):
+    if dialect == MYSQL:
+        c.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = ?",
+            (table,)
+        )
+        return {row[0].lower() for row in c.fetchall()}
+    c.execute(f"PRAGMA table_info({table})")
+    return {row[1].lower() for row in c.fetchall()}
+
+
+def _index_exists(c, dialect, table, name):
+    if dialect == MYSQL:
+        c.execute(
+            "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = ? AND index_name = ?",
+            (table, name)
+        )
+    else:
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND name = ?", (table, name))
+    return c.fetchone() is not None
+
+
+def add_column(c, dialect, table, column, definition):
+    """Add ``column`` to ``table`` unless it is already there."""
+    if column.lower() not in _columns(c, dialect, table):
+        c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def create_index(c, dialect, table, name, columns):
+    """Create index ``name`` on ``table(columns)`` unless it is already there.
+
+    MySQL has no CREATE INDEX IF NOT EXISTS and commits DDL implicitly, so a
+    half-applied migration is re-run safely by checking first.
+    """
+    if not _index_exists(c, dialect, table, name):
+        c.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+
+def _baseline(c, dialect):
+    """The tables as they existed before migrations were introduced."""
+    if dialect == MYSQL:
+        # MySQL table creation
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS channel_config (
+                guild_id BIGINT PRIMARY KEY,
+                mod_channel BIGINT,
+                event_channel BIGINT,
+                team_channel BIGINT,
+                log_channel BIGINT
+            )
+        ''')
+        # Bot configuration table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS bot_config (
+                config_key VARCHAR(64) PRIMARY KEY,
+                config_value TEXT
+            )
+        ''')
+        # User usage
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_usage (
+                guild_id BIGINT,
+                user_id BIGINT,
+                command VARCHAR(64),
+                count INT DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id, command)
+            )
+        ''')
+        # Server usage
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS server_usage (
+                guild_id BIGINT PRIMARY KEY,
+                events_created INT DEFAULT 0,
+                teams_created INT DEFAULT 0,
+                members_joined INT DEFAULT 0
+            )
+        ''')
+        # User participation in events/teams
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_event_participation (
+                guild_id BIGINT,
+                event_id BIGINT,
+                user_id BIGINT,
+                team_name VARCHAR(255),
+                PRIMARY KEY (guild_id, event_id, user_id)
+            )
+        ''')
+        # Team stats per event
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS team_event_stats (
+                guild_id BIGINT,
+                event_id BIGINT,
+                team_name VARCHAR(255),
+                score INT DEFAULT 0,
+                `rank` INT DEFAULT NULL,
+                PRIMARY KEY (guild_id, event_id, team_name)
+            )
+        ''')
+        # Events table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                guild_id BIGINT,
+                name VARCHAR(255),
+                max_sections INT
+            )
+        ''')
+        # Sections table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sections (
+                section_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                event_id BIGINT,
+                name VARCHAR(255),
+                max_teams INT
+            )
+        ''')
+        # Teams table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS teams (
+                team_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                section_id BIGINT,
+                name VARCHAR(255),
+                leader_id BIGINT,
+                max_members INT,
+                emoji VARCHAR(32)
+            )
+        ''')
+        # Team members table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS team_members (
+                team_id BIGINT,
+                user_id BIGINT,
+                PRIMARY KEY (team_id, user_id)
+            )
+        ''')
+        # Channels table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS channels (
+                guild_id BIGINT,
+                channel_type VARCHAR(32),
+                channel_id BIGINT,
+                PRIMARY KEY (guild_id, channel_type)
+            )
+        ''')
+        # User stats table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id BIGINT,
+                guild_id BIGINT,
+                events_participated INT DEFAULT 0,
+                `rank` INT DEFAULT 0,
+                team_id BIGINT,
+                PRIMARY KEY (user_id, guild_id)
+            )
+        ''')
+        # Leaderboard table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS leaderboard (
+                event_id BIGINT,
+                team_id BIGINT,
+                score INT DEFAULT 0,
+                PRIMARY KEY (event_id, team_id)
+            )
+        ''')
+        # Server stats table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS server_stats (
+                guild_id BIGINT,
+                stat_name VARCHAR(64),
+                value INT DEFAULT 0,
+                PRIMARY KEY (guild_id, stat_name)
+            )
+        ''')
+    else:
+        # SQLite table creation
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS channel_config (
+                guild_id INTEGER PRIMARY KEY,
+                mod_channel INTEGER,
+                event_channel INTEGER,
+                team_channel INTEGER,
+                log_channel INTEGER
+            )
+        ''')
+        # Bot configuration table
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS bot_config (
+                config_key TEXT PRIMARY KEY,
+                config_value TEXT
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_usage (
+                guild_id INTEGER,
+                user_id INTEGER,
+                command TEXT,
+                count INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id, command)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS server_usage (
+                guild_id INTEGER PRIMARY KEY,
+                events_created INTEGER DEFAULT 0,
+                teams_created INTEGER DEFAULT 0,
+                members_joined INTEGER DEFAULT 0
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_event_participation (
+                guild_id INTEGER,
+                event_id INTEGER,
+                user_id INTEGER,
+                team_name TEXT,
+                PRIMARY KEY (guild_id, event_id, user_id)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS team_event_stats (
+                guild_id INTEGER,
+                event_id INTEGER,
+                team_name TEXT,
+                score INTEGER DEFAULT 0,
+                rank INTEGER DEFAULT NULL,
+                PRIMARY KEY (guild_id, event_id, team_name)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                name TEXT,
+                max_sections INTEGER
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sections (
+                section_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER,
+                name TEXT,
+                max_teams INTEGER
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS teams (
+                team_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                section_id INTEGER,
+                name TEXT,
+                leader_id INTEGER,
+                max_members INTEGER,
+                emoji TEXT
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS team_members (
+                team_id INTEGER,
+                user_id INTEGER,
+                PRIMARY KEY (team_id, user_id)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS channels (
+                guild_id INTEGER,
+                channel_type TEXT,
+                channel_id INTEGER,
+                PRIMARY KEY (guild_id, channel_type)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id INTEGER,
+                guild_id INTEGER,
+                events_participated INTEGER DEFAULT 0,
+                rank INTEGER DEFAULT 0,
+                team_id INTEGER,
+                PRIMARY KEY (user_id, guild_id)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS leaderboard (
+                event_id INTEGER,
+                team_id INTEGER,
+                score INTEGER DEFAULT 0,
+                PRIMARY KEY (event_id, team_id)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS server_stats (
+                guild_id INTEGER,
+                stat_name TEXT,
+                value INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, stat_name)
+            )
+        ''')
+
+
+def _definitions(c, dialect):
+    """Definitions table, previously created ad hoc by the definition cog."""
+    if dialect == MYSQL:
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS definitions (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                title VARCHAR(255) NOT NULL,
+                author VARCHAR(255) NOT NULL,
+                author_id VARCHAR(32) NOT NULL,
+                definition TEXT NOT NULL,
+                reference VARCHAR(255) DEFAULT NULL
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        ''')
+        add_column(c, dialect, 'definitions', 'reference', 'VARCHAR(255) DEFAULT NULL')
+    else:
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS definitions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                author TEXT NOT NULL,
+                author_id TEXT NOT NULL,
+                definition TEXT NOT NULL,
+                reference TEXT DEFAULT NULL
+            )
+        ''')
+        add_column(c, dialect, 'definitions', 'reference', 'TEXT DEFAULT NULL')
+
+
+def _tournament_indexes(c, dialect):
+    """Secondary indexes for the lookups the cogs run on every command.
+
+    team_members needs none: its (team_id, user_id) primary key already serves
+    lookups by team_id.
+    """
+    create_index(c, dialect, 'events', 'idx_events_guild', ['guild_id'])
+    create_index(c, dialect, 'sections', 'idx_sections_event', ['event_id'])
+    create_index(c, dialect, 'teams', 'idx_teams_section', ['section_id'])
+    # Covering: WHERE event_id = ? ORDER BY score DESC reads no table rows
+    create_index(c, dialect, 'leaderboard', 'idx_leaderboard_event_score', ['event_id', 'score', 'team_id'])
+    # Event-wide reads/deletes and team rosters; the primary key leads with guild_id
+    create_index(c, dialect, 'user_event_participation', 'idx_participation_event_team',
+                 ['event_id', 'team_name', 'guild_id', 'user_id'])
+    create_index(c, dialect, 'team_event_stats', 'idx_team_stats_event', ['event_id', 'team_name', 'score'])
+    # WHERE title = ? ORDER BY id
+    create_index(c, dialect, 'definitions', 'idx_definitions_title', ['title', 'id'])
+
+
+
+def _embed_registry(c, dialect):
+    """Where the bot's long-lived embeds live, so they survive restarts and cog reloads."""
+    if dialect == MYSQL:
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS embed_registry (
+                kind VARCHAR(32),
+                embed_key VARCHAR(255),
+                guild_id BIGINT,
+                channel_id BIGINT,
+                message_id BIGINT,
+                PRIMARY KEY (kind, embed_key)
+            )
+        ''')
+    else:
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS embed_registry (
+                kind TEXT,
+                embed_key TEXT,
+                guild_id INTEGER,
+                channel_id INTEGER,
+                message_id INTEGER,
+                PRIMARY KEY (kind, embed_key)
+            )
+        ''')
+
+
+def _score_history(c, dialect):
+    """Append-only score log plus periodic leaderboard snapshots.
+
+    Existing scores are logged as one 'import' entry per team so that replaying
+    the log reproduces the current leaderboard.
+    """
+    if dialect == MYSQL:
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS score_events (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                event_id INT NOT NULL,
+                team_id INT NOT NULL,
+                delta INT NOT NULL,
+                score INT NOT NULL,
+                kind VARCHAR(16) NOT NULL,
+                moderator_id BIGINT,
+                created_at DOUBLE NOT NULL
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS score_snapshots (
+                event_id INT,
+                event_log_id BIGINT,
+                team_id INT,
+                score INT NOT NULL,
+                taken_at DOUBLE NOT NULL,
+                PRIMARY KEY (event_id, event_log_id, team_id)
+            )
+        ''')
+    else:
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS score_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER NOT NULL,
+                team_id INTEGER NOT NULL,
+                delta INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                moderator_id INTEGER,
+                created_at REAL NOT NULL
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS score_snapshots (
+                event_id INTEGER,
+                event_log_id INTEGER,
+                team_id INTEGER,
+                score INTEGER NOT NULL,
+                taken_at REAL NOT NULL,
+                PRIMARY KEY (event_id, event_log_id, team_id)
+            )
+        ''')
+    create_index(c, dialect, 'score_events', 'idx_score_events_event', ['event_id', 'id'])
+    create_index(c, dialect, 'score_events', 'idx_score_events_team', ['event_id', 'team_id', 'id'])
+    c.execute("SELECT COUNT(*) FROM score_events")
+    if not c.fetchone()[0]:
+        c.execute(
+            "INSERT INTO score_events (event_id, team_id, delta, score, kind, created_at) "
+            "SELECT event_id, team_id, score, score, 'import', ? FROM leaderboard",
+            (time.time(),)
+        )
+
+
+# (version, migration); versions must increase and never be reused
+MIGRATIONS = [
+    (1, _baseline),
+    (2, _definitions),
+    (3, _tournament_indexes),
+    (4, _embed_registry),
+    (5, _score_history),
+]
+
+
+def current_version(conn):
+    """Highest migration applied to ``conn``'s database, or 0."""
+    if not isinstance(conn, DialectConnection):
+        conn = DialectConnection(conn)
+    c = conn.cursor()
+    _ensure_version_table(c, conn.dialect)
+    c.execute(f"SELECT MAX(version) FROM {VERSION_TABLE}")
+    row = c.fetchone()
+    return row[0] or 0
+
+
+def _ensure_version_table(c, dialect):
+    if dialect == MYSQL:
+        c.execute(f'''
+            CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                version INT PRIMARY KEY,
+                name VARCHAR(128),
+                applied_at DOUBLE
+            )
+        ''')
+    else:
+        c.execute(f'''
+            CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                version INTEGER PRIMARY KEY,
+                name TEXT,
+                applied_at REAL
+            )
+        ''')
+
+
+def migrate(conn):
+    """Apply every pending migration to ``conn`` in order and return the new version.
+
+    Accepts a connection from database.get_db() or a raw driver connection.
+    """
+    if not isinstance(conn, DialectConnection):
+        conn = DialectConnection(conn)
+    version = current_version(conn)
+    c = conn.cursor()
+    for target, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        migration(c, conn.dialect)
+        c.execute(
+            f"INSERT INTO {VERSION_TABLE} (version, name, applied_at) VALUES (?, ?, ?)",
+            (target, migration.__name__.lstrip('_'), time.time())
+        )
+        conn.commit()
+        print(f"Applied schema migration {target}: {migration.__name__.lstrip('_')}")
+        version = target
+    conn.commit()
+    return version
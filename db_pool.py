@@ -0,0 +1,219 @@
+# db_pool.py - bounded connection pool used behind database.get_db()
+
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class MySQLDriver:
+    """Opens and checks mysql-connector connections."""
+    name = 'mysql'
+
+    def __init__(self, config, connect_timeout=None):
+        self.config = config
+        # Bound each connect so an unreachable server fails over instead of
+        # holding a pool slot for the OS-level TCP timeout
+        self.connect_timeout = connect_timeout
+
+    def connect(self):
+        if self.connect_timeout is None or 'connection_timeout' in self.config:
+            return mysql.connector.connect(**self.config)
+        return mysql.connector.connect(**self.config, connection_timeout=max(1, int(self.connect_timeout)))
+
+    def is_alive(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def reset(self, conn):
+        # End any open transaction so the next user never sees a stale snapshot
+        conn.rollback()
+
+    def close(self, conn):
+        conn.close()
+
+
+class SQLiteDriver:
+    """Opens and checks sqlite3 connections to a database file."""
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        # Pooled connections may be handed to different threads over their lifetime
+        # Every statement comes through db_dialect as a fixed string, so a larger
+        # statement cache means each query is prepared once per connection
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def is_alive(self, conn):
+        try:
+            conn.execute('SELECT 1')
+            return True
+        except Exception:
+            return False
+
+    def reset(self, conn):
+        conn.rollback()
+
+    def close(self, conn):
+        conn.close()
+
+
+class ConnectionPool:
+    """Thread-safe pool that keeps up to ``max_size`` connections open.
+
+    Idle connections are reused most-recently-used first, checked with the
+    driver's health check when they have been idle longer than
+    ``health_check_interval`` and closed once idle longer than ``max_idle``.
+    """
+
+    def __init__(self, driver, max_size=5, max_idle=300.0, acquire_timeout=10.0, health_check_interval=30.0):
+        self.driver = driver
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self._idle = deque()  # (conn, last_used), oldest on the left
+        self._size = 0  # open connections, idle + in use
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'max_wait': 0.0,
+            'timeouts': 0,
+            'health_failures': 0,
+            'reaped': 0,
+        }
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.acquire_timeout
+        conn = None
+        last_used = 0.0
+        waited = False
+        stale = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout(f"{self.driver.name} pool is closed")
+                    stale.extend(self._reap_locked(time.monotonic()))
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(f"No {self.driver.name} connection available after {self.acquire_timeout}s")
+                    waited = True
+                    self._cond.wait(remaining)
+        finally:
+            self._close_all(stale)
+
+        if conn is not None and time.monotonic() - last_used > self.health_check_interval:
+            if not self.driver.is_alive(conn):
+                self._close_all([conn])
+                conn = None
+                with self._cond:
+                    self.stats['health_failures'] += 1
+
+        hit = conn is not None
+        if not hit:
+            try:
+                conn = self.driver.connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        wait = time.monotonic() - start
+        with self._cond:
+            self.stats['hits' if hit else 'misses'] += 1
+            if waited:
+                self.stats['waits'] += 1
+            self.stats['wait_time'] += wait
+            self.stats['max_wait'] = max(self.stats['max_wait'], wait)
+        return conn
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                self.driver.reset(conn)
+            except Exception:
+                discard = True
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            stale = self._reap_locked(time.monotonic())
+            self._cond.notify()
+        if conn is not None:
+            stale.append(conn)
+        self._close_all(stale)
+
+    def reap_idle(self):
+        """Close connections that have been idle longer than ``max_idle``."""
+        with self._cond:
+            stale = self._reap_locked(time.monotonic())
+        reaped = len(stale)
+        self._close_all(stale)
+        return reaped
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            stale = [conn for conn, _ in self._idle]
+            self._size -= len(stale)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(stale)
+
+    def snapshot(self):
+        """Counters plus current occupancy, for sizing the pool."""
+        with self._cond:
+            data = dict(self.stats)
+            data['size'] = self._size
+            data['idle'] = len(self._idle)
+            data['max_size'] = self.max_size
+        requests = data['hits'] + data['misses']
+        data['hit_rate'] = data['hits'] / requests if requests else 0.0
+        data['avg_wait'] = data['wait_time'] / requests if requests else 0.0
+        return data
+
+    def _reap_locked(self, now):
+        stale = []
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.popleft()
+            stale.append(conn)
+        self._size -= len(stale)
+        self.stats['reaped'] += len(stale)
+        return stale
+
+    def _close_all(self, conns):
+        while conns:
+            conn = conns.pop()
+            try:
+                self.driver.close(conn)
+            except Exception:
+                pass
@@ -0,0 +1,122 @@
+# db_writebehind.py - coalescing write-behind queue for team membership changes
+#
+# Joins and leaves update the in-memory event graph immediately and are queued
+# here; a background task writes them to team_members and user_event_participation
+# in one transaction per batch. Only the latest change per (team, user) is kept,
+# so a join followed by a leave in the same window costs nothing but the leave.
+
+import asyncio
+import os
+import time
+
+import database_async
+
+FLUSH_INTERVAL = float(os.getenv('DB_WRITE_FLUSH_INTERVAL', 2))
+FLUSH_BATCH_SIZE = int(os.getenv('DB_WRITE_BATCH_SIZE', 100))
+
+JOIN = 'join'
+LEAVE = 'leave'
+
+# Every open writer, so shutdown and reloads can drain them all
+_writers = set()
+
+
+class MembershipWriter:
+    """Queues team joins/leaves and persists them in coalesced batches.
+
+    Batches are flushed every ``flush_interval`` seconds, as soon as
+    ``batch_size`` changes are pending, and on close().
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, batch_size=FLUSH_BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # (team_id, user_id) -> (op, guild_id, event_id, team_name)
+        self._pending = {}
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = None
+        self.stats = {'queued': 0, 'coalesced': 0, 'written': 0, 'batches': 0, 'failures': 0, 'last_flush_ms': 0.0}
+        _writers.add(self)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def join(self, guild_id, event_id, team_id, team_name, user_id):
+        self._queue(JOIN, guild_id, event_id, team_id, team_name, user_id)
+
+    def leave(self, guild_id, event_id, team_id, team_name, user_id):
+        self._queue(LEAVE, guild_id, event_id, team_id, team_name, user_id)
+
+    def _queue(self, op, guild_id, event_id, team_id, team_name, user_id):
+        if team_id is None:
+            print(f"[MembershipWriter] Team '{team_name}' has no id; {op} for {user_id} not persisted")
+            return
+        key = (team_id, user_id)
+        if key in self._pending:
+            self.stats['coalesced'] += 1
+        self._pending[key] = (op, guild_id, event_id, team_name)
+        self.stats['queued'] += 1
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    async def flush(self):
+        """Write every pending change now; failed batches are requeued behind newer changes."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            joins, leaves = [], []
+            for (team_id, user_id), (op, guild_id, event_id, team_name) in batch.items():
+                row = (team_id, user_id, guild_id, event_id, team_name)
+                (joins if op == JOIN else leaves).append(row)
+            started = time.perf_counter()
+            try:
+                await database_async.apply_membership_changes(joins, leaves)
+            except Exception as e:
+                print(f"[MembershipWriter] Flush of {len(batch)} changes failed, will retry: {e}")
+                self.stats['failures'] += 1
+                # Anything queued meanwhile is newer and wins
+                batch.update(self._pending)
+                self._pending = batch
+                return
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['last_flush_ms'] = (time.perf_counter() - started) * 1000
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def close(self):
+        """Stop the background task and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        _writers.discard(self)
+
+
+async def flush_all():
+    """Persist pending changes from every writer, e.g. before reloading from the database."""
+    for writer in list(_writers):
+        await writer.flush()
+
+
+async def close_all():
+    for writer in list(_writers):
+        await writer.close()
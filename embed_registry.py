@@ -0,0 +1,113 @@
+# embed_registry.py - persistent record of the embeds the bot keeps editing
+#
+# Join, section, team-channel and leaderboard embeds are posted once and edited
+# for the rest of an event. Their message ids are kept in the embed_registry table
+# with an in-memory copy per kind, so a restart or cog reload picks up the same
+# messages instead of posting duplicates or losing track of them. publish() edits
+# them by id, without fetching the message first. Embeds posted while joining went
+# through emoji reactions lose the bot's reactions the first time they are
+# republished with buttons.
+
+import discord
+
+import database_async
+
+EVENT = 'event'
+SECTION = 'section'
+TEAM_CHANNEL = 'team_channel'
+LEADERBOARD = 'leaderboard'
+
+class EmbedRegistry:
+    """Message ids of one kind of embed, keyed like the dicts the cogs used before.
+
+    Reads are served from memory; set() and discard() write through to the database.
+    """
+
+    def __init__(self, kind, key_type=str):
+        self.kind = kind
+        self.key_type = key_type
+        # key -> (guild_id, channel_id, message_id)
+        self._entries = {}
+
+    async def load(self):
+        rows = await database_async.get_embeds(self.kind)
+        self._entries = {
+            self.key_type(key): (guild_id, channel_id, message_id)
+            for key, guild_id, channel_id, message_id in rows
+        }
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        return entry[2] if entry else default
+
+    def channel_id(self, key):
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def guild_id(self, key):
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def __getitem__(self, key):
+        return self._entries[key][2]
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def items(self):
+        """(key, message_id) pairs."""
+        return [(key, entry[2]) for key, entry in self._entries.items()]
+
+    async def set(self, key, guild_id, channel_id, message_id):
+        await database_async.set_embed(self.kind, key, guild_id, channel_id, message_id)
+        self._entries[key] = (guild_id, channel_id, message_id)
+
+    async def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            await database_async.delete_embed(self.kind, key)
+
+    async def publish(self, key, channel, embed, view=None):
+        """Show ``embed`` as ``key``'s message in ``channel`` and return the message.
+
+        A registered message is edited through a PartialMessage, so an update is a
+        single request. If the message was deleted, or is registered in a different
+        channel, the embed is posted again and the registry updated. ``view``
+        replaces the message's components; without it they are left as they are.
+        When components are set, any reactions the bot left on the message are removed.
+        """
+        content = {'embed': embed}
+        if view is not None:
+            content['view'] = view
+        message_id = self.get(key)
+        if message_id is not None and self.channel_id(key) in (None, channel.id):
+            message = channel.get_partial_message(message_id)
+            try:
+                edited = await message.edit(**content)
+            except discord.NotFound:
+                print(f"[EmbedRegistry] {self.kind} embed {key} is gone; posting it again")
+            else:
+                if view is not None:
+                    await self._remove_own_reactions(key, edited)
+                return edited
+        message = await channel.send(**content)
+        await self.set(key, channel.guild.id, channel.id, message.id)
+        return message
+
+    async def _remove_own_reactions(self, key, message):
+        # The edit response lists the message's reactions, so this costs no request
+        # once the old join reactions are gone
+        for reaction in message.reactions:
+            if not reaction.me:
+                continue
+            try:
+                await message.remove_reaction(reaction.emoji, message.guild.me)
+            except discord.HTTPException as e:
+                print(f"[EmbedRegistry] Could not remove {reaction.emoji} from {self.kind} embed {key}: {e}")
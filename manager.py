@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 import config
+import database_async
 import os
 from bot import MyBot
 
@@ -40,7 +41,9 @@ async def reload_cogs(bot, mode):
 class ManagerBot(MyBot):
     async def setup_hook(self):
         """Called when the bot is starting up."""
-        mode = config.get_mode()
+        # Resolve the database backend off the event loop before any cog queries it
+        await database_async.init_backend()
+        mode = await database_async.run(config.get_mode)
         await reload_cogs(self, mode)
     
     async def reload_cogs(self, mode):
@@ -0,0 +1,62 @@
+# ranking.py - incrementally maintained score ranking for one event's leaderboard
+
+from bisect import bisect_left, insort
+
+
+class EventRanking:
+    """Teams of one event ordered by score, highest first.
+
+    Entries are kept in a sorted list of (-score, team_id), so lookups are a
+    binary search and updates move a single entry instead of re-sorting. Ties
+    share a rank (1, 2, 2, 4) and are listed by team id.
+    """
+
+    def __init__(self, scores=()):
+        self._scores = {team_id: int(score) for team_id, score in scores}
+        self._order = sorted((-score, team_id) for team_id, score in self._scores.items())
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, team_id):
+        return team_id in self._scores
+
+    def set(self, team_id, score):
+        """Record ``score`` as the team's current score."""
+        score = int(score)
+        old = self._scores.get(team_id)
+        if old == score:
+            return
+        if old is not None:
+            del self._order[bisect_left(self._order, (-old, team_id))]
+        self._scores[team_id] = score
+        insort(self._order, (-score, team_id))
+
+    def remove(self, team_id):
+        old = self._scores.pop(team_id, None)
+        if old is not None:
+            del self._order[bisect_left(self._order, (-old, team_id))]
+
+    def score(self, team_id):
+        return self._scores.get(team_id)
+
+    def rank(self, team_id):
+        """1-based competition rank of the team, or None if it has no score."""
+        score = self._scores.get(team_id)
+        if score is None:
+            return None
+        # (-score,) sorts before every (-score, team_id), i.e. at the first team with this score
+        return bisect_left(self._order, (-score,)) + 1
+
+    def top(self, k=None, offset=0):
+        """[(team_id, score)] for the best ``k`` teams after skipping ``offset`` (all when k is None)."""
+        entries = self._order[offset:] if k is None else self._order[offset:offset + k]
+        return [(team_id, -neg_score) for neg_score, team_id in entries]
+
+    def neighbors(self, team_id, n=1):
+        """[(team_id, score)] for up to ``n`` teams either side of ``team_id``, including it."""
+        score = self._scores.get(team_id)
+        if score is None:
+            return []
+        i = bisect_left(self._order, (-score, team_id))
+        return [(tid, -neg_score) for neg_score, tid in self._order[max(0, i - n):i + n + 1]]
@@ -0,0 +1,88 @@
+# refresh_scheduler.py - debounced, coalescing re-render of Discord embeds
+#
+# Callers mark a key (e.g. an event id) dirty and return immediately. A background
+# task per key calls render(key) at most once per window; marks that arrive while a
+# render is pending are folded into it, and render always reads the latest state.
+
+import asyncio
+import os
+
+REFRESH_WINDOW = float(os.getenv('LEADERBOARD_REFRESH_WINDOW', 5))
+
+
+class RefreshScheduler:
+    """Calls ``render(key)`` at most once per ``window`` seconds for each dirty key."""
+
+    def __init__(self, render, window=REFRESH_WINDOW, name='refresh'):
+        self.render = render
+        self.window = window
+        self.name = name
+        self._tasks = {}
+        self._dirty = set()
+        self._last_render = {}
+        self.stats = {'requested': 0, 'coalesced': 0, 'rendered': 0, 'failed': 0}
+
+    def mark_dirty(self, key):
+        """Schedule a render of ``key``; a no-op if one is already pending."""
+        self.stats['requested'] += 1
+        if key in self._tasks:
+            self._dirty.add(key)
+            self.stats['coalesced'] += 1
+            return
+        self._tasks[key] = asyncio.create_task(self._run(key))
+
+    @property
+    def pending(self):
+        return len(self._tasks)
+
+    async def _run(self, key):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                last = self._last_render.get(key)
+                if last is not None:
+                    delay = last + self.window - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                # Anything marked from here on needs another render after this one
+                self._dirty.discard(key)
+                self._last_render[key] = loop.time()
+                try:
+                    await self.render(key)
+                    self.stats['rendered'] += 1
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    print(f"[{self.name}] Render of {key} failed: {e}")
+                if key not in self._dirty:
+                    break
+        finally:
+            # forget() may already have replaced this task with a new one for the key
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+
+    def forget(self, key):
+        """Cancel any pending render of ``key``, e.g. when its embed is deleted."""
+        task = self._tasks.pop(key, None)
+        if task:
+            task.cancel()
+        self._dirty.discard(key)
+        self._last_render.pop(key, None)
+
+    async def close(self):
+        """Cancel the pending renders, then render each of their keys once more.
+
+        Renders waiting out the window would otherwise never show the latest state.
+        """
+        pending = list(self._tasks.items())
+        self._tasks.clear()
+        self._dirty.clear()
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+        for key, _ in pending:
+            try:
+                await self.render(key)
+                self.stats['rendered'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f"[{self.name}] Final render of {key} failed: {e}")
@@ -0,0 +1,54 @@
+# test_db_dialect.py - canonical SQL compiled for each backend
+
+import sqlite3
+
+from db_dialect import MYSQL, SQLITE, DialectConnection, compile_sql, dialect_of
+
+
+def test_sqlite_statements_are_unchanged():
+    sql = "INSERT OR REPLACE INTO channels (guild_id, channel_type, channel_id) VALUES (?, ?, ?)"
+    assert compile_sql(sql, SQLITE) == sql
+
+
+def test_placeholders_become_format_markers():
+    assert compile_sql("SELECT * FROM teams WHERE team_id = ? AND name = ?", MYSQL) == \
+        "SELECT * FROM teams WHERE team_id = %s AND name = %s"
+
+
+def test_insert_or_replace_and_ignore():
+    assert compile_sql("INSERT OR REPLACE INTO t (a) VALUES (?)", MYSQL) == "REPLACE INTO t (a) VALUES (%s)"
+    assert compile_sql("insert or ignore into t (a) values (?)", MYSQL) == "INSERT IGNORE INTO t (a) values (%s)"
+
+
+def test_upsert_becomes_on_duplicate_key_update():
+    sql = '''
+        INSERT INTO leaderboard (event_id, team_id, score) VALUES (?, ?, ?)
+        ON CONFLICT(event_id, team_id) DO UPDATE SET score = score + excluded.score
+    '''
+    compiled = compile_sql(sql, MYSQL)
+    assert "ON DUPLICATE KEY UPDATE score = score + VALUES(score)" in compiled
+    assert "ON CONFLICT" not in compiled and "excluded" not in compiled
+    assert compiled.count('%s') == 3
+
+
+def test_excluded_keeps_backquoted_columns():
+    sql = "INSERT INTO user_stats (`rank`) VALUES (?) ON CONFLICT(user_id) DO UPDATE SET `rank` = excluded.`rank`"
+    assert compile_sql(sql, MYSQL).endswith("ON DUPLICATE KEY UPDATE `rank` = VALUES(`rank`)")
+
+
+def test_compiled_statements_are_cached():
+    sql = "SELECT score FROM leaderboard WHERE event_id = ?"
+    assert compile_sql(sql, MYSQL) is compile_sql(sql, MYSQL)
+
+
+def test_dialect_connection_runs_canonical_sql_on_sqlite():
+    raw = sqlite3.connect(':memory:')
+    conn = DialectConnection(raw)
+    assert dialect_of(raw) == SQLITE
+    c = conn.cursor()
+    c.execute("CREATE TABLE scores (team_id INTEGER PRIMARY KEY, score INTEGER)")
+    upsert = "INSERT INTO scores (team_id, score) VALUES (?, ?) ON CONFLICT(team_id) DO UPDATE SET score = score + excluded.score"
+    c.executemany(upsert, [(1, 5), (1, 3), (2, 4)])
+    c.execute("SELECT team_id, score FROM scores ORDER BY team_id")
+    assert c.fetchall() == [(1, 8), (2, 4)]
+    raw.close()
@@ -0,0 +1,195 @@
+# test_db_failover.py - journaling, id reservation and replay against a fake MySQL
+#
+# The primary is a SQLite file behind a driver that speaks MySQL's %s placeholders
+# and can be switched off, so the whole failover path runs without a MySQL server.
+
+import sqlite3
+
+import pytest
+
+from db_failover import FailoverManager
+from db_pool import ConnectionPool, SQLiteDriver
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS teams (team_id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, n INTEGER NOT NULL);
+'''
+
+
+class FakeMySQLCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(sql.replace('%s', '?'), tuple(params))
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(sql.replace('%s', '?'), [tuple(params) for params in seq_of_params])
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class FakeMySQLConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return FakeMySQLCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class FakeMySQLDriver:
+    """Stands in for MySQLDriver; connect() fails while ``down`` is set."""
+    name = 'mysql'
+
+    def __init__(self, path):
+        self.path = path
+        self.down = False
+
+    def connect(self):
+        if self.down:
+            raise ConnectionError("MySQL is down")
+        return FakeMySQLConnection(sqlite3.connect(self.path, check_same_thread=False))
+
+    def is_alive(self, conn):
+        return not self.down
+
+    def reset(self, conn):
+        conn.rollback()
+
+    def close(self, conn):
+        conn.close()
+
+
+def _prepare(raw):
+    raw.executescript(SCHEMA)
+
+
+@pytest.fixture
+def failover(tmp_path):
+    primary_path = str(tmp_path / 'primary.sqlite3')
+    with sqlite3.connect(primary_path) as conn:
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO teams (team_id, name) VALUES (7, 'Existing')")
+        conn.execute("INSERT INTO counters (name, n) VALUES ('joins', 10)")
+    driver = FakeMySQLDriver(primary_path)
+    switches = []
+    manager = FailoverManager(
+        ConnectionPool(driver, acquire_timeout=0.1),
+        ConnectionPool(SQLiteDriver(str(tmp_path / 'fallback.sqlite3'))),
+        prepare_fallback=_prepare,
+        id_columns={'teams': 'team_id'},
+        on_switch=switches.append,
+        retry_attempts=1,
+        probe_interval=60,
+        id_reserve_gap=1000,
+    )
+    manager.start()
+    manager.driver, manager.switches, manager.primary_path = driver, switches, primary_path
+    yield manager
+    manager.stop()
+    manager.primary.close()
+    manager.fallback.close()
+
+
+def _primary_rows(manager, sql):
+    with sqlite3.connect(manager.primary_path) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def _fail_over(manager):
+    manager.driver.down = True
+    manager.primary.close()
+    manager.primary = ConnectionPool(manager.driver, acquire_timeout=0.1)
+
+
+def _write(manager, sql, params=()):
+    with manager.connection() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        conn.commit()
+        return c.lastrowid
+
+
+def test_writes_go_to_the_primary_while_it_answers(failover):
+    _write(failover, "INSERT INTO teams (name) VALUES (%s)", ('Red',))
+    assert _primary_rows(failover, "SELECT name FROM teams ORDER BY team_id") == [('Existing',), ('Red',)]
+    assert failover.snapshot()['journal'] == 0 and failover.switches == []
+
+
+def test_writes_are_journaled_while_failed_over(failover):
+    _fail_over(failover)
+    _write(failover, "UPDATE counters SET n = n + 1 WHERE name = ?", ('joins',))
+    stats = failover.snapshot()
+    assert stats['state'] == 'open' and stats['failovers'] == 1
+    assert stats['journal'] == 1
+    assert failover.switches == [False]
+    # Nothing reached the primary
+    assert _primary_rows(failover, "SELECT n FROM counters") == [(10,)]
+
+
+def test_failover_reserves_ids_past_the_primary(failover):
+    assert failover.high_water == {'teams': 7}
+    _fail_over(failover)
+    team_id = _write(failover, "INSERT INTO teams (name) VALUES (?)", ('Blue',))
+    assert team_id == 7 + 1000 + 1
+    raw = failover.fallback.acquire()
+    try:
+        assert raw.execute("SELECT seq FROM sqlite_sequence WHERE name = 'teams'").fetchone()[0] == team_id
+    finally:
+        failover.fallback.release(raw)
+
+
+def test_replay_keeps_fallback_ids_and_switches_back(failover):
+    _fail_over(failover)
+    team_id = _write(failover, "INSERT INTO teams (name) VALUES (?)", ('Blue',))
+    _write(failover, "UPDATE counters SET n = n + 1 WHERE name = ?", ('joins',))
+    failover.driver.down = False
+    assert failover._recover()
+    assert _primary_rows(failover, "SELECT team_id, name FROM teams ORDER BY team_id") == [(7, 'Existing'), (team_id, 'Blue')]
+    assert _primary_rows(failover, "SELECT n FROM counters") == [(11,)]
+    stats = failover.snapshot()
+    assert stats['state'] == 'closed' and stats['journal'] == 0 and stats['replayed'] == 2
+    assert failover.switches == [False, True]
+
+
+def test_switches_back_only_once_the_journal_is_empty(failover):
+    _fail_over(failover)
+    _write(failover, "UPDATE counters SET n = n + 1 WHERE name = ?", ('joins',))
+    failover.driver.down = False
+    with failover.connection() as conn:
+        # A fallback connection is still open and may add entries, so recovery waits for it
+        assert not failover._recover()
+        assert failover.breaker.state == 'half_open'
+        assert failover.snapshot()['journal'] == 0
+        conn.execute("UPDATE counters SET n = n + 1 WHERE name = ?", ('joins',))
+        conn.commit()
+    assert failover.snapshot()['journal'] == 1
+    assert failover.switches == [False]
+    assert failover._recover()
+    assert failover.snapshot()['journal'] == 0
+    assert _primary_rows(failover, "SELECT n FROM counters") == [(12,)]
+    assert failover.switches == [False, True]
+
+
+def test_interrupted_replay_does_not_apply_entries_twice(failover, monkeypatch):
+    _fail_over(failover)
+    _write(failover, "UPDATE counters SET n = n + 1 WHERE name = ?", ('joins',))
+    failover.driver.down = False
+
+    def crash(conn, seqs):
+        raise RuntimeError("stopped before the journal was cleared")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(failover.journal, 'delete', crash)
+        with pytest.raises(RuntimeError):
+            failover._recover()
+    # MySQL already has the batch; the journal still holds it
+    assert _primary_rows(failover, "SELECT n FROM counters") == [(11,)]
+    assert failover.snapshot()['journal'] == 1
+    assert failover._recover()
+    assert _primary_rows(failover, "SELECT n FROM counters") == [(11,)]
+    assert _primary_rows(failover, "SELECT COUNT(*) FROM failover_replayed") == [(0,)]
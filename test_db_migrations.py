@@ -0,0 +1,94 @@
+# test_db_migrations.py - upgrading the pre-migration SQLite schema
+
+import sqlite3
+
+import pytest
+
+from db_migrations import MIGRATIONS, current_version, migrate
+
+# Schema of botdata.sqlite3 as it shipped before schema versioning
+BASELINE_SCHEMA = '''
+    CREATE TABLE channel_config (guild_id INTEGER PRIMARY KEY, mod_channel INTEGER, event_channel INTEGER,
+                                 team_channel INTEGER, log_channel INTEGER);
+    CREATE TABLE user_usage (guild_id INTEGER, user_id INTEGER, command TEXT, count INTEGER DEFAULT 0,
+                             PRIMARY KEY (guild_id, user_id, command));
+    CREATE TABLE server_usage (guild_id INTEGER PRIMARY KEY, events_created INTEGER DEFAULT 0,
+                               teams_created INTEGER DEFAULT 0, members_joined INTEGER DEFAULT 0);
+    CREATE TABLE user_event_participation (guild_id INTEGER, event_id INTEGER, user_id INTEGER, team_name TEXT,
+                                           PRIMARY KEY (guild_id, event_id, user_id));
+    CREATE TABLE team_event_stats (guild_id INTEGER, event_id INTEGER, team_name TEXT, score INTEGER DEFAULT 0,
+                                   rank INTEGER DEFAULT NULL, PRIMARY KEY (guild_id, event_id, team_name));
+    CREATE TABLE events (event_id INTEGER PRIMARY KEY AUTOINCREMENT, guild_id INTEGER, name TEXT, max_sections INTEGER);
+    CREATE TABLE sections (section_id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER, name TEXT, max_teams INTEGER);
+    CREATE TABLE teams (team_id INTEGER PRIMARY KEY AUTOINCREMENT, section_id INTEGER, name TEXT, leader_id INTEGER,
+                        max_members INTEGER, emoji TEXT);
+    CREATE TABLE team_members (team_id INTEGER, user_id INTEGER, PRIMARY KEY (team_id, user_id));
+    CREATE TABLE channels (guild_id INTEGER, channel_type TEXT, channel_id INTEGER, PRIMARY KEY (guild_id, channel_type));
+    CREATE TABLE user_stats (user_id INTEGER, guild_id INTEGER, events_participated INTEGER DEFAULT 0,
+                             rank INTEGER DEFAULT 0, team_id INTEGER, PRIMARY KEY (user_id, guild_id));
+    CREATE TABLE leaderboard (event_id INTEGER, team_id INTEGER, score INTEGER DEFAULT 0, PRIMARY KEY (event_id, team_id));
+    CREATE TABLE server_stats (guild_id INTEGER, stat_name TEXT, value INTEGER DEFAULT 0, PRIMARY KEY (guild_id, stat_name));
+    CREATE TABLE bot_config (config_key TEXT PRIMARY KEY, config_value TEXT);
+    CREATE TABLE definitions (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, author TEXT NOT NULL,
+                              author_id TEXT NOT NULL, definition TEXT NOT NULL, reference TEXT DEFAULT NULL);
+'''
+
+LATEST = MIGRATIONS[-1][0]
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'baseline.sqlite3'))
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO channels VALUES (1, 'mod', 11)")
+    conn.execute("INSERT INTO events (guild_id, name, max_sections) VALUES (1, 'Cup', 2)")
+    conn.execute("INSERT INTO sections (event_id, name, max_teams) VALUES (1, 'A', 4)")
+    conn.execute("INSERT INTO teams (section_id, name, leader_id, max_members, emoji) VALUES (1, 'Red', 5, 3, NULL)")
+    conn.execute("INSERT INTO leaderboard VALUES (1, 1, 12)")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _schema(conn):
+    return sorted(conn.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'").fetchall())
+
+
+def _indexes(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA index_list({table})")}
+
+
+def test_upgrades_the_baseline_to_the_latest_version(baseline):
+    assert current_version(baseline) == 0
+    assert migrate(baseline) == LATEST
+    assert [row[0] for row in baseline.execute("SELECT version FROM schema_version ORDER BY version")] == \
+        [version for version, _ in MIGRATIONS]
+    tables = {name for kind, name in _schema(baseline) if kind == 'table'}
+    assert {'embed_registry', 'score_events', 'score_snapshots'} <= tables
+    assert 'idx_leaderboard_event_score' in _indexes(baseline, 'leaderboard')
+    assert 'idx_teams_section' in _indexes(baseline, 'teams')
+    assert 'idx_score_events_team' in _indexes(baseline, 'score_events')
+    # Existing rows survive, and current scores seed the score log
+    assert baseline.execute("SELECT channel_id FROM channels").fetchall() == [(11,)]
+    assert baseline.execute("SELECT score FROM leaderboard").fetchall() == [(12,)]
+    assert baseline.execute("SELECT team_id, delta, score, kind FROM score_events").fetchall() == [(1, 12, 12, 'import')]
+
+
+def test_running_again_changes_nothing(baseline):
+    migrate(baseline)
+    schema = _schema(baseline)
+    assert migrate(baseline) == LATEST
+    assert _schema(baseline) == schema
+    assert baseline.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == len(MIGRATIONS)
+    assert baseline.execute("SELECT COUNT(*) FROM score_events").fetchone()[0] == 1
+
+
+def test_migrations_can_be_reapplied_after_an_interruption(baseline):
+    migrate(baseline)
+    schema = _schema(baseline)
+    # As if the process stopped after the schema changes but before versions were recorded
+    baseline.execute("DELETE FROM schema_version")
+    baseline.commit()
+    assert migrate(baseline) == LATEST
+    assert _schema(baseline) == schema
+    assert baseline.execute("SELECT COUNT(*) FROM score_events").fetchone()[0] == 1
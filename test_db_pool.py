@@ -0,0 +1,114 @@
+# test_db_pool.py - ConnectionPool reuse, limits and health checks
+
+import threading
+import time
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeout, SQLiteDriver
+
+
+class FakeDriver:
+    """Hands out numbered connections and records what the pool does with them."""
+    name = 'fake'
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = []
+        self.dead = set()
+
+    def connect(self):
+        self.opened += 1
+        return self.opened
+
+    def is_alive(self, conn):
+        return conn not in self.dead
+
+    def reset(self, conn):
+        pass
+
+    def close(self, conn):
+        self.closed.append(conn)
+
+
+def test_released_connection_is_reused():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver, max_size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() == conn
+    stats = pool.snapshot()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+    assert driver.opened == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool = ConnectionPool(FakeDriver(), max_size=1, acquire_timeout=0.05)
+    pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.snapshot()['timeouts'] == 1
+
+
+def test_waiter_gets_the_released_connection():
+    pool = ConnectionPool(FakeDriver(), max_size=1, acquire_timeout=2)
+    conn = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(conn)
+    waiter.join(1)
+    assert got == [conn]
+    assert pool.snapshot()['waits'] == 1
+
+
+def test_dead_idle_connection_is_replaced():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver, health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    driver.dead.add(conn)
+    assert pool.acquire() != conn
+    assert driver.closed == [conn]
+    assert pool.snapshot()['health_failures'] == 1
+
+
+def test_idle_connections_are_reaped():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver, max_idle=0.02)
+    pool.release(pool.acquire())
+    assert pool.reap_idle() == 0
+    time.sleep(0.05)
+    assert pool.reap_idle() == 1
+    assert pool.snapshot()['size'] == 0
+    assert driver.closed == [1]
+
+
+def test_failed_connect_frees_its_slot():
+    driver = FakeDriver()
+    driver.connect = lambda: (_ for _ in ()).throw(OSError("refused"))
+    pool = ConnectionPool(driver, max_size=1, acquire_timeout=0.05)
+    with pytest.raises(OSError):
+        pool.acquire()
+    assert pool.snapshot()['size'] == 0
+
+
+def test_discarded_and_closed_pool_connections_are_closed():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver, max_size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first, discard=True)
+    pool.release(second)
+    pool.close()
+    assert sorted(driver.closed) == [first, second]
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+
+def test_sqlite_driver_round_trip(tmp_path):
+    pool = ConnectionPool(SQLiteDriver(str(tmp_path / 'pool.sqlite3')))
+    conn = pool.acquire()
+    assert conn.execute('SELECT 1').fetchone()[0] == 1
+    pool.release(conn)
+    pool.close()
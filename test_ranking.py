@@ -0,0 +1,65 @@
+# test_ranking.py - EventRanking order, ranks and updates
+
+import random
+
+from ranking import EventRanking
+
+
+def test_orders_by_score_then_team_id():
+    ranking = EventRanking([(3, 10), (1, 30), (2, 10), (4, 0)])
+    assert ranking.top() == [(1, 30), (2, 10), (3, 10), (4, 0)]
+    assert len(ranking) == 4 and 2 in ranking and 9 not in ranking
+
+
+def test_ties_share_a_rank():
+    ranking = EventRanking([(1, 30), (2, 10), (3, 10), (4, 0)])
+    assert [ranking.rank(team_id) for team_id in (1, 2, 3, 4)] == [1, 2, 2, 4]
+    assert ranking.rank(9) is None
+
+
+def test_set_moves_a_team():
+    ranking = EventRanking([(1, 30), (2, 20), (3, 10)])
+    ranking.set(3, 25)
+    ranking.set(5, 5)
+    assert ranking.top() == [(1, 30), (3, 25), (2, 20), (5, 5)]
+    assert ranking.score(3) == 25 and ranking.rank(2) == 3
+
+
+def test_remove():
+    ranking = EventRanking([(1, 30), (2, 20)])
+    ranking.remove(1)
+    ranking.remove(9)
+    assert ranking.top() == [(2, 20)]
+    assert ranking.rank(2) == 1 and ranking.score(1) is None
+
+
+def test_top_pages():
+    ranking = EventRanking((team_id, team_id) for team_id in range(1, 26))
+    assert [team_id for team_id, _ in ranking.top(10)] == list(range(25, 15, -1))
+    assert [team_id for team_id, _ in ranking.top(10, 20)] == list(range(5, 0, -1))
+    assert ranking.top(10, 30) == []
+
+
+def test_neighbors():
+    ranking = EventRanking([(1, 50), (2, 40), (3, 30), (4, 20)])
+    assert ranking.neighbors(1) == [(1, 50), (2, 40)]
+    assert ranking.neighbors(3) == [(2, 40), (3, 30), (4, 20)]
+    assert ranking.neighbors(9) == []
+
+
+def test_matches_a_full_sort_after_random_updates():
+    rng = random.Random(7)
+    ranking = EventRanking()
+    scores = {}
+    for _ in range(500):
+        team_id = rng.randrange(40)
+        if rng.random() < 0.1:
+            ranking.remove(team_id)
+            scores.pop(team_id, None)
+        else:
+            scores[team_id] = rng.randrange(-20, 100)
+            ranking.set(team_id, scores[team_id])
+    expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    assert ranking.top() == expected
+    for team_id, score in scores.items():
+        assert ranking.rank(team_id) == 1 + sum(1 for other in scores.values() if other > score)
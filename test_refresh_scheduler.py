@@ -0,0 +1,132 @@
+# test_refresh_scheduler.py - debounced, coalescing renders
+#
+# pytest-asyncio isn't a dependency, so each test drives its coroutine with asyncio.run().
+
+import asyncio
+
+from refresh_scheduler import RefreshScheduler
+
+
+class Recorder:
+    """A render callback that records each key and the state it saw."""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.state = {}
+        self.delay = delay
+
+    async def __call__(self, key):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.calls.append((key, self.state.get(key)))
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_first_render_is_immediate():
+    async def run():
+        render = Recorder()
+        scheduler = RefreshScheduler(render, window=60)
+        render.state[1] = 'a'
+        scheduler.mark_dirty(1)
+        await _settle()
+        assert render.calls == [(1, 'a')] and scheduler.pending == 0
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_marks_within_the_window_coalesce_into_one_render():
+    async def run():
+        render = Recorder()
+        scheduler = RefreshScheduler(render, window=0.1)
+        scheduler.mark_dirty(1)
+        await _settle()
+        for value in 'bcde':
+            render.state[1] = value
+            scheduler.mark_dirty(1)
+        await _settle()
+        # Still inside the window after the first render
+        assert render.calls == [(1, None)] and scheduler.pending == 1
+        await asyncio.sleep(0.15)
+        assert render.calls == [(1, None), (1, 'e')]
+        # The first mark after a render starts a task that waits out the window; the rest fold into it
+        assert scheduler.stats == {'requested': 5, 'coalesced': 3, 'rendered': 2, 'failed': 0}
+        assert scheduler.pending == 0
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_keys_are_debounced_independently():
+    async def run():
+        render = Recorder()
+        scheduler = RefreshScheduler(render, window=60)
+        scheduler.mark_dirty(1)
+        scheduler.mark_dirty(2)
+        await _settle()
+        assert sorted(render.calls) == [(1, None), (2, None)]
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_failed_render_is_counted_and_not_retried():
+    async def run():
+        async def render(key):
+            raise RuntimeError("Discord is down")
+
+        scheduler = RefreshScheduler(render, window=60)
+        scheduler.mark_dirty(1)
+        await _settle()
+        assert scheduler.stats['failed'] == 1 and scheduler.pending == 0
+
+    asyncio.run(run())
+
+
+def test_close_renders_the_pending_state():
+    async def run():
+        render = Recorder()
+        scheduler = RefreshScheduler(render, window=60)
+        scheduler.mark_dirty(1)
+        await _settle()
+        render.state[1] = 'latest'
+        scheduler.mark_dirty(1)
+        await scheduler.close()
+        assert render.calls == [(1, None), (1, 'latest')]
+        assert scheduler.pending == 0
+
+    asyncio.run(run())
+
+
+def test_forget_drops_the_pending_render():
+    async def run():
+        render = Recorder()
+        scheduler = RefreshScheduler(render, window=60)
+        scheduler.mark_dirty(1)
+        await _settle()
+        scheduler.mark_dirty(1)
+        scheduler.forget(1)
+        await scheduler.close()
+        assert render.calls == [(1, None)]
+
+    asyncio.run(run())
+
+
+def test_a_forgotten_task_does_not_unregister_its_replacement():
+    async def run():
+        render = Recorder(delay=0.05)
+        scheduler = RefreshScheduler(render, window=0)
+        scheduler.mark_dirty(1)
+        await _settle()
+        scheduler.forget(1)
+        scheduler.mark_dirty(1)
+        await _settle()
+        assert scheduler.pending == 1
+        await asyncio.sleep(0.1)
+        assert render.calls == [(1, None)] and scheduler.pending == 0
+
+    asyncio.run(run())
@@ -0,0 +1,123 @@
+# test_score_history.py - score_events log, snapshots and point-in-time leaderboards
+
+from types import SimpleNamespace
+import time
+
+import pytest
+
+import database
+
+
+class Clock:
+    """Stands in for time.time() in database so each write gets a known timestamp."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def tick(self):
+        self.now += 10
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(database, 'DB_BACKEND', 'sqlite')
+    monkeypatch.setattr(database, 'MYSQL_CONFIG', None)
+    monkeypatch.setattr(database, 'USE_MYSQL', False)
+    monkeypatch.setattr(database, 'SQLITE_PATH', str(tmp_path / 'bot.sqlite3'))
+    monkeypatch.setattr(database, '_pools', {})
+    monkeypatch.setattr(database, '_failover', None)
+    monkeypatch.setattr(database, '_initialized', False)
+    monkeypatch.setattr(database, 'time', SimpleNamespace(time=clock.time, monotonic=time.monotonic))
+    yield database
+    database.close_pools()
+
+
+def _rows(db, sql, params=()):
+    with db.get_db() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        return [tuple(row) for row in c.fetchall()]
+
+
+def test_history_logs_every_change(db):
+    db.set_leaderboard_score(1, 10, 50, moderator_id=7)
+    db.add_leaderboard_score(1, 10, 5)
+    db.add_leaderboard_scores(1, [(10, 2), (20, 3), (10, -1)])
+    db.set_leaderboard_score(1, 10, 40)
+    history = [row[:3] for row in db.get_score_history(1, 10)]
+    assert history == [(50, 50, 'set'), (5, 55, 'add'), (2, 57, 'add'), (-1, 56, 'add'), (-16, 40, 'set')]
+    assert db.get_score_history(1, 10)[0][3] == 7
+    assert [row[:3] for row in db.get_score_history(1, 10, limit=2)] == [(-1, 56, 'add'), (-16, 40, 'set')]
+    assert [row[:3] for row in db.get_score_history(1, 20)] == [(3, 3, 'add')]
+
+
+def test_import_logs_sets_and_adds(db):
+    db.set_leaderboard_score(1, 10, 5)
+    assert db.import_leaderboard_scores(1, scores={10: 8}, deltas=[(20, 4)]) == {10: 8, 20: 4}
+    assert [row[:3] for row in db.get_score_history(1, 10)] == [(5, 5, 'set'), (3, 8, 'set')]
+
+
+def test_scores_at_replays_the_log(db, clock):
+    expected = {}
+    for team_id, points in [(10, 5), (20, 7), (10, 4), (30, 1), (20, -2)]:
+        clock.tick()
+        db.add_leaderboard_score(1, team_id, points)
+        expected[team_id] = expected.get(team_id, 0) + points
+        assert db.get_scores_at(1, clock.now) == expected
+    assert db.get_scores_at(1, 1000.0) == {}
+    assert db.get_scores_at(1, 1020.0) == {10: 5, 20: 7}
+
+
+def test_scores_at_starts_from_snapshots(db, clock, monkeypatch):
+    monkeypatch.setattr(db, 'SCORE_SNAPSHOT_INTERVAL', 3)
+    timeline = []
+    scores = {}
+    for i in range(10):
+        clock.tick()
+        team_id = 10 + i % 3
+        if i == 4:
+            db.set_leaderboard_score(1, team_id, 100)
+            scores[team_id] = 100
+        else:
+            scores[team_id] = db.add_leaderboard_score(1, team_id, i + 1)
+        timeline.append((clock.now, dict(scores)))
+    snapshots = _rows(db, "SELECT DISTINCT event_log_id FROM score_snapshots WHERE event_id = 1 ORDER BY event_log_id")
+    assert len(snapshots) == 3
+    for when, expected in timeline:
+        assert db.get_scores_at(1, when) == expected
+        # Between two writes the earlier state still holds
+        assert db.get_scores_at(1, when + 5) == expected
+
+
+def test_scores_at_replays_across_a_reset(db, clock):
+    clock.tick()
+    db.add_leaderboard_scores(1, [(10, 5), (20, 9)])
+    before = clock.now
+    clock.tick()
+    db.reset_event_scores(1, moderator_id=3)
+    after_reset = clock.now
+    clock.tick()
+    db.add_leaderboard_score(1, 20, 2)
+    assert db.get_scores_at(1, before) == {10: 5, 20: 9}
+    assert db.get_scores_at(1, after_reset) == {10: 0, 20: 0}
+    assert db.get_scores_at(1, clock.now) == {10: 0, 20: 2}
+    assert db.get_score_history(1, 10)[-1][:4] == (-5, 0, 'reset', 3)
+
+
+def test_deleting_an_event_keeps_its_history(db):
+    event_id = db.add_event(1, 'Cup', 2)
+    section_id = db.add_section(event_id, 'A', 4)
+    team_id = db.add_team(section_id, 'Red', 5, 3, None)
+    db.add_leaderboard_score(event_id, team_id, 4)
+    db.delete_event_cascade(event_id)
+    assert db.get_leaderboard(event_id) == []
+    assert [row[:3] for row in db.get_score_history(event_id, team_id)] == [(4, 4, 'add')]
@@ -0,0 +1,43 @@
+# test_score_import.py - parsing the files dm.import_scores accepts
+
+import pytest
+
+from cogs_tournament.leaderboard import parse_score_file
+
+
+def test_csv_with_header_and_blank_lines():
+    data = b"team,score\nRed, 10\n\n Blue ,-3\n"
+    assert parse_score_file('scores.csv', data) == [('Red', 10), ('Blue', -3)]
+
+
+def test_csv_without_header_and_with_bom():
+    data = "﻿Red,10\nRed,5\n".encode('utf-8')
+    assert parse_score_file('scores.CSV', data) == [('Red', 10), ('Red', 5)]
+
+
+def test_csv_team_names_may_contain_commas_when_quoted():
+    assert parse_score_file('scores.csv', b'"Red, Inc",7\n') == [('Red, Inc', 7)]
+
+
+def test_csv_bad_value_after_the_header_is_rejected():
+    with pytest.raises(ValueError, match="Line 3"):
+        parse_score_file('scores.csv', b"team,score\nRed,10\nBlue,lots\n")
+
+
+def test_csv_row_without_a_value_is_rejected():
+    with pytest.raises(ValueError, match="Line 1"):
+        parse_score_file('scores.csv', b"Red\n")
+
+
+def test_json_object_and_pair_list():
+    assert parse_score_file('scores.json', b'{"Red": 10, "Blue": "4"}') == [('Red', 10), ('Blue', 4)]
+    assert parse_score_file('scores.json', b'[["Red", 1], [" Blue ", 2]]') == [('Red', 1), ('Blue', 2)]
+
+
+@pytest.mark.parametrize('data', [
+    b'{"Red": 1', b'[["Red"]]', b'{"Red": 1.5}', b'{"Red": "x"}', b'{"Red": true}',
+    b'null', b'42', b'"Red"',
+])
+def test_json_errors_are_value_errors(data):
+    with pytest.raises(ValueError):
+        parse_score_file('scores.json', data)
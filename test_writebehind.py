@@ -0,0 +1,112 @@
+# test_writebehind.py - MembershipWriter coalescing and retry
+#
+# pytest-asyncio isn't a dependency, so each test drives its coroutine with asyncio.run().
+
+import asyncio
+
+import database_async
+import db_writebehind
+from db_writebehind import MembershipWriter
+
+
+def _record_writes(monkeypatch, fail=0):
+    """Capture apply_membership_changes() calls; the first ``fail`` calls raise."""
+    calls = []
+
+    async def apply_membership_changes(joins, leaves):
+        if len(calls) < fail:
+            calls.append(None)
+            raise ConnectionError("database unavailable")
+        calls.append((sorted(joins), sorted(leaves)))
+
+    monkeypatch.setattr(database_async, 'apply_membership_changes', apply_membership_changes)
+    return calls
+
+
+def test_latest_change_per_member_wins(monkeypatch):
+    calls = _record_writes(monkeypatch)
+
+    async def run():
+        writer = MembershipWriter(flush_interval=60)
+        writer.join(1, 10, 100, 'Red', 5)
+        writer.leave(1, 10, 100, 'Red', 5)
+        writer.join(1, 10, 101, 'Blue', 5)
+        writer.join(1, 10, 100, 'Red', 6)
+        assert writer.pending == 3
+        await writer.flush()
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+    assert calls == [
+        ([(100, 6, 1, 10, 'Red'), (101, 5, 1, 10, 'Blue')], [(100, 5, 1, 10, 'Red')]),
+    ]
+    assert writer.stats['coalesced'] == 1
+    assert writer.stats['written'] == 3 and writer.stats['batches'] == 1
+    assert writer.pending == 0
+
+
+def test_changes_without_a_team_id_are_dropped(monkeypatch):
+    calls = _record_writes(monkeypatch)
+
+    async def run():
+        writer = MembershipWriter(flush_interval=60)
+        writer.join(1, 10, None, 'Unsaved', 5)
+        assert writer.pending == 0
+        await writer.close()
+
+    asyncio.run(run())
+    assert calls == []
+
+
+def test_failed_flush_is_requeued_behind_newer_changes(monkeypatch):
+    calls = _record_writes(monkeypatch, fail=1)
+
+    async def run():
+        writer = MembershipWriter(flush_interval=60)
+        writer.join(1, 10, 100, 'Red', 5)
+        writer.join(1, 10, 100, 'Red', 6)
+        await writer.flush()
+        assert writer.pending == 2 and writer.stats['failures'] == 1
+        # Queued after the failed batch, so it replaces the requeued join
+        writer.leave(1, 10, 100, 'Red', 6)
+        await writer.flush()
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+    assert calls == [None, ([(100, 5, 1, 10, 'Red')], [(100, 6, 1, 10, 'Red')])]
+    assert writer.pending == 0 and writer.stats['written'] == 2
+
+
+def test_full_batch_flushes_before_the_interval(monkeypatch):
+    calls = _record_writes(monkeypatch)
+
+    async def run():
+        writer = MembershipWriter(flush_interval=60, batch_size=2)
+        writer.start()
+        writer.join(1, 10, 100, 'Red', 5)
+        writer.join(1, 10, 100, 'Red', 6)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert writer.pending == 0
+        await writer.close()
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_flush_all_drains_every_writer(monkeypatch):
+    calls = _record_writes(monkeypatch)
+
+    async def run():
+        writers = [MembershipWriter(flush_interval=60), MembershipWriter(flush_interval=60)]
+        writers[0].join(1, 10, 100, 'Red', 5)
+        writers[1].leave(1, 11, 200, 'Blue', 7)
+        await db_writebehind.flush_all()
+        assert [writer.pending for writer in writers] == [0, 0]
+        for writer in writers:
+            await writer.close()
+
+    asyncio.run(run())
+    assert sorted(calls) == [([], [(200, 7, 1, 11, 'Blue')]), ([(100, 5, 1, 10, 'Red')], [])]
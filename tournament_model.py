@@ -0,0 +1,227 @@
+# tournament_model.py - typed in-memory model of events, sections and teams
+#
+# The Event cog owns one TournamentRegistry holding every loaded event. Members
+# are kept as integer user ids in sets, so membership checks are O(1) and no
+# mention strings are stored; mentions are built only when a message needs them.
+# The registry also keeps the name, team id and section id lookups the
+# cogs use instead of walking events -> sections -> teams.
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+def mention(user_id: Optional[int]) -> str:
+    return f"<@{user_id}>" if user_id is not None else "Unknown"
+
+
+@dataclass(slots=True, eq=False)
+class Team:
+    name: str
+    team_id: Optional[int]
+    leader_id: Optional[int]
+    max_members: int
+    emoji: Optional[str]
+    members: Set[int] = field(default_factory=set)
+
+    @property
+    def leader(self) -> str:
+        return mention(self.leader_id)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.members) >= self.max_members
+
+    def member_mentions(self) -> List[str]:
+        """Mentions of every member, leader first."""
+        return [mention(user_id) for user_id in sorted(self.members, key=lambda uid: (uid != self.leader_id, uid))]
+
+
+@dataclass(slots=True, eq=False)
+class Section:
+    name: str
+    section_id: Optional[int]
+    max_teams: int
+    teams: Dict[str, Team] = field(default_factory=dict)
+
+
+@dataclass(slots=True, eq=False)
+class Event:
+    event_id: int
+    guild_id: Optional[int]
+    name: str
+    max_sections: int
+    role_id: Optional[int] = None
+    game_channel_id: Optional[int] = None
+    sections: Dict[str, Section] = field(default_factory=dict)
+
+    def teams(self) -> Iterator[Tuple[Section, Team]]:
+        for section in self.sections.values():
+            for team in section.teams.values():
+                yield section, team
+
+    @property
+    def team_count(self) -> int:
+        return sum(len(section.teams) for section in self.sections.values())
+
+    @property
+    def member_count(self) -> int:
+        return sum(team.member_count for _, team in self.teams())
+
+
+class TournamentRegistry:
+    """Every loaded event by id, with lookups by team name and id.
+
+    Reads work like the dict it replaces (get, in, [], items, values). Add and
+    remove sections and teams through the registry so the lookups stay current.
+    Names aren't unique, so the name lookup keeps every match in the
+    order the teams were added; callers decide what to do with more than one.
+    """
+
+    def __init__(self):
+        self._events: Dict[int, Event] = {}
+        self._by_name: Dict[Tuple[Optional[int], str], List[Tuple[Event, Section, Team]]] = {}
+        self._by_id: Dict[int, Tuple[Event, Section, Team]] = {}
+        self._sections: Dict[int, Tuple[Event, Section]] = {}
+
+    @classmethod
+    def from_rows(cls, rows) -> 'TournamentRegistry':
+        """Build the registry from database.load_tournament_rows()."""
+        registry = cls()
+        sections_by_id = {}
+        teams_by_id = {}
+        for event_id, guild_id, name, max_sections in rows['events']:
+            registry.add_event(Event(event_id, guild_id, name, max_sections))
+        for section_id, event_id, sect_name, max_teams in rows['sections']:
+            if event_id in registry._events:
+                sections_by_id[section_id] = (event_id, registry.add_section(event_id, Section(sect_name, section_id, max_teams)))
+        for team_id, section_id, team_name, leader_id, max_members, emoji in rows['teams']:
+            if section_id in sections_by_id:
+                event_id, section = sections_by_id[section_id]
+                teams_by_id[team_id] = registry.add_team(event_id, section.name, Team(team_name, team_id, leader_id, max_members, emoji))
+        for team_id, user_id in rows['members']:
+            team = teams_by_id.get(team_id)
+            if team is not None:
+                team.members.add(user_id)
+        return registry
+
+    # Mapping-style reads
+    def get(self, event_id, default=None) -> Optional[Event]:
+        return self._events.get(event_id, default)
+
+    def __getitem__(self, event_id) -> Event:
+        return self._events[event_id]
+
+    def __contains__(self, event_id) -> bool:
+        return event_id in self._events
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def items(self):
+        return self._events.items()
+
+    def values(self):
+        return self._events.values()
+
+    # Changes
+    def add_event(self, event: Event) -> Event:
+        self._events[event.event_id] = event
+        for section in event.sections.values():
+            self._index_section(event, section)
+        return event
+
+    def remove_event(self, event_id) -> Optional[Event]:
+        event = self._events.pop(event_id, None)
+        if event is not None:
+            for section in list(event.sections.values()):
+                self._unindex_section(event, section)
+        return event
+
+    def add_section(self, event_id, section: Section) -> Section:
+        event = self._events[event_id]
+        event.sections[section.name] = section
+        self._index_section(event, section)
+        return section
+
+    def remove_section(self, event_id, sect_name) -> Optional[Section]:
+        event = self._events[event_id]
+        section = event.sections.pop(sect_name, None)
+        if section is not None:
+            self._unindex_section(event, section)
+        return section
+
+    def add_team(self, event_id, sect_name, team: Team) -> Team:
+        event = self._events[event_id]
+        section = event.sections[sect_name]
+        replaced = section.teams.get(team.name)
+        if replaced is not None:
+            # Drop the old team's lookups so find_by_name() and locate() never return it
+            self._unindex_team(event, section, replaced)
+        section.teams[team.name] = team
+        self._index_team(event, section, team)
+        return team
+
+    def remove_team(self, event_id, sect_name, team_name) -> Optional[Team]:
+        event = self._events[event_id]
+        section = event.sections[sect_name]
+        team = section.teams.pop(team_name, None)
+        if team is not None:
+            self._unindex_team(event, section, team)
+        return team
+
+    # Lookups
+    def find_by_name(self, guild_id, team_name) -> List[Tuple[Event, Section, Team]]:
+        """(event, section, team) for every team called ``team_name`` in the guild."""
+        return list(self._by_name.get((guild_id, team_name), ()))
+
+    def find_in_event(self, event_id, team_name) -> Optional[Tuple[Section, Team]]:
+        """(section, team) of the event's team called ``team_name``, or None."""
+        event = self._events.get(event_id)
+        if event is None:
+            return None
+        for found_event, section, team in self._by_name.get((event.guild_id, team_name), ()):
+            if found_event is event:
+                return section, team
+        return None
+
+    def locate(self, team_id) -> Optional[Tuple[Event, Section, Team]]:
+        return self._by_id.get(team_id)
+
+    def section(self, section_id) -> Optional[Tuple[Event, Section]]:
+        return self._sections.get(section_id)
+
+    # Index maintenance
+    def _index_section(self, event, section):
+        if section.section_id is not None:
+            self._sections[section.section_id] = (event, section)
+        for team in section.teams.values():
+            self._index_team(event, section, team)
+
+    def _unindex_section(self, event, section):
+        for team in section.teams.values():
+            self._unindex_team(event, section, team)
+        self._sections.pop(section.section_id, None)
+
+    def _index_team(self, event, section, team):
+        self._by_name.setdefault((event.guild_id, team.name), []).append((event, section, team))
+        if team.team_id is not None:
+            self._by_id[team.team_id] = (event, section, team)
+
+    def _unindex_team(self, event, section, team):
+        _discard(self._by_name, (event.guild_id, team.name), team)
+        self._by_id.pop(team.team_id, None)
+
+
+def _discard(index, key, team):
+    entries = index.get(key)
+    if entries:
+        entries[:] = [entry for entry in entries if entry[-1] is not team]
+        if not entries:
+            del index[key]